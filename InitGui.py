@@ -46,6 +46,8 @@ class OpticsWorkbench (Workbench):
 
     def Activated(self):
         """This function is executed whenever the workbench is activated"""
+        from PyOpticL import recompute
+        recompute.install() # recompute components moved from the GUI in batches
         return
 
     def Deactivated(self):
@@ -0,0 +1,226 @@
+import argparse
+import json
+import multiprocessing
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_job_variable = "PYOPTICL_BUILD_JOB"
+
+report_name = "build_report.json"
+
+def parse_entry(entry):
+    '''
+    Split a design entry point into its script and function
+
+    Args:
+        entry (string): A script path, optionally followed by ':' and the name of a function in it
+            which builds the design, such as "sample_beam_routing_split.py:group1_baseplate_588nm".
+            Such scripts are not loaded as "__main__", and run inside a layout.bulk_build so they
+            can leave recomputing and saving the document to the runner, see layout.building
+
+    Returns:
+        path (string): The absolute path of the script
+        function (string): The name of the function, or None to run the whole script
+    '''
+    path, _, function = entry.rpartition(":")
+    if path == "" or not function.isidentifier():
+        path, function = entry, None
+    return os.path.abspath(path), function
+
+def _entry_name(path, function):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name if function == None else function
+
+def build(entries, out=".", jobs=None, freecad="FreeCADCmd", assemble=None, timeout=None, verbose=True):
+    '''
+    Build design entry points in parallel FreeCAD processes without a GUI, saving each
+    as its own document along with a build report
+
+    Args:
+        entries (string[]): The entry points to build, see parse_entry
+        out (string): The directory to write documents, logs and the report to
+        jobs (int): Number of builds to run at once, defaults to the number of cpus
+        freecad (string): The FreeCAD command line executable
+        assemble (string): Name of a table document to link all built documents into, or None
+        timeout (float): Number of seconds after which a build is stopped
+        verbose (bool): Whether to print each build as it finishes
+
+    Returns:
+        The build report as a dict
+    '''
+    if shutil.which(freecad) == None:
+        raise FileNotFoundError("FreeCAD executable '%s' not found"%(freecad))
+    out = os.path.abspath(out)
+    os.makedirs(out, exist_ok=True)
+
+    builds = []
+    names = set()
+    for entry in entries:
+        path, function = parse_entry(entry)
+        name = base = _entry_name(path, function)
+        n = 1
+        while name in names:
+            name = "%s_%d"%(base, n)
+            n += 1
+        names.add(name)
+        builds.append({"mode": "build", "entry": entry, "path": path, "function": function, "name": name,
+                       "document": os.path.join(out, name + ".FCStd"), "log": os.path.join(out, name + ".log"),
+                       "result": os.path.join(out, name + ".result.json")})
+
+    start = time.perf_counter()
+    report = {"started": time.strftime("%Y-%m-%dT%H:%M:%S"), "freecad": freecad, "jobs": jobs or os.cpu_count(), "builds": []}
+    # cpus left over by the builds running at once trace beam paths within each build
+    for job in builds:
+        job["processes"] = max(1, os.cpu_count()//min(report["jobs"], len(builds)))
+
+    def run(job):
+        result = _spawn(freecad, job, timeout)
+        if verbose:
+            print("%s: %s in %.1fs"%(job["name"], result["status"], result["wall"]), flush=True)
+        return result
+
+    with ThreadPoolExecutor(report["jobs"]) as pool:
+        report["builds"] = list(pool.map(run, builds))
+
+    if assemble != None:
+        documents = [i["document"] for i in report["builds"] if i["status"] == "ok"]
+        name = os.path.splitext(os.path.basename(assemble))[0]
+        report["table"] = run({"mode": "assemble", "name": name, "documents": documents,
+                               "document": os.path.join(out, name + ".FCStd"), "log": os.path.join(out, name + ".log"),
+                               "result": os.path.join(out, name + ".result.json")})
+
+    report["wall"] = time.perf_counter()-start
+    with open(os.path.join(out, report_name), "w") as f:
+        json.dump(report, f, indent=1)
+    return report
+
+def _spawn(freecad, job, timeout):
+    # run one job in its own FreeCAD process, which picks the job up from the environment
+    env = dict(os.environ)
+    env[_job_variable] = json.dumps(job)
+    env["PYTHONPATH"] = os.pathsep.join([_root] + ([env["PYTHONPATH"]] if "PYTHONPATH" in env else []))
+    start = time.perf_counter()
+    with open(job["log"], "w") as log:
+        try:
+            code = subprocess.run([freecad, os.path.abspath(__file__)], env=env, stdout=log, stderr=subprocess.STDOUT,
+                                  stdin=subprocess.DEVNULL, timeout=timeout).returncode
+        except subprocess.TimeoutExpired:
+            code = None
+    result = {"status": "timeout" if code == None else "failed"}
+    try:
+        with open(job["result"]) as f:
+            result.update(json.load(f))
+        os.remove(job["result"])
+    except (OSError, ValueError):
+        pass
+    result.update({"name": job["name"], "document": job["document"], "log": job["log"],
+                   "returncode": code, "wall": time.perf_counter()-start})
+    if "entry" in job:
+        result["entry"] = job["entry"]
+    return result
+
+# whether an object is drawn, so a table link to it shows geometry
+def _shown(obj):
+    if not obj.Visibility:
+        return False
+    if obj.TypeId == "App::Link":
+        return obj.LinkedObject != None
+    if hasattr(obj, "Mesh"):
+        return obj.Mesh.CountFacets > 0
+    return hasattr(obj, "Shape") and not obj.Shape.isNull()
+
+def _work(job):
+    import FreeCAD as App
+    import FreeCADGui as Gui
+    if not App.GuiUp:
+        # every component creates a view provider, which needs the gui application even without a window
+        Gui.setupWithoutGUI()
+    from PyOpticL import layout
+
+    result = {}
+    if job["mode"] == "build":
+        App.newDocument(job["name"])
+        start = time.perf_counter()
+        sys.path.insert(0, os.path.dirname(job["path"]))
+        with layout.bulk_build(redraw=False):
+            # scripts run as macros would, with the FreeCAD modules already in their namespace
+            names = runpy.run_path(job["path"], init_globals={"App": App, "FreeCAD": App, "Gui": Gui, "FreeCADGui": Gui},
+                                   run_name="__main__" if job["function"] == None else None)
+            if job["function"] != None:
+                names[job["function"]]()
+        result["script"] = time.perf_counter()-start
+        doc = App.ActiveDocument
+        if doc == None:
+            raise RuntimeError("the entry point closed its document")
+        # trace pool workers are forked, spawning them would start FreeCAD and this job over again
+        processes = job.get("processes", 1)
+        if processes > 1 and "fork" in multiprocessing.get_all_start_methods():
+            multiprocessing.set_start_method("fork", force=True)
+        else:
+            processes = 1
+        result["redraw"] = {name: {"time": t, "objects": n} for name, (t, n) in layout.redraw(processes).items()}
+        result["objects"] = len(doc.Objects)
+        result["baseplates"] = [i.Label for i in doc.Objects if isinstance(getattr(i, "Proxy", None), layout.baseplate)]
+    else:
+        doc = App.newDocument(job["name"])
+        for path in job["documents"]:
+            source = App.openDocument(path)
+            group = doc.addObject("App::DocumentObjectGroup", source.Name)
+            group.Label = source.Label
+            for obj in source.Objects:
+                if _shown(obj):
+                    link = doc.addObject("App::Link", obj.Name)
+                    link.LinkedObject = obj
+                    link.LinkTransform = True
+                    link.Label = obj.Label
+                    group.addObject(link)
+        doc.recompute()
+        result["objects"] = len(doc.Objects)
+    start = time.perf_counter()
+    doc.saveAs(job["document"])
+    result["save"] = time.perf_counter()-start
+    return result
+
+def _worker():
+    job = json.loads(os.environ[_job_variable])
+    start = time.perf_counter()
+    try:
+        result = _work(job)
+        result["status"] = "ok"
+    except Exception:
+        traceback.print_exc()
+        result = {"status": "failed", "error": traceback.format_exc()}
+    result["time"] = time.perf_counter()-start
+    with open(job["result"], "w") as f:
+        json.dump(result, f, indent=1)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    # skip FreeCAD's interactive console and teardown
+    os._exit(0 if result["status"] == "ok" else 1)
+
+def _main():
+    parser = argparse.ArgumentParser(description="Build PyOpticL designs in parallel FreeCAD processes without a GUI",
+                                     fromfile_prefix_chars="@")
+    parser.add_argument("entries", nargs="+", help="script.py or script.py:function, one per baseplate or subsystem, or @file listing them")
+    parser.add_argument("-o", "--out", default=".", help="directory for documents, logs and the build report")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of builds at once, defaults to the number of cpus")
+    parser.add_argument("--freecad", default="FreeCADCmd", help="FreeCAD command line executable")
+    parser.add_argument("--assemble", default=None, help="name of a table document linking all built documents")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds after which a build is stopped")
+    args = parser.parse_args()
+    report = build(args.entries, args.out, args.jobs, args.freecad, args.assemble, args.timeout)
+    results = report["builds"] + ([report["table"]] if "table" in report else [])
+    sys.exit(0 if all(i["status"] == "ok" for i in results) else 1)
+
+if __name__ == "__main__":
+    if _job_variable in os.environ:
+        _worker()
+    else:
+        _main()
@@ -0,0 +1,234 @@
+from collections import OrderedDict
+
+import FreeCAD as App
+import Part
+
+from . import optomech
+
+tol = 1e-6
+feature_cache_size = 4096 # number of drill tools to keep the features of
+_feature_cache = OrderedDict()
+
+def clear_feature_cache():
+    _feature_cache.clear()
+
+# circular face of a hole layer at z=0
+def _circle(x, y, diameter):
+    return Part.Face(Part.Wire(Part.makeCircle(diameter/2, App.Vector(x, y, 0))))
+
+# thread class of a hole from the bolt tables, empty when it matches none
+def _thread(diameter):
+    for name, bolt in [("4-40", optomech.bolt_4_40), ("8-32", optomech.bolt_8_32), ("1/4-20", optomech.bolt_14_20)]:
+        if abs(diameter-bolt["tap_dia"]) < 1e-3:
+            return name + " tap"
+        if abs(diameter-bolt["clear_dia"]) < 1e-3:
+            return name + " clearance"
+    return ""
+
+class hole:
+    '''
+    A vertical round hole, optionally counterbored
+
+    Args:
+        x, y (float): The center of the hole
+        z (float): The height of the top of the hole
+        diameter (float): The diameter of the hole
+        depth (float): The depth of the hole from its top
+        counterbore (float[2]): The diameter and depth of the counterbore, zero for none
+    '''
+    def __init__(self, x, y, z, diameter, depth, counterbore=(0, 0)):
+        self.x, self.y, self.z = x, y, z
+        self.diameter = diameter
+        self.depth = depth
+        self.counterbore = tuple(counterbore)
+        self.thread = _thread(diameter)
+
+    def layers(self):
+        layers = [(self.z-self.depth, self.z, _circle(self.x, self.y, self.diameter))]
+        if self.counterbore[0] > 0 and self.counterbore[1] > 0:
+            layers.append((self.z-self.counterbore[1], self.z, _circle(self.x, self.y, self.counterbore[0])))
+        return layers
+
+class pocket:
+    '''
+    A vertical pocket with a constant outline
+
+    Args:
+        outline (Face): The outline of the pocket at z=0
+        z (float): The height of the top of the pocket
+        depth (float): The depth of the pocket from its top
+        fillet (float): The smallest corner radius of the outline, zero for sharp corners
+    '''
+    def __init__(self, outline, z, depth, fillet=0):
+        self.outline = outline
+        self.z = z
+        self.depth = depth
+        self.fillet = fillet
+
+    def layers(self):
+        return [(self.z-self.depth, self.z, self.outline)]
+
+# whether every face of a shape is horizontal or vertical, so it is an extruded outline in layers
+def _is_layered(shape):
+    if len(shape.Faces) == 0:
+        return False
+    for face in shape.Faces:
+        surface = face.Surface
+        if isinstance(surface, Part.Plane):
+            if tol < abs(surface.Axis.z) < 1-tol:
+                return False
+        elif isinstance(surface, Part.Cylinder):
+            if abs(surface.Axis.z) < 1-tol:
+                return False
+        else:
+            return False
+    return True
+
+# heights of the horizontal faces of a layered shape
+def _levels(shape):
+    levels = []
+    for face in shape.Faces:
+        if isinstance(face.Surface, Part.Plane) and abs(face.Surface.Axis.z) > 1-tol:
+            z = face.BoundBox.ZMin
+            if all(abs(z-i) > tol for i in levels):
+                levels.append(z)
+    return sorted(levels)
+
+# outline of a layered shape between two levels, moved to z=0
+def _section(shape, z0, z1):
+    mid = (z0+z1)/2
+    wires = shape.slice(App.Vector(0, 0, 1), mid)
+    if len(wires) == 0:
+        return None
+    face = Part.makeFace(wires, "Part::FaceMakerBullseye")
+    face.translate(App.Vector(0, 0, -mid))
+    return face
+
+# center and diameter of a section made of a single circle, otherwise None
+def _round(face):
+    if len(face.Wires) != 1 or len(face.Edges) != 1 or not isinstance(face.Edges[0].Curve, Part.Circle):
+        return None
+    circle = face.Edges[0].Curve
+    return circle.Center.x, circle.Center.y, circle.Radius*2
+
+def _fillet(face):
+    radii = [i.Curve.Radius for i in face.Edges if isinstance(i.Curve, Part.Circle)]
+    return min(radii) if len(radii) > 0 else 0
+
+def _extract(tool):
+    features = []
+    for solid in tool.Solids:
+        if not _is_layered(solid):
+            return None
+        levels = _levels(solid)
+        layers = []
+        for z0, z1 in zip(levels[:-1], levels[1:]):
+            face = _section(solid, z0, z1)
+            if face != None:
+                layers.append((z0, z1, face))
+        if len(layers) == 0:
+            return None
+        rounds = [_round(face) for _, _, face in layers]
+        x, y = (rounds[0][0], rounds[0][1]) if rounds[0] != None else (0, 0)
+        if all(i != None and abs(i[0]-x) < tol and abs(i[1]-y) < tol for i in rounds):
+            # coaxial circles are one hole when the widest layers sit on top of a single narrower bore
+            diameters = [i[2] for i in rounds]
+            diameter, head = min(diameters), max(diameters)
+            n = 0
+            while n < len(diameters) and abs(diameters[-1-n]-head) < tol:
+                n += 1
+            if all(abs(i-diameter) < tol for i in diameters[:len(diameters)-n]):
+                top = layers[-1][1]
+                bottom = layers[0][0]
+                counterbore = (head, top-layers[-n][0]) if head-diameter > tol else (0, 0)
+                features.append(hole(x, y, top, diameter, top-bottom, counterbore))
+                continue
+            # counterbores from below and stepped holes are kept as one hole per layer
+        for z0, z1, section in layers:
+            for face in section.Faces:
+                i = _round(face)
+                if i != None:
+                    features.append(hole(i[0], i[1], z1, i[2], z1-z0))
+                else:
+                    features.append(pocket(face, z1, z1-z0, _fillet(face)))
+    return features
+
+def extract(tool, key=None):
+    '''
+    Describe a drill part as 2.5D hole and pocket features
+
+    Args:
+        tool (Shape): The drill part, placed relative to the part being drilled
+        key (hashable): An identifier of the tool geometry used to reuse earlier results
+
+    Returns:
+        A list of hole and pocket features, or None if the tool is not made of vertical extrusions
+    '''
+    if key != None and key in _feature_cache:
+        _feature_cache.move_to_end(key)
+        return _feature_cache[key]
+    features = _extract(tool)
+    if key != None:
+        _feature_cache[key] = features
+        while len(_feature_cache) > feature_cache_size:
+            _feature_cache.popitem(last=False)
+    return features
+
+def drill(blank, features):
+    '''
+    Build a drilled part by cutting the outlines of all features active at each depth from one
+    cross section of the blank and extruding it
+
+    Args:
+        blank (Shape): The undrilled part, which must itself be made of vertical extrusions
+        features (feature[]): The hole and pocket features to cut
+
+    Returns:
+        The drilled solid, or None if the blank is not layered
+    '''
+    if not _is_layered(blank):
+        return None
+    bound = blank.BoundBox
+    layers = [layer for i in features for layer in i.layers()]
+    levels = [bound.ZMin, bound.ZMax]
+    for z0, z1, _ in layers:
+        for z in (z0, z1):
+            if bound.ZMin < z < bound.ZMax and all(abs(z-i) > tol for i in levels):
+                levels.append(z)
+    levels += [i for i in _levels(blank) if all(abs(i-j) > tol for j in levels)]
+    levels.sort()
+
+    slabs = []
+    for z0, z1 in zip(levels[:-1], levels[1:]):
+        face = _section(blank, z0, z1)
+        if face == None:
+            continue
+        cuts = [i for a, b, i in layers if a-tol <= z0 and b+tol >= z1]
+        if len(cuts) > 0:
+            face = face.cut(cuts)
+        if face.isNull() or len(face.Faces) == 0:
+            continue
+        face.translate(App.Vector(0, 0, z0))
+        slabs.append(face.extrude(App.Vector(0, 0, z1-z0)))
+    if len(slabs) == 0:
+        return Part.Shape()
+    if len(slabs) == 1:
+        return slabs[0].removeSplitter()
+    return slabs[0].multiFuse(slabs[1:]).removeSplitter()
+
+def hole_table(features):
+    '''
+    Tabulate hole features for machining
+
+    Args:
+        features (feature[]): The features of a drilled part
+
+    Returns:
+        A list of rows of x, y, top z, diameter, depth, thread class, counterbore diameter and counterbore depth
+    '''
+    rows = []
+    for i in features:
+        if isinstance(i, hole):
+            rows.append([round(i.x, 3), round(i.y, 3), round(i.z, 3), round(i.diameter, 3), round(i.depth, 3),
+                         i.thread, round(i.counterbore[0], 3), round(i.counterbore[1], 3)])
+    return sorted(rows, key=lambda row: (row[5], row[0], row[1]))
@@ -1,122 +1,174 @@
 import FreeCAD as App
 import Part
+from collections import OrderedDict
 from math import *
 import numpy as np
 
-inch = 25.4
-
-def is_mult(x, factor, tol=1e-5):
-    return isclose((abs(x)+tol/2)%factor, 0, abs_tol=tol)
-
-# calculate intersection between a beam and an optical component
-def check_interaction(x1, y1, a1, ref_obj):
-
-    # check if object is an optical component
-    if not hasattr(ref_obj, "Proxy") or not (hasattr(ref_obj.Proxy, 'max_angle') and hasattr(ref_obj.Proxy, 'max_width')):
-        return
-    
-    # get object placement
-    x2, y2, _ = ref_obj.BasePlacement.Base
-    a_norm = ref_obj.BasePlacement.Rotation.Angle
-    a_norm *= ref_obj.BasePlacement.Rotation.Axis[2]
-
-    # check if component is on the correct side of the beam
-    a_rel = abs(a1-atan2(y2-y1, x2-x1))%(2*pi)
-    if a_rel > pi:
-        a_rel = 2*pi-a_rel
-    if a_rel > pi/2:
-        return
-
-    # limits on incomming beam
-    max_angle = radians(ref_obj.Proxy.max_angle)
-    max_width = ref_obj.Proxy.max_width
-
-    # two possible output beam angles
-    angle1 = None
-    angle2 = None
-
-    # transmitted beam
-    if hasattr(ref_obj.Proxy, 'transmission'):
-        a_norm = (a_norm+pi)%(2*pi)
-        angle1 = a1
-    # diffracted beam
-    if hasattr(ref_obj.Proxy, 'diffraction_angle'):
-        a_norm = (a_norm+pi)%(2*pi)
-        angle2 = a1+radians(ref_obj.Proxy.diffraction_angle)
-    # reflected beam
-    if hasattr(ref_obj.Proxy, 'reflection_angle'):
-        a_norm = (a_norm+radians(ref_obj.Proxy.reflection_angle))%(2*pi)
-        angle2 = 2*a_norm-a1-pi
-
-    a2 = a_norm+pi/2 # angle of interaction surface
-
-    # relative angle between the beam and component input normal
-    a_in = abs(a1-a_norm+pi)%(2*pi)
-    if a_in > pi:
-        a_in = 2*pi-a_in
-    
-    if hasattr(ref_obj.Proxy, 'diffraction_dir'):
-        if a_in < pi/2:
-            angle2 = a1+radians(ref_obj.Proxy.diffraction_angle)*ref_obj.Proxy.diffraction_dir[0]
-        else:
-            angle2 = a1+radians(ref_obj.Proxy.diffraction_angle)*ref_obj.Proxy.diffraction_dir[1]
-
-    # check for edge cases
-    a1_vert = is_mult(a1-pi/2, pi)
-    a2_vert = is_mult(a2-pi/2, pi)
-    a12_hor = is_mult(a1, pi) and is_mult(a2, pi) or is_mult(a1-a2, pi)
-
-    # calculate intersection of the beam and the surface
-    if a1_vert:
-        x = x1
-    elif a2_vert or a12_hor:
-        x = x2
-    else:
-        x = (y2-x2*tan(a2)-y1+x1*tan(a1))/(tan(a1)-tan(a2))
-    if not a1_vert:
-        y = x*tan(a1)+y1-x1*tan(a1)
-    elif not a2_vert:
-        y = x*tan(a2)+y2-x2*tan(a2)
-    else:
-        y = y2
-
-    # total distance to interaction
-    ref_d = sqrt((x-x2)**2+(y-y2)**2)
-
-    # refracted beam
-    if hasattr(ref_obj.Proxy, 'focal_length'):
-        a_rel = abs(a2-atan2(y-y2, x-x2))%(2*pi)
-        offset = pi/2-atan2(ref_obj.Proxy.focal_length, ref_d)
-        if is_mult(a_rel, 2*pi):
-            offset *= -1
-        if a_in < pi/2:
-            offset *= -1
-        angle1 += offset
-
-    # check if beam is from current object
-    if isclose(x1, x, abs_tol=1e-5) and isclose(y1, y, abs_tol=1e-5):
-        return
+from . import recompute, trace
 
-    # check against max width and blocking width
-    block = False
-    if ref_d > max_width/2:
-        if hasattr(ref_obj.Proxy, "block_width"):
-            if ref_d < ref_obj.Proxy.block_width/2:
-                block = True
-            else:
-                return
-        else:
-            return
-        
-    # check against max angle
-    if hasattr(ref_obj.Proxy, 'transmission'):
-        if a_in > max_angle and pi-a_in > max_angle:
-            block = True
-    else:
-        if a_in > max_angle:
-            block = True
-        
-    return ref_obj, x, y, [angle1, angle2], block
+inch = 25.4
+max_segments = 10000 # limit on beam segments traced per beam path
+trace_cache_size = 8 # number of previous traces each beam path keeps
+
+def _is_optical(obj):
+    return hasattr(obj, "Proxy") and hasattr(obj.Proxy, 'max_angle') and hasattr(obj.Proxy, 'max_width')
+
+# objects which may belong to a baseplate, in document order
+def _baseplate_objects(baseplate):
+    if baseplate == None:
+        return App.ActiveDocument.Objects
+    return sorted(baseplate.InList, key=lambda obj: obj.ID)
+
+def _pose(obj):
+    x, y, _ = obj.BasePlacement.Base
+    return x, y, obj.BasePlacement.Rotation.Angle*obj.BasePlacement.Rotation.Axis[2]
+
+# describe a document object as a plain trace element
+def _element(obj):
+    x, y, angle = _pose(obj)
+    elem = trace.element(obj.Name, x, y, angle)
+    # children follow their parent the same way ViewProvider.updateData moves them, offset in the parent's
+    # frame, while relative components keep an unrotated offset
+    if hasattr(obj, "ParentObject") and obj.ParentObject != None and hasattr(obj, "RelativePlacement"):
+        elem.parent = obj.ParentObject.Name
+        elem.offset = tuple(obj.RelativePlacement.Base)[:2]
+        elem.angle_offset = obj.RelativePlacement.Rotation.Angle*obj.RelativePlacement.Rotation.Axis[2]
+    elif hasattr(obj, "RelativeParent") and obj.RelativeParent != None:
+        elem.relative = obj.RelativeParent.Name
+        elem.offset = tuple(obj.RelativePlacement.Base)[:2]
+    if _is_optical(obj):
+        proxy = obj.Proxy
+        elem.max_width = proxy.max_width
+        elem.max_angle = radians(proxy.max_angle)
+        if hasattr(proxy, "block_width"):
+            elem.block_width = proxy.block_width
+        elem.transmission = hasattr(proxy, 'transmission')
+        if hasattr(proxy, 'reflection_angle'):
+            elem.reflection_angle = radians(proxy.reflection_angle)
+        if hasattr(proxy, 'diffraction_angle'):
+            elem.diffraction_angle = radians(proxy.diffraction_angle)
+        if hasattr(proxy, 'diffraction_dir'):
+            elem.diffraction_dir = tuple(proxy.diffraction_dir)
+        if hasattr(proxy, 'focal_length'):
+            elem.focal_length = proxy.focal_length
+    return elem
+
+# describe an object placed along a beam as a plain trace placement
+def _placement(obj):
+    place = trace.placement(obj.Name, obj.BeamIndex, pre_refs=obj.PreRefs)
+    if hasattr(obj, "Distance"):
+        place.distance = obj.Distance.Value
+    if hasattr(obj, "xPos"):
+        place.x = obj.xPos.Value
+    if hasattr(obj, "yPos"):
+        place.y = obj.yPos.Value
+    return place
+
+def snapshot(beam_obj):
+    '''
+    Describe everything a beam path can interact with using plain trace descriptors
+
+    Args:
+        beam_obj (obj): The beam path object
+
+    Returns:
+        A trace.tracer for the beam path which does not reference any document objects
+    '''
+    baseplate = beam_obj.Baseplate
+    objs = []
+    for obj in _baseplate_objects(baseplate):
+        if not hasattr(obj, "BasePlacement") or obj == beam_obj:
+            continue
+        if hasattr(obj, "Baseplate") and obj.Baseplate != baseplate:
+            continue
+        objs.append(obj)
+    elements = [_element(obj) for obj in objs]
+    placements = [_placement(obj) for obj in beam_obj.PathObjects]
+    dx, dy = 0, 0
+    if baseplate != None:
+        dx, dy = baseplate.dx.Value, baseplate.dy.Value
+    return trace.tracer(elements, placements, dx, dy, max_segments, z=beam_obj.BasePlacement.Base.z)
+
+def trace_beam_paths(processes=1, beam_paths=None):
+    '''
+    Trace beam paths in the document ahead of a recompute
+
+    Beam paths which share a baseplate or inline components are traced together in
+    document order, and independent groups can be traced in parallel. Each beam path
+    uses its result on its next execute instead of tracing again, as long as nothing
+    optical has changed in between.
+
+    Args:
+        processes (int): The number of worker processes, see trace.trace_groups
+        beam_paths (obj[]): The beam paths which need tracing, defaults to all of them,
+            only the groups containing them are traced
+    '''
+    groups = []
+    keys = []
+    for obj in App.ActiveDocument.Objects:
+        if not (hasattr(obj, "Proxy") and isinstance(obj.Proxy, beam_path)):
+            continue
+        key = {obj.Baseplate.Name if obj.Baseplate != None else None}
+        key.update(i.Name for i in obj.PathObjects)
+        objs = [obj]
+        # merge every group this beam path shares components with
+        for i in reversed(range(len(groups))):
+            if not keys[i].isdisjoint(key):
+                key |= keys.pop(i)
+                objs = groups.pop(i)+objs
+        groups.append(objs)
+        keys.append(key)
+    if beam_paths != None:
+        names = set(i.Name for i in beam_paths)
+        groups = [objs for objs in groups if any(i.Name in names for i in objs)]
+    jobs = [[(obj.Name, snapshot(obj), *_pose(obj)) for obj in objs] for objs in groups]
+    for results in trace.trace_groups(jobs, processes):
+        for name, beams, placed, state in results:
+            App.ActiveDocument.getObject(name).Proxy.traced = (state, beams, placed)
+
+# cylinders along each beam segment, relative to the beam start point and angle
+def _beam_cylinders(beams, radius, x0, y0, a0):
+    shapes = []
+    for i in beams:
+        length = i["length"]
+        if length == 0:
+            length = 50
+        x = (i["x"]-x0)*cos(a0)+(i["y"]-y0)*sin(a0)
+        y = (i["y"]-y0)*cos(a0)-(i["x"]-x0)*sin(a0)
+        a = i["angle"]-a0
+        shapes.append(Part.makeCylinder(radius, length, App.Vector(x, y, 0), App.Vector(cos(a), sin(a), 0)))
+    return shapes
+
+def beam_geometry(beams, width, drill_width, drill, x0, y0, a0):
+    '''
+    Build the display and drill geometry of traced beam segments in one batch
+
+    Args:
+        beams (beam_segments): The traced beam segments
+        width, drill_width (float): The radius of the displayed beam and of the drilled channel
+        drill (bool): Whether to build the drill part
+        x0, y0, a0 (float): The start point and angle of the beam path, which the geometry is relative to
+
+    Returns:
+        comp (Shape): Compound of a cylinder along each segment
+        part (Shape): The drill cylinders fused in a single operation, a null shape when not drilling
+    '''
+    comp = Part.Compound(_beam_cylinders(beams, width, x0, y0, a0))
+    part = Part.Shape()
+    if drill and len(beams) > 0:
+        cylinders = _beam_cylinders(beams, drill_width, x0, y0, a0)
+        part = cylinders[0]
+        if len(cylinders) > 1:
+            part = part.multiFuse(cylinders[1:]).removeSplitter()
+    return comp, part
+
+def clear_trace_cache():
+    '''
+    Forget the cached traces of every beam path in the document
+    '''
+    for obj in App.ActiveDocument.Objects:
+        if hasattr(obj, "Proxy") and isinstance(obj.Proxy, beam_path):
+            obj.Proxy.clear_cache()
 
 # beam path freecad object
 class beam_path:
@@ -133,210 +185,63 @@ class beam_path:
     def __getstate__(self):
         return None
 
+    def clear_cache(self):
+        self.cache = OrderedDict()
+        self.tracer = None
+
     def execute(self, obj):
         # get placement
         self.x, self.y, _ = obj.BasePlacement.Base
         self.a = obj.BasePlacement.Rotation.Angle
         self.a *= obj.BasePlacement.Rotation.Axis[2]
 
-        # calculate beam
-        self.beams = []
-        self.comp_track = []
-        self.calculate_beam_path(obj, self.x, self.y, self.a)
-
-        # draw beam
-        shapes = []
-        for i in self.beams:
-            length = i[3]
-            if length == 0:
-                length = 50
-            temp = Part.makeCylinder(obj.Width.Value, length, App.Vector(i[0], i[1], 0), App.Vector(cos(i[2]), sin(i[2]), 0))
-            shapes.append(temp)
-        comp = Part.Compound(shapes)
+        # reuse the previous result if nothing optical has changed
+        tracer = snapshot(obj)
+        key = (tracer.state_hash(self.x, self.y, self.a), obj.Width.Value, obj.DrillWidth.Value, obj.Drill)
+        if not hasattr(self, "cache"):
+            self.clear_cache()
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.beams, placed, self.comp, shape, drill = self.cache[key]
+            for name, (x, y) in placed.items():
+                App.ActiveDocument.getObject(name).BasePlacement.Base = App.Vector(x, y, 0)
+            obj.Shape = shape
+            if not drill.isNull():
+                drill = drill.copy()
+                drill.Placement = obj.Placement
+            obj.DrillPart = drill
+            self.traced = None
+            return
+
+        # calculate beam, reusing a result from trace_beam_paths if it was traced from this state
+        traced = getattr(self, "traced", None)
+        self.traced = None
+        if traced != None and traced[0] == key[0]:
+            beams, placed = traced[1:]
+        else:
+            # only re-trace from the first segment a changed component touches
+            previous = getattr(self, "tracer", None)
+            if previous != None:
+                beams, placed = tracer.retrace(previous, self.x, self.y, self.a)
+            else:
+                beams, placed = tracer.trace(self.x, self.y, self.a)
+            self.tracer = tracer
+        self.beams = beams
+        for name, (x, y) in placed.items():
+            App.ActiveDocument.getObject(name).BasePlacement.Base = App.Vector(x, y, 0)
+
+        # draw and drill beam
+        comp, part = beam_geometry(self.beams, obj.Width.Value, obj.DrillWidth.Value, obj.Drill, self.x, self.y, self.a)
         self.comp = comp
-        comp.translate(App.Vector(-self.x, -self.y, 0))
-        comp.rotate(App.Vector(0, 0, 0),App.Vector(0, 0, 1), degrees(-self.a))
-        comp = comp.fuse(comp)
         obj.Shape = comp
-
-        part = Part.makeSphere(0)
-        for i in self.beams:
-            length = i[3]
-            if length == 0:
-                length = 50
-            temp = Part.makeCylinder(obj.DrillWidth.Value, length, App.Vector(i[0], i[1], 0), App.Vector(cos(i[2]), sin(i[2]), 0))
-            part = part.fuse(temp)
-
-        part.translate(App.Vector(-self.x, -self.y, 0))
-        part.rotate(App.Vector(0, 0, 0),App.Vector(0, 0, 1), degrees(-self.a))
-        part = part.fuse(part)
-        part.Placement = obj.Placement
+        if not part.isNull():
+            part.Placement = obj.Placement
         obj.DrillPart = part
 
-    # compute full beam path given start point and angle
-    def calculate_beam_path(self, selfobj, x1, y1, a1, beam_index=1):
-        if beam_index > 200:
-            return
-        
-        count = 0 # number of interactions per beam
-        comp_index = 0 # index of current inline component
-        pre_count = 0 # current number interactions since last inline interaction
-        pre_d = 0 # previous interaction distance for inline components
-        block = False # flag for a component obstructing a beam path
-
-        while True:
-            # get all inline components
-            inline_comps = []
-            for obj in selfobj.PathObjects:
-                if obj.BeamIndex == beam_index:
-                    inline_comps.append(obj)
-            
-            # get next inline component
-            inline_obj = None
-            if len(inline_comps) > comp_index:
-                inline_obj = inline_comps[comp_index]
-                if pre_count >= inline_obj.PreRefs:
-                    self.comp_track.append(inline_obj)
-
-                    # handle different constraint methods
-                    if hasattr(inline_obj, "Distance"):
-                        comp_d = inline_obj.Distance.Value
-                    if hasattr(inline_obj, "xPos"):
-                        x_pos = inline_obj.xPos.Value
-                        comp_d = (x_pos-x1)/cos(a1)
-                    if hasattr(inline_obj, "yPos"):
-                        y_pos = inline_obj.yPos.Value
-                        comp_d = (y_pos-y1)/sin(a1)
-
-                    if pre_count > inline_obj.PreRefs:
-                        comp_d -= pre_d # account for previous distance
-
-                    # inline placement
-                    inline_obj.BasePlacement.Base = App.Vector(x1+comp_d*cos(a1), y1+comp_d*sin(a1), 0)
-
-            # get all valid objects
-            check_objs = []
-            for obj in App.ActiveDocument.Objects:
-                if obj in selfobj.PathObjects and not obj in self.comp_track:
-                    continue
-                if hasattr(obj, "ParentObject"):
-                    if obj.ParentObject in selfobj.PathObjects and not obj.ParentObject in self.comp_track:
-                        continue
-                if hasattr(obj, "Baseplate"):
-                    if obj.Baseplate != selfobj.Baseplate:
-                        continue
-                check_objs.append(obj)
-                
-            # find all interactions
-            refs = []
-            comp_d =[]
-            for obj in check_objs:
-                ref = check_interaction(x1, y1, a1, obj)
-                if ref != None:
-                    refs.append(ref)
-                    comp_d.append(sqrt((ref[1]-x1)**2+(ref[2]-y1)**2))
-            
-            # pick nearest valid interaction
-            inline_ref = False
-            if len(refs) > 0:
-                index = np.argmin(comp_d)
-                final_ref = refs[index]
-                min_len = comp_d[index]
-
-                if hasattr(final_ref[0], "ParentObject"):
-                    check_comp = final_ref[0].ParentObject
-                else:
-                    check_comp = final_ref[0]
-
-                if check_comp == inline_obj:
-                    inline_ref = True
-                    comp_index += 1
-                    pre_count = 0
-                    pre_d = 0
-                elif len(inline_comps) > comp_index:
-                    if self.comp_track[-1] == inline_obj:
-                        self.comp_track.pop()
-                    pre_count += 1
-                    if pre_count > inline_obj.PreRefs:
-                        pre_d += min_len
-                
-                ref_obj, xf, yf, af_arr, block = final_ref
-                # restrict beam to baseplate
-                if selfobj.Baseplate.dx != 0 and selfobj.Baseplate.dy != 0:
-                    intersect = []
-                    x_max = selfobj.Baseplate.dx.Value
-                    y_max = selfobj.Baseplate.dy.Value
-                    if x_max < xf:
-                        intersect.append((x_max-x1)/cos(a1))
-                    if y_max < yf:
-                        intersect.append((y_max-y1)/sin(a1))
-                    if xf < 0:
-                        intersect.append((0-x1)/cos(a1))
-                    if yf < 0:
-                        intersect.append((0-y1)/sin(a1))
-                    if len(intersect) > 0 and min_len > min(intersect):
-                        min_len = min(intersect)
-                        block = True
-                self.beams.append([x1, y1, a1, min_len, beam_index])
-            else:
-                # restrict beam to baseplate
-                if selfobj.Baseplate.dx != 0 and selfobj.Baseplate.dy != 0:
-                    intersect = []
-                    xf, yf = x1+500*cos(a1), y1+500*sin(a1) # TODO find a better way than this
-                    x_max = selfobj.Baseplate.dx.Value
-                    y_max = selfobj.Baseplate.dy.Value
-                    if x_max < xf:
-                        intersect.append((x_max-x1)/cos(a1))
-                    if y_max < yf:
-                        intersect.append((y_max-y1)/sin(a1))
-                    if xf < 0:
-                        intersect.append(-(x1-0)/cos(a1))
-                    if yf < 0:
-                        intersect.append(-(y1-0)/sin(a1))
-                    self.beams.append([x1, y1, a1, min(intersect), beam_index])
-                return
-            
-            if block:
-                return
+        self.cache[key] = (self.beams, placed, self.comp, comp, part)
+        while len(self.cache) > trace_cache_size:
+            self.cache.popitem(last=False)
 
-            # handle recursion issues caused by conflicting beam paths
-            if inline_ref:
-                for i in self.beams[:]:
-                    if i[4] != beam_index:
-                        ref = check_interaction(i[0],i[1],i[2],ref_obj)
-                        if ref != None:
-                            beam_d = sqrt((ref[1]-i[0])**2+(ref[2]-i[1])**2)
-                            if beam_d > i[3] or isclose(beam_d, i[3], rel_tol=1e-3):
-                                continue
-                            for beam in self.beams[::-1]:
-                                if beam[4]>>int(abs(log2(beam[4]/i[4]))) == i[4]:
-                                    last = beam[:]
-                                    self.beams.remove(beam)
-                            for comp in self.comp_track[:]:
-                                if comp.BeamIndex>>int(abs(log2(comp.BeamIndex/i[4]))) == i[4]:
-                                    comp.BasePlacement.Base = App.Vector(0, 0, 0)
-                                    self.comp_track.remove(comp)
-                            self.calculate_beam_path(selfobj, last[0], last[1], last[2], last[4])
-                            break
-            
-            # compute next beam and handle recursion for beam splits
-            if af_arr[0] != None and af_arr[1] != None:
-                self.calculate_beam_path(selfobj, xf, yf, af_arr[0], (beam_index<<1))
-                beam_index = (beam_index<<1)+1
-                inline_comps = []
-                for obj in selfobj.PathObjects:
-                    if obj.BeamIndex == beam_index:
-                        inline_comps.append(obj)
-                comp_index = 0
-            if af_arr[1] != None:
-                x1, y1, a1 = xf, yf, af_arr[1]
-                count += 1
-            elif af_arr[0] != None:
-                x1, y1, a1 = xf, yf, af_arr[0]
-                count += 1
-            else:
-                return
-                
 
 '''
 try:
@@ -354,7 +259,6 @@ class ViewProvider:
         """Initialize the view provider with a safe object reference."""
         obj.Proxy = self
         self.Object = None  # Initialize as None, will be set later if available
-        self.needs_recompute = False  # Flag to track recompute necessity
         if has_gui and hasattr(obj, 'Object') and obj.Object:
             self.Object = obj.Object
         else:
@@ -395,19 +299,21 @@ class ViewProvider:
                 print("Warning: updateData called with no GUI or Object available.", flush=True)
                 return
 
+        if recompute.defer(self, obj, prop):
+            return
         if has_gui and str(prop) == "BasePlacement":
             if hasattr(obj, 'Baseplate') and obj.Baseplate is not None:
                 try:
                     obj.Placement.Base = obj.BasePlacement.Base + obj.Baseplate.Placement.Base
                     obj.Placement = App.Placement(obj.Placement.Base, obj.Baseplate.Placement.Rotation, -obj.BasePlacement.Base)
                     obj.Placement.Rotation = obj.Placement.Rotation.multiply(obj.BasePlacement.Rotation)
-                    self.needs_recompute = True  # Mark for recompute
+                    recompute.mark(obj)
                 except AttributeError as e:
                     print(f"Warning: Placement update failed: {e}", flush=True)
             else:
                 if hasattr(obj, 'BasePlacement'):
                     obj.Placement = obj.BasePlacement
-                    self.needs_recompute = True  # Mark for recompute
+                    recompute.mark(obj)
             if hasattr(obj, "ChildObjects"):
                 for child in obj.ChildObjects:
                     if hasattr(child, 'BasePlacement') and hasattr(child, 'RelativePlacement'):
@@ -417,24 +323,18 @@ class ViewProvider:
                         else:
                             child.BasePlacement = App.Placement(child.BasePlacement.Base, obj.BasePlacement.Rotation, -child.RelativePlacement.Base)
                             child.BasePlacement.Rotation = child.BasePlacement.Rotation.multiply(child.RelativePlacement.Rotation)
-                        self.needs_recompute = True  # Mark for recompute
+                        recompute.mark(child)
             if hasattr(obj, "RelativeObjects"):
                 for child in obj.RelativeObjects:
                     if hasattr(child, 'BasePlacement') and hasattr(child, 'RelativePlacement'):
                         child.BasePlacement.Base = obj.BasePlacement.Base + child.RelativePlacement.Base
-                        self.needs_recompute = True  # Mark for recompute
+                        recompute.mark(child)
         elif has_gui and str(prop) == "Angle":
             if hasattr(obj, 'BasePlacement'):
                 obj.BasePlacement.Rotation = App.Rotation(App.Vector(0, 0, 1), obj.Angle)
-                self.needs_recompute = True  # Mark for recompute
+                recompute.mark(obj)
         return
 
-    def onChanged(self, vp, prop):
-        """Handle property changes to trigger recompute if needed."""
-        if has_gui and prop == "needs_recompute" and self.needs_recompute:
-            App.ActiveDocument.recompute()
-            self.needs_recompute = False  # Reset flag
-
     def claimChildren(self):
         """Safely claim child objects, returning an empty list if Object is unavailable."""
         if has_gui and hasattr(self, 'Object') and self.Object and hasattr(self.Object, "ChildObjects"):
@@ -1,12 +1,14 @@
+import itertools
+import time
+from collections import OrderedDict
 from pathlib import Path
 
-import Draft
 import FreeCAD as App
 import Mesh
 import MeshPart
 import Part
 
-from . import laser, optomech
+from . import features, laser, optomech, recompute
 
 inch = 25.4
 
@@ -53,6 +55,7 @@ class baseplate:
         invert_label (bool): Whether to switch the face the label is embossed on
     '''
     def __init__(self, dx=0, dy=0, dz=inch, x=0, y=0, angle=0, gap=0, name="Baseplate", drill=True, mount_holes=[], label="", x_offset=0, y_offset=0, optics_dz=inch/2, x_splits=[], y_splits=[], invert_label=False, z=0):
+        recompute.install() # components placed on the baseplate are recomputed in batches as they move
         obj = App.ActiveDocument.addObject('Part::FeaturePython', name)
         ViewProvider(obj.ViewObject)
         obj.Proxy = self
@@ -287,6 +290,13 @@ class baseplate:
         obj.addProperty("App::PropertyLinkListHidden","PathObjects").PathObjects
         obj.ViewObject.ShapeColor = color
         return obj
+
+    def __getstate__(self):
+        # the drill state holds shapes and is rebuilt by the first drill after loading
+        return {k: v for k, v in self.__dict__.items() if k != "drill_state"}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
     
     def execute(self, obj):
         if obj.dx == 0 and obj.dy == 0:
@@ -295,7 +305,7 @@ class baseplate:
                     if hasattr(i, "Shape"):
                         obj_body = i.Shape.copy()
                     elif hasattr(i, "Mesh"):
-                        obj_body = i.Mesh.copy()
+                        obj_body = optomech.instance_mesh(i)
                     else:
                         obj_body = i
                     if hasattr(obj_body, "BoundBox") and hasattr(i, "BasePlacement"):
@@ -321,27 +331,182 @@ class baseplate:
             for i in obj.ySplits:
                 part = part.cut(Part.makeBox(obj.dx.Value-2*obj.Gap.Value, 2*obj.Gap.Value, obj.dz.Value, 
                                             App.Vector(obj.Gap.Value+obj.xOffset.Value, i-obj.Gap.Value+obj.yOffset.Value, -obj.dz.Value-obj.OpticsDz.Value)))
-        if obj.Drill:
-            for i in App.ActiveDocument.Objects:
-                if hasattr(i, 'DrillPart'):
-                    if not i.DrillPart.isNull() and i.Drill and i.Baseplate == obj:
-                        drill = i.DrillPart.copy()
-                        drill.Placement = obj.Placement.inverse()*drill.Placement
-                        part = part.cut(drill)
+        labels = []
         if obj.CutLabel != "":
-            face = Draft.make_shapestring(obj.CutLabel, str(Path(__file__).parent.resolve()) + "/font/OpenSans-Regular.ttf", 5)
             if obj.InvertLabel:
-                face.Placement.Base = App.Vector(obj.Gap.Value+obj.xOffset.Value, obj.dy.Value+obj.yOffset.Value-obj.Gap.Value-2, -obj.OpticsDz.Value-6)
-                face.Placement.Rotation = App.Rotation(App.Vector(0, 0, 1), -90)*App.Rotation(App.Vector(1, 0, 0), 90)
-                text = face.Shape.extrude(App.Vector(0.5, 0, 0))
+                labels.append(label_solid(obj.CutLabel, 5, App.Vector(obj.Gap.Value+obj.xOffset.Value, obj.dy.Value+obj.yOffset.Value-obj.Gap.Value-2, -obj.OpticsDz.Value-6),
+                                          App.Rotation(App.Vector(0, 0, 1), -90)*App.Rotation(App.Vector(1, 0, 0), 90), App.Vector(0.5, 0, 0)))
             else:
-                face.Placement.Base = App.Vector(obj.Gap.Value+obj.xOffset.Value+2, obj.Gap.Value+obj.yOffset.Value, -obj.OpticsDz.Value-6)
-                face.Placement.Rotation = App.Rotation(App.Vector(1, 0, 0), 90)
-                text = face.Shape.extrude(App.Vector(0, 0.5, 0))
-            part = part.cut(text)
-            App.ActiveDocument.removeObject(face.Label)
+                labels.append(label_solid(obj.CutLabel, 5, App.Vector(obj.Gap.Value+obj.xOffset.Value+2, obj.Gap.Value+obj.yOffset.Value, -obj.OpticsDz.Value-6),
+                                          App.Rotation(App.Vector(1, 0, 0), 90), App.Vector(0, 0.5, 0)))
+        if obj.Drill:
+            # the label is engraved in the same cut as the drill tools
+            blank_key = tuple(optomech._shape_value(getattr(obj, i)) for i in _blank_properties)
+            part = _drill(obj, part, blank_key, _drill_sources(obj), labels)
+        else:
+            part = optomech._cut_tools(part, labels)
         obj.Shape = part.removeSplitter()
 
+# engraved text solids, unplaced and extruded in the text's own frame
+label_font = str(Path(__file__).parent.resolve()) + "/font/OpenSans-Regular.ttf"
+label_cache_size = 64 # number of text solids to keep
+_label_cache = OrderedDict()
+
+def clear_label_cache():
+    _label_cache.clear()
+
+def label_solid(text, size, base, rotation, extrude, font=label_font):
+    '''
+    Get the solid of an engraved label without creating a shape string object
+
+    Args:
+        text (string): The label text
+        size (float): The height of the text
+        base (Vector): The placement of the text origin
+        rotation (Rotation): The orientation of the text
+        extrude (Vector): The engraving depth and direction
+        font (string): Path to the font file
+
+    Returns:
+        The placed text solid
+    '''
+    local = rotation.inverted().multVec(extrude)
+    key = (text, font, size, tuple(round(i, 9) for i in local))
+    if key in _label_cache:
+        _label_cache.move_to_end(key)
+    else:
+        faces = []
+        for char in Part.makeWireString(text, font, size):
+            if len(char) > 0:
+                faces += Part.makeFace(char, "Part::FaceMakerBullseye").Faces
+        _label_cache[key] = Part.makeCompound(faces).extrude(local) if len(faces) > 0 else Part.Shape()
+        while len(_label_cache) > label_cache_size:
+            _label_cache.popitem(last=False)
+    if _label_cache[key].isNull():
+        return Part.Shape()
+    solid = _label_cache[key].copy()
+    solid.Placement = App.Placement(base, rotation)
+    return solid
+
+def drill_tools(baseplate):
+    '''
+    Collect the drill parts of every component drilled into a baseplate
+
+    Args:
+        baseplate (obj): The baseplate object
+
+    Returns:
+        The drill parts placed relative to the baseplate
+    '''
+    return [drill for _, drill in _drill_sources(baseplate)]
+
+# drill parts with the names of their components, sharing geometry with the DrillPart properties
+def _drill_sources(baseplate):
+    sources = []
+    for i in baseplate.InList:
+        if hasattr(i, 'DrillPart') and getattr(i, "Baseplate", None) == baseplate:
+            if not i.DrillPart.isNull() and i.Drill:
+                drill = i.DrillPart
+                drill.Placement = baseplate.Placement.inverse()*drill.Placement
+                sources.append((i.Name, drill))
+    return sources
+
+# drilled solid of each baseplate and the tools that produced it, so later drills only redo what changed
+drill_rebuild_ratio = 0.5 # fraction of changed tools above which a plate is drilled from scratch
+_blank_properties = ["dx", "dy", "dz", "Gap", "xOffset", "yOffset", "OpticsDz", "xSplits", "ySplits", "CutLabel", "InvertLabel"]
+_drill_versions = itertools.count()
+
+def clear_drill_cache(doc=None):
+    doc = doc or App.ActiveDocument
+    for i in doc.Objects:
+        if isinstance(getattr(i, "Proxy", None), baseplate):
+            i.Proxy.drill_state = None
+
+# key each tool by its component, its placement on the plate and a version counted up whenever
+# the component sets a new drill part, which is found by comparing the shared geometry
+def _tool_keys(sources, versions):
+    tools, seen = {}, {}
+    for name, drill in sources:
+        version = versions.get(name)
+        if version == None or not version[0].isPartner(drill):
+            version = (drill, next(_drill_versions))
+        seen[name] = version
+        tools[(name, optomech._shape_value(drill.Placement), version[1])] = drill
+    return tools, seen
+
+# box around a tool, slightly larger so refilling it covers the whole hole
+def _tool_region(tool):
+    bound = App.BoundBox(tool.BoundBox)
+    bound.enlarge(0.01)
+    return Part.makeBox(bound.XLength, bound.YLength, bound.ZLength, App.Vector(bound.XMin, bound.YMin, bound.ZMin))
+
+def _drill(obj, blank, blank_key, sources, labels=[]):
+    '''
+    Drill a baseplate, refilling and re-cutting only the regions of tools added, removed or moved since the last drill
+
+    Args:
+        obj (obj): The baseplate object
+        blank (Shape): The undrilled baseplate solid
+        blank_key (tuple): The properties the blank and labels are built from
+        sources (tuple[]): The component name and drill part placed relative to the baseplate of each tool
+        labels (Shape[]): Label solids engraved in the same cut
+
+    Returns:
+        The drilled solid
+    '''
+    state = getattr(obj.Proxy, "drill_state", None)
+    tools, versions = _tool_keys(sources, state["versions"] if state != None else {})
+    tools.update((("label", i), label) for i, label in enumerate(labels))
+    part = None
+    if state != None and state["blank"] == blank_key:
+        removed = [tool for k, tool in state["tools"].items() if k not in tools]
+        added = [tool for k, tool in tools.items() if k not in state["tools"]]
+        if len(removed)+len(added) <= drill_rebuild_ratio*len(tools):
+            part = state["part"]
+            if len(removed) > 0:
+                regions = [_tool_region(i) for i in removed]
+                region = regions[0].multiFuse(regions[1:]) if len(regions) > 1 else regions[0]
+                bound = region.BoundBox
+                patch = blank.common(region)
+                patch = optomech._cut_tools(patch, [i for i in tools.values() if i.BoundBox.intersect(bound)])
+                part = part.fuse(patch)
+            part = optomech._cut_tools(part, added)
+    if part == None:
+        part = _drill_features(blank, tools)
+    obj.Proxy.drill_state = {"blank":blank_key, "tools":tools, "versions":versions, "part":part}
+    return part
+
+# drill from scratch, extruding 2.5D hole and pocket features and cutting only the remaining tools as solids
+def _drill_features(blank, tools):
+    found, rest = [], []
+    for h, tool in tools.items():
+        feats = features.extract(tool, h)
+        if feats == None:
+            rest.append(tool)
+        else:
+            found += feats
+    part = features.drill(blank, found) if len(found) > 0 else None
+    if part == None:
+        return optomech._cut_tools(blank, list(tools.values()))
+    return optomech._cut_tools(part, rest)
+
+def drill_features(baseplate):
+    '''
+    Get the 2.5D features drilled into a baseplate, for hole tables and machining exports
+
+    Args:
+        baseplate (obj): The baseplate object
+
+    Returns:
+        The hole and pocket features of every drill part that can be described by them
+    '''
+    state = getattr(baseplate.Proxy, "drill_state", None)
+    tools, _ = _tool_keys(_drill_sources(baseplate), state["versions"] if state != None else {})
+    found = []
+    for key, tool in tools.items():
+        found += features.extract(tool, key) or []
+    return found
+
 def place_element_on_table(name, obj_class, x, y, angle, z=0, **args):
         '''
         Place an element at a fixed coordinate on the baseplate
@@ -426,30 +591,25 @@ class baseplate_cover:
         temp.Placement = obj.Placement
         obj.DrillPart = temp
 
+        tools = []
         if obj.Drill:
             for i in App.ActiveDocument.Objects:
-                if isinstance(i.Proxy, laser.beam_path) and i.Baseplate == baseplate:
+                if hasattr(i, "Proxy") and isinstance(i.Proxy, laser.beam_path) and i.Baseplate == baseplate:
                     exploded = i.Proxy.comp.Solids
                     for shape in exploded:
                         drill = optomech._bounding_box(shape, obj.BeamTol.Value, obj.BeamTol.Value, z_tol=True, plate_off=-1)
                         #drill.Placement = i.Placement
-                        part = part.cut(drill)
-                        print("running")
-        obj.Shape = part
-
+                        tools.append(drill)
 
         if baseplate.CutLabel != "":
-            face = Draft.make_shapestring(baseplate.CutLabel, str(Path(__file__).parent.resolve()) + "/font/OpenSans-Regular.ttf", 1)
+            # the label is engraved in the same cut as the beam drills
             if baseplate.InvertLabel:
-                face.Placement.Base = App.Vector(baseplate.Gap.Value, baseplate.dy.Value-baseplate.Gap.Value-2, -baseplate.OpticsDz.Value-6)
-                face.Placement.Rotation = App.Rotation(App.Vector(0, 0, 1), -90)*App.Rotation(App.Vector(1, 0, 0), 90)
-                text = face.Shape.extrude(App.Vector(0.5, 0, 0))
+                tools.append(label_solid(baseplate.CutLabel, 1, App.Vector(baseplate.Gap.Value, baseplate.dy.Value-baseplate.Gap.Value-2, -baseplate.OpticsDz.Value-6),
+                                         App.Rotation(App.Vector(0, 0, 1), -90)*App.Rotation(App.Vector(1, 0, 0), 90), App.Vector(0.5, 0, 0)))
             else:
-                face.Placement.Base = App.Vector(baseplate.Gap.Value+2, baseplate.Gap.Value, -baseplate.OpticsDz.Value-6)
-                face.Placement.Rotation = App.Rotation(App.Vector(1, 0, 0), 90)
-                text = face.Shape.extrude(App.Vector(0, 0.5, 0))
-            part = part.cut(text)
-            App.ActiveDocument.removeObject(face.Label)
+                tools.append(label_solid(baseplate.CutLabel, 1, App.Vector(baseplate.Gap.Value+2, baseplate.Gap.Value, -baseplate.OpticsDz.Value-6),
+                                         App.Rotation(App.Vector(1, 0, 0), 90), App.Vector(0, 0.5, 0)))
+        part = optomech._cut_tools(part, tools)
         obj.Shape = part.removeSplitter()
 
 
@@ -516,12 +676,187 @@ class table_no_grid:
         obj.Shape = part
             
 # Update function for dynamic elements
-def redraw():
-    for class_type in [laser.beam_path, baseplate, baseplate_cover, baseplate]:
-        for i in App.ActiveDocument.Objects:
-            if hasattr(i, "Proxy") and isinstance(i.Proxy, class_type):
-                i.touch()
-        App.ActiveDocument.recompute()
+redraw_stages = ["beam paths", "components", "covers", "baseplates"]
+
+# redraw stage of an object, or None for objects left to the document recompute
+def _redraw_stage(obj):
+    if not hasattr(obj, "Proxy"):
+        return None
+    if isinstance(obj.Proxy, laser.beam_path):
+        return 0
+    if isinstance(obj.Proxy, baseplate_cover):
+        return 2
+    if isinstance(obj.Proxy, baseplate):
+        return 3
+    if hasattr(obj, "Baseplate") or hasattr(obj, "DrillPart"):
+        return 1
+    return None
+
+# objects ordered so everything they link to within the list comes first
+def _topological(objs):
+    members = set(i.Name for i in objs)
+    order, seen = [], set()
+    def visit(obj):
+        if obj.Name in seen:
+            return
+        seen.add(obj.Name)
+        for dep in obj.OutList:
+            if dep.Name in members:
+                visit(dep)
+        order.append(obj)
+    for obj in objs:
+        visit(obj)
+    return order
+
+def redraw(processes=1, verbose=True):
+    '''
+    Recompute beam paths, components, covers and baseplates once each in dependency order,
+    skipping those which nothing has changed
+
+    Args:
+        processes (int): Number of processes to trace beam paths with, see trace.trace_groups
+        verbose (bool): Whether to print the time spent in each stage
+
+    Returns:
+        A dict of the time spent and number of objects recomputed in each stage
+    '''
+    # placements written while redrawing are covered by the redraw itself, not by the recompute queue
+    recompute.hold()
+    try:
+        return _redraw(processes, verbose)
+    finally:
+        recompute.release(False)
+
+def _redraw(processes, verbose):
+    doc = App.ActiveDocument
+    stages = [[] for _ in redraw_stages]
+    for obj in doc.Objects:
+        stage = _redraw_stage(obj)
+        if stage != None:
+            stages[stage].append(obj)
+    touched = set(i.Name for i in doc.Objects if i.isTouched())
+    plates = set(getattr(doc.getObject(i), "Baseplate", None) for i in touched)
+    plates = set(i.Name for i in plates if i != None) | set(i.Name for i in stages[3] if i.Name in touched)
+    recomputed = set()
+    timings = {}
+
+    def run(obj):
+        obj.recompute()
+        recomputed.add(obj.Name)
+
+    def dirty(obj, stage):
+        if obj.isTouched():
+            return True
+        baseplate = getattr(obj, "Baseplate", None)
+        if stage == 0:
+            return baseplate != None and baseplate.Name in plates
+        if stage == 1:
+            return any(i.Name in recomputed for i in obj.OutList)
+        if stage == 2:
+            return baseplate != None and (baseplate.Name in plates or any(i.Name in recomputed and getattr(i, "Baseplate", None) == baseplate for i in stages[0]))
+        return any(i.Name in recomputed for i in obj.InList)
+
+    for stage, name in enumerate(redraw_stages):
+        start = time.perf_counter()
+        count = len(recomputed)
+        todo = [i for i in _topological(stages[stage]) if dirty(i, stage)] if stage != 1 else _topological(stages[stage])
+        if stage == 0 and len(todo) > 0:
+            laser.trace_beam_paths(processes, todo)
+        for obj in todo:
+            # components become dirty as earlier ones (and beam paths) write their placements
+            if stage != 1 or dirty(obj, stage):
+                if stage == 3:
+                    size = (obj.dx.Value, obj.dy.Value, obj.xOffset.Value, obj.yOffset.Value)
+                run(obj)
+                if stage == 3 and size != (obj.dx.Value, obj.dy.Value, obj.xOffset.Value, obj.yOffset.Value):
+                    # autosizing changed the plate, so its covers and then the plate itself are redrawn
+                    covers = [i for i in stages[2] if getattr(i, "Baseplate", None) == obj]
+                    for cover in covers:
+                        run(cover)
+                    if len(covers) > 0:
+                        run(obj)
+        timings[name] = (time.perf_counter()-start, len(recomputed)-count)
+    start = time.perf_counter()
+    doc.recompute()
+    timings["document"] = (time.perf_counter()-start, 0)
+    if verbose:
+        print("Redraw: " + ", ".join("%s %.2fs (%d)"%(name, t, n) for name, (t, n) in timings.items()), flush=True)
+    return timings
+
+_bulk_builds = 0 # number of bulk builds entered and not yet exited
+
+def building():
+    '''
+    Check whether a bulk build is active, in which case whoever started it redraws the document
+    once it exits, so scripts can skip their own recomputes and saves
+
+    Returns:
+        True while inside a bulk_build context
+    '''
+    return _bulk_builds > 0
+
+class bulk_build:
+    '''
+    Context for design scripts placing many elements, which defers view provider updates,
+    recomputes and undo recording until it exits and then redraws once
+
+    Args:
+        redraw (bool): Whether to redraw the document on exit
+        processes (int): Number of processes to trace beam paths with when redrawing
+    '''
+    def __init__(self, redraw=True, processes=1):
+        self.redraw = redraw
+        self.processes = processes
+
+    def __enter__(self):
+        global _bulk_builds
+        self.doc = App.ActiveDocument
+        self.undo_mode = self.doc.UndoMode
+        self.doc.UndoMode = 0 # also makes the transactions opened by components no-ops
+        recompute.hold()
+        recompute.defer_updates()
+        _bulk_builds += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _bulk_builds
+        _bulk_builds -= 1
+        try:
+            recompute.replay_updates()
+        finally:
+            self.doc.UndoMode = self.undo_mode
+            recompute.release(False)
+        if exc_type == None and self.redraw:
+            redraw(self.processes)
+
+def plate_objects(plate):
+    '''
+    Get the objects placed on a baseplate, found through the links they hold to it
+
+    Args:
+        plate (obj): The baseplate object
+
+    Returns:
+        The objects with a BasePlacement on the baseplate
+    '''
+    return [i for i in plate.InList if hasattr(i, "BasePlacement") and getattr(i, "Baseplate", None) == plate]
+
+def propagate_placement(plate):
+    '''
+    Move the objects of a baseplate with it, only rewriting placements which changed
+
+    Args:
+        plate (obj): The baseplate object
+    '''
+    for obj in plate_objects(plate):
+        try:
+            # baseplate placement composed with the object's placement on the plate
+            placement = App.Placement(obj.BasePlacement.Base + plate.Placement.Base, plate.Placement.Rotation, -obj.BasePlacement.Base)
+            placement.Rotation = placement.Rotation.multiply(obj.BasePlacement.Rotation)
+            if not obj.Placement.isSame(placement, 1e-9):
+                obj.Placement = placement
+        except AttributeError as e:
+            print(f"Warning: Placement update failed for {obj.Label}: {e}", flush=True)
 
 def show_components(state):
     for i in App.ActiveDocument.Objects:
@@ -530,6 +865,8 @@ def show_components(state):
                 i.ViewObject.show()
             else:
                 i.ViewObject.hide()
+            if getattr(i, "Instance", None) != None:
+                i.Instance.Visibility = state
 
 
 class ViewProvider:
@@ -563,17 +900,11 @@ class ViewProvider:
                 print("Warning: updateData called with no Object available.", flush=True)
                 return
 
-        for obj in App.ActiveDocument.Objects:
-            if hasattr(obj, "BasePlacement") and hasattr(obj, "Baseplate") and obj.Baseplate is not None:
-                try:
-                    # Compute the new placement base
-                    placement_base = obj.BasePlacement.Base + obj.Baseplate.Placement.Base
-                    # Update placement with baseplate rotation and offset
-                    obj.Placement = App.Placement(placement_base, obj.Baseplate.Placement.Rotation, -obj.BasePlacement.Base)
-                    # Combine rotations
-                    obj.Placement.Rotation = obj.Placement.Rotation.multiply(obj.BasePlacement.Rotation)
-                except AttributeError as e:
-                    print(f"Warning: Placement update failed for {obj.Label}: {e}", flush=True)
+        if recompute.defer(self, base_obj, prop):
+            return
+        # a recomputed shape also places objects added to the plate since it last moved
+        if str(prop) in ["Placement", "Shape"] and hasattr(base_obj, "Proxy") and isinstance(base_obj.Proxy, baseplate):
+            propagate_placement(base_obj)
         return
 
     def onDelete(self, feature, subelements):
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+stl_path = str(Path(__file__).parent.resolve()) + "/stl/"
+store_path = str(Path(__file__).parent.resolve()) + "/stl_store/"
+
+_stl_dtype = np.dtype([("normal", "<f4", (3,)), ("points", "<f4", (3, 3)), ("attr", "<u2")])
+_manifest = None
+
+def _hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1<<20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_stl(path):
+    '''
+    Read the triangles of a binary or ascii STL file without FreeCAD
+
+    Args:
+        path (string): Path to the STL file
+
+    Returns:
+        A float32 array of shape (triangles, 3, 3)
+    '''
+    data = Path(path).read_bytes()
+    if len(data) >= 84:
+        count = int(np.frombuffer(data, "<u4", 1, 80)[0])
+        if len(data) == 84+count*_stl_dtype.itemsize:
+            return np.frombuffer(data, _stl_dtype, count, 84)["points"].copy()
+    vertices = [line.split()[1:4] for line in data.decode(errors="ignore").splitlines() if line.strip().startswith("vertex")]
+    return np.array(vertices, dtype=np.float32).reshape(-1, 3, 3)
+
+def _index(triangles):
+    # deduplicate the vertices of a triangle soup
+    points, facets = np.unique(triangles.reshape(-1, 3), axis=0, return_inverse=True)
+    return points, facets.reshape(-1, 3).astype(np.int32)
+
+# write a file next to its final path and move it into place, so other processes never map it half written
+def _write_atomic(path, write, mode="wb"):
+    temp = "%s.%d.tmp"%(path, os.getpid())
+    with open(temp, mode) as f:
+        write(f)
+    os.replace(temp, path)
+
+def _files(stl_name):
+    name = os.path.splitext(stl_name)[0]
+    return store_path+name+".points.npy", store_path+name+".facets.npy"
+
+def _load_manifest():
+    global _manifest
+    if _manifest == None:
+        try:
+            with open(store_path+"manifest.json") as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+def _save_manifest():
+    os.makedirs(store_path, exist_ok=True)
+    _write_atomic(store_path+"manifest.json", lambda f: json.dump(_manifest, f, indent=1, sort_keys=True), "w")
+
+def build_entry(stl_name, save=True):
+    '''
+    Convert a library STL into the store
+
+    Args:
+        stl_name (string): File name of the STL in the library
+        save (bool): Whether to write the manifest afterwards
+    '''
+    source = stl_path+stl_name
+    points, facets = _index(read_stl(source))
+    os.makedirs(store_path, exist_ok=True)
+    points_file, facets_file = _files(stl_name)
+    _write_atomic(points_file, lambda f: np.save(f, points))
+    _write_atomic(facets_file, lambda f: np.save(f, facets))
+    stat = os.stat(source)
+    _load_manifest()[stl_name] = {
+        "sha256": _hash(source),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "triangles": len(facets),
+        "points": len(points),
+        "bound": points.min(axis=0).tolist()+points.max(axis=0).tolist() if len(points) > 0 else [0]*6,
+    }
+    if save:
+        _save_manifest()
+
+def build(names=None):
+    '''
+    Convert every library STL whose store entry is missing or stale
+
+    Args:
+        names (string[]): The STL files to convert, defaults to the whole library
+    '''
+    if names == None:
+        names = sorted(i for i in os.listdir(stl_path) if i.lower().endswith(".stl"))
+    for stl_name in names:
+        if _stale(stl_name):
+            build_entry(stl_name, save=False)
+    _save_manifest()
+
+def _stale(stl_name):
+    entry = _load_manifest().get(stl_name)
+    if entry == None or not all(os.path.exists(i) for i in _files(stl_name)):
+        return True
+    stat = os.stat(stl_path+stl_name)
+    if (stat.st_size, stat.st_mtime) == (entry["size"], entry["mtime"]):
+        return False
+    # touched but possibly unchanged, fall back to the content hash
+    if stat.st_size == entry["size"] and _hash(stl_path+stl_name) == entry["sha256"]:
+        entry["mtime"] = stat.st_mtime
+        _save_manifest()
+        return False
+    return True
+
+def info(stl_name):
+    '''
+    Get the manifest entry of a library STL, building it if needed
+
+    Args:
+        stl_name (string): File name of the STL in the library
+
+    Returns:
+        A dict with the source hash, triangle and point counts and the bounding box
+    '''
+    if _stale(stl_name):
+        build_entry(stl_name)
+    return _load_manifest()[stl_name]
+
+def load(stl_name):
+    '''
+    Memory map the indexed mesh of a library STL, rebuilding a stale entry first
+
+    Args:
+        stl_name (string): File name of the STL in the library
+
+    Returns:
+        points (float32[][3]): The unique vertices of the mesh
+        facets (int32[][3]): The vertex indices of each triangle
+    '''
+    if _stale(stl_name):
+        build_entry(stl_name)
+    points_file, facets_file = _files(stl_name)
+    try:
+        return np.load(points_file, mmap_mode="r"), np.load(facets_file, mmap_mode="r")
+    except ValueError:
+        # damaged or left over from an interrupted build, so it is stale
+        build_entry(stl_name)
+        return np.load(points_file, mmap_mode="r"), np.load(facets_file, mmap_mode="r")
+
+if __name__ == "__main__":
+    build(sys.argv[1:] or None)
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+import hashlib
 from math import *
 from pathlib import Path
 import time
@@ -6,7 +8,7 @@ import Mesh
 import numpy as np
 import Part
 
-from . import layout
+from . import layout, meshstore, recompute
 
 stl_path = str(Path(__file__).parent.resolve()) + "/stl/"
 drill_depth = 100
@@ -39,21 +41,403 @@ mount_color = (0.5, 0.5, 0.55)
 glass_color = (0.5, 0.5, 0.8)
 misc_color = (0.2, 0.2, 0.2)
 
-# Used to tranform an STL such that it's placement matches the optical center
-def _import_stl(stl_name, rotate, translate, scale=1):
-    mesh = Mesh.read(stl_path+stl_name)
+# parsed and transformed meshes shared between _import_stl calls
+stl_cache_size = 512*1024**2 # approximate bytes of mesh data to keep
+stl_cache_stats = {"hits":0, "misses":0, "bytes":0}
+_stl_cache = OrderedDict()
+
+# approximate memory held by a mesh kernel (points plus facets with neighbour indices)
+def _mesh_bytes(mesh):
+    return mesh.CountPoints*16+mesh.CountFacets*28
+
+def clear_stl_cache():
+    _stl_cache.clear()
+    stl_cache_stats.update(hits=0, misses=0, bytes=0)
+
+# build a library mesh from its memory mapped store entry, parsing the STL if the store is unavailable
+def _read_stl(stl_name):
+    try:
+        points, facets = meshstore.load(stl_name)
+    except (OSError, ValueError):
+        return Mesh.read(stl_path+stl_name)
+    # the indexed form of addFacets takes the deduplicated topology as is, but only as vectors and tuples
+    mesh = Mesh.Mesh()
+    mesh.addFacets(([App.Vector(*i) for i in points.tolist()], [tuple(i) for i in facets.tolist()]))
+    return mesh
+
+# mesh detail levels for library components, "Document" follows the document setting
+detail_levels = ["Document", "Full", "Decimated", "Proxy"]
+decimate_tolerance = 0.5 # maximum deviation of the decimated level
+decimate_reduction = 0.9 # fraction of triangles removed for the decimated level
+_detail = None # detail level of the component currently executing
+_force_full = False
+_imports = None # library meshes imported by the component currently executing
+
+def document_detail(doc=None):
+    '''
+    Get the mesh detail level used by components which follow the document setting
+    '''
+    doc = doc or App.ActiveDocument
+    if doc == None:
+        return "Full"
+    return doc.Meta.get("PyOpticLDetail", "Full")
+
+def set_detail(level, obj=None):
+    '''
+    Set the mesh detail level of library components
+
+    Args:
+        level (string): One of detail_levels
+        obj (obj): A single component to set, or None to set the level of the active document
+    '''
+    if level not in detail_levels:
+        raise ValueError("Unknown detail level '%s'"%level)
+    if obj != None:
+        if not hasattr(obj, "DetailLevel"):
+            obj.addProperty("App::PropertyEnumeration", "DetailLevel").DetailLevel = detail_levels
+        obj.DetailLevel = level
+        obj.touch()
+        return
+    if level == "Document":
+        raise ValueError("The document detail level must be 'Full', 'Decimated' or 'Proxy'")
+    doc = App.ActiveDocument
+    meta = doc.Meta
+    meta["PyOpticLDetail"] = level
+    doc.Meta = meta
+    for i in doc.Objects:
+        if i.TypeId == 'Mesh::FeaturePython':
+            i.touch()
+
+def _detail_level(obj):
+    if _force_full:
+        return "Full"
+    level = getattr(obj, "DetailLevel", "Document")
+    if level == "Document":
+        level = document_detail(obj.Document)
+    return level
+
+class full_detail:
+    '''
+    Context in which every library component is rebuilt at full detail, such as for exporting
+    '''
+    def __enter__(self):
+        global _force_full
+        _force_full = True
+        self._touch()
+
+    def __exit__(self, *args):
+        global _force_full
+        _force_full = False
+        self._touch()
+
+    def _touch(self):
+        changed = False
+        for i in App.ActiveDocument.Objects:
+            if i.TypeId == 'Mesh::FeaturePython' and getattr(i, "DetailLevel", "Document") != "Full":
+                if getattr(i, "DetailLevel", "Document") != "Document" or document_detail() != "Full":
+                    i.touch()
+                    changed = True
+        if changed:
+            App.ActiveDocument.recompute()
+
+def _use_detail(execute):
+    # decorate the execute of a mesh component to load meshes at its detail level and share the result between instances
+    def wrapped(self, obj):
+        global _detail, _imports
+        _detail = _detail_level(obj)
+        _imports = []
+        try:
+            result = execute(self, obj)
+            key = (type(self).__name__, tuple(_imports))
+        finally:
+            _detail = None
+            _imports = None
+        instancing = document_instancing(obj.Document) and len(key[1]) > 0
+        if instancing or getattr(obj, "Instance", None) != None:
+            _defer_instance(obj, key if instancing else None)
+        return result
+    return wrapped
+
+# placement independent shapes of components which declare the properties their geometry depends on
+shape_cache_size = 1024 # number of component shapes to keep
+shape_cache_stats = {"hits":0, "misses":0}
+_shape_cache = OrderedDict()
+_shape_outputs = ["Shape", "Mesh", "DrillPart"]
+
+def clear_shape_cache():
+    _shape_cache.clear()
+    shape_cache_stats.update(hits=0, misses=0)
+
+# hashable form of a property value, placements and vectors by their components and objects by name
+def _shape_value(value):
+    if hasattr(value, "Value"):
+        return _primitive_key(value.Value)[0]
+    if isinstance(value, App.Placement):
+        return _primitive_key(value.Base, value.Rotation.Q)
+    if isinstance(value, App.Vector):
+        return _primitive_key(value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _shape_value(v)) for k, v in value.items()))
+    if isinstance(value, (tuple, list)):
+        return tuple(_shape_value(i) for i in value)
+    if hasattr(value, "Name") and hasattr(value, "Document"):
+        return value.Name
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        return _primitive_key(value)[0]
+    return value
+
+def _shape_key(self, obj):
+    values = []
+    for path in type(self).shape_properties:
+        value = obj
+        for attr in path.split("."):
+            value = getattr(value, attr, None)
+        values.append(_shape_value(value))
+    return (type(self).__name__, _detail, tuple(values))
+
+def _cached_execute(execute):
+    '''
+    Decorate the execute of a component so it only rebuilds when one of its shape_properties changed,
+    otherwise re-placing the shapes cached from an earlier execute
+
+    The cache key covers the class, the detail level and only the listed shape_properties, so every
+    property or proxy attribute the geometry depends on must be listed, and an empty list means the
+    geometry depends on nothing but the class
+
+    Args:
+        execute (function): The execute method of a class defining shape_properties
+
+    Returns:
+        The wrapped execute method
+    '''
+    def wrapped(self, obj):
+        key = _shape_key(self, obj)
+        if key in _shape_cache:
+            _shape_cache.move_to_end(key)
+            shape_cache_stats["hits"] += 1
+            shapes, imports = _shape_cache[key]
+            for prop, shape in shapes.items():
+                if shape == None:
+                    setattr(obj, prop, Part.Shape())
+                    continue
+                if isinstance(shape, Part.Shape):
+                    # solids keep sharing their geometry with the cache, which lets baseplates see an unchanged drill part
+                    local = shape.Placement
+                    shape.Placement = obj.Placement.multiply(local)
+                    setattr(obj, prop, shape)
+                    shape.Placement = local
+                    continue
+                shape = shape.copy()
+                shape.Placement = obj.Placement.multiply(shape.Placement)
+                setattr(obj, prop, shape)
+            if _imports != None:
+                _imports.extend(imports)
+            return
+        shape_cache_stats["misses"] += 1
+        start = len(_imports) if _imports != None else 0
+        result = execute(self, obj)
+        shapes = {}
+        for prop in _shape_outputs:
+            if not hasattr(obj, prop):
+                continue
+            shape = getattr(obj, prop)
+            if hasattr(shape, "isNull") and shape.isNull():
+                shapes[prop] = None
+                continue
+            shape = shape.copy()
+            shape.Placement = obj.Placement.inverse().multiply(shape.Placement)
+            shapes[prop] = shape
+        _shape_cache[key] = (shapes, _imports[start:] if _imports != None else [])
+        while len(_shape_cache) > shape_cache_size:
+            _shape_cache.popitem(last=False)
+        return result
+    return wrapped
+
+# box mesh matching a bounding box, so drilling against the proxy is unchanged
+def _box_mesh(bound):
+    x = (bound.XMin, bound.XMax)
+    y = (bound.YMin, bound.YMax)
+    z = (bound.ZMin, bound.ZMax)
+    c = [App.Vector(x[i&1], y[i>>1&1], z[i>>2]) for i in range(8)]
+    faces = [(0, 2, 3, 1), (4, 5, 7, 6), (0, 1, 5, 4), (2, 6, 7, 3), (0, 4, 6, 2), (1, 3, 7, 5)]
+    triangles = []
+    for a, b, d, e in faces:
+        triangles += [[c[a], c[b], c[d]], [c[a], c[d], c[e]]]
+    return Mesh.Mesh(triangles)
+
+def _load_stl(stl_name, rotate, translate, scale, level):
+    mesh = _read_stl(stl_name)
     mat = App.Matrix()
     mat.scale(App.Vector(scale, scale, scale))
     mesh.transform(mat)
     mesh.rotate(*np.deg2rad(rotate))
     mesh.translate(*translate)
+    if level == "Decimated":
+        mesh.decimate(decimate_tolerance, decimate_reduction)
+    elif level == "Proxy":
+        mesh = _box_mesh(mesh.BoundBox)
     return mesh
 
+# Used to tranform an STL such that it's placement matches the optical center
+def _import_stl(stl_name, rotate, translate, scale=1):
+    level = _detail
+    if level == None:
+        level = "Full" if _force_full else document_detail()
+    key = (stl_name, tuple(rotate), tuple(translate), scale, level)
+    if _imports != None:
+        _imports.append(key)
+    if key in _stl_cache:
+        _stl_cache.move_to_end(key)
+        stl_cache_stats["hits"] += 1
+        return _stl_cache[key][0].copy()
+    stl_cache_stats["misses"] += 1
+
+    mesh = _load_stl(stl_name, rotate, translate, scale, level)
+    size = _mesh_bytes(mesh)
+    _stl_cache[key] = (mesh, size)
+    stl_cache_stats["bytes"] += size
+    while stl_cache_stats["bytes"] > stl_cache_size and len(_stl_cache) > 1:
+        _, (_, size) = _stl_cache.popitem(last=False)
+        stl_cache_stats["bytes"] -= size
+    return mesh.copy()
+
+# shared mesh instancing, components with identical geometry display one hidden prototype through links
+_prototypes = {} # (document name, instance key) -> prototype object name
+_pending_instances = {} # (document name, object name) -> instance key, or None to remove the instance
+_instancer = None # document observer applying pending instances, registered once instancing is used
+
+def document_instancing(doc=None):
+    '''
+    Check whether library components of a document share their meshes through instances
+    '''
+    doc = doc or App.ActiveDocument
+    if doc == None:
+        return False
+    return doc.Meta.get("PyOpticLInstancing", "False") == "True"
+
+def set_instancing(state):
+    '''
+    Store identical library meshes of the active document once and place them through links
+
+    Args:
+        state (bool): Whether to share meshes between identical components
+    '''
+    doc = App.ActiveDocument
+    meta = doc.Meta
+    meta["PyOpticLInstancing"] = str(bool(state))
+    doc.Meta = meta
+    for i in doc.Objects:
+        if i.TypeId == 'Mesh::FeaturePython':
+            i.touch()
+    doc.recompute()
+    apply_instances(doc)
+    if not state:
+        for i in doc.Objects:
+            if hasattr(i, "InstanceKey") and len(i.InList) == 0:
+                doc.removeObject(i.Name)
+
+def instance_mesh(obj):
+    '''
+    Get the mesh of a component, including the geometry it shares with its instance prototype
+
+    Args:
+        obj (obj): A mesh component
+
+    Returns:
+        A copy of the mesh placed like the component
+    '''
+    # an executed component holds its new mesh until its instance is applied after the recompute
+    if obj.Mesh.CountFacets == 0 and getattr(obj, "Instance", None) != None and obj.Instance.LinkedObject != None:
+        mesh = obj.Instance.LinkedObject.Mesh.copy()
+        mesh.Placement = obj.Mesh.Placement
+        return mesh
+    return obj.Mesh.copy()
+
+def apply_instances(doc=None):
+    '''
+    Create, relink or remove the instances of the components executed since the last call, which is
+    done after each document recompute since executes must not add or remove document objects
+
+    Args:
+        doc (Document): The document to apply, defaults to the active document
+    '''
+    doc = doc or App.ActiveDocument
+    for (doc_name, name), key in list(_pending_instances.items()):
+        if doc_name != doc.Name:
+            continue
+        del _pending_instances[(doc_name, name)]
+        obj = doc.getObject(name)
+        if obj == None:
+            continue
+        if key != None:
+            _instance(obj, key)
+        elif getattr(obj, "Instance", None) != None:
+            _remove_instance(obj)
+
+class _instance_observer:
+    def slotRecomputedDocument(self, doc):
+        apply_instances(doc)
+
+# queue instancing a component, or removing its instance if key is None, until the recompute is over
+def _defer_instance(obj, key):
+    global _instancer
+    _pending_instances[(obj.Document.Name, obj.Name)] = key
+    if _instancer == None:
+        _instancer = _instance_observer()
+        App.addDocumentObserver(_instancer)
+
+# find or create the hidden object holding the shared mesh of an instance key
+def _prototype(obj, key):
+    doc = obj.Document
+    name = repr(key)
+    proto = doc.getObject(_prototypes.get((doc.Name, name), ""))
+    # the remembered name may belong to another object after a delete or in a reopened document
+    if proto != None and getattr(proto, "InstanceKey", None) != name:
+        proto = None
+    if proto == None:
+        for i in doc.Objects:
+            if getattr(i, "InstanceKey", None) == name:
+                proto = i
+                break
+    if proto == None:
+        proto = doc.addObject("Mesh::Feature", "Prototype")
+        proto.Label = key[0] + " Prototype"
+        proto.addProperty("App::PropertyString", "InstanceKey").InstanceKey = name
+        proto.setEditorMode("InstanceKey", 2)
+        mesh = obj.Mesh.copy()
+        mesh.Placement = App.Placement()
+        proto.Mesh = mesh
+        if hasattr(proto, "ViewObject") and proto.ViewObject != None:
+            proto.ViewObject.ShapeColor = obj.ViewObject.ShapeColor
+            proto.ViewObject.hide()
+    _prototypes[(doc.Name, name)] = proto.Name
+    return proto
+
+# move the mesh of a component into its shared prototype and show it through a link
+def _instance(obj, key):
+    proto = _prototype(obj, key)
+    if not hasattr(obj, "Instance"):
+        obj.addProperty("App::PropertyLinkHidden", "Instance")
+    if obj.Instance == None:
+        obj.Instance = obj.Document.addObject("App::Link", obj.Name + "_Instance")
+        obj.Instance.Label = obj.Label + " Instance"
+    if obj.Instance.LinkedObject != proto:
+        obj.Instance.LinkedObject = proto
+    obj.Instance.Placement = obj.Placement
+    mesh = Mesh.Mesh()
+    mesh.Placement = obj.Mesh.Placement
+    obj.Mesh = mesh
+
+def _remove_instance(obj):
+    link = obj.Instance
+    obj.Instance = None
+    obj.Document.removeObject(link.Name)
+
 def _bounding_box(obj, tol, fillet, x_tol=True, y_tol=True, z_tol=False, min_offset=(0, 0, 0), max_offset=(0, 0, 0), plate_off=0):
     if hasattr(obj, "Shape"):
         obj_body = obj.Shape.copy()
     elif hasattr(obj, "Mesh"):
-        obj_body = obj.Mesh.copy()
+        obj_body = instance_mesh(obj) # the new mesh while executing, otherwise instanced components keep it in the prototype
     else:
         obj_body = obj
     obj_body.Placement = App.Placement()
@@ -95,47 +479,126 @@ def _add_linked_object(obj, obj_name, obj_class, pos_offset=(0, 0, 0), rot_offse
     new_obj.RelativePlacement.Base = App.Vector(*pos_offset)
     return new_obj
 
-def _drill_part(part, obj, drill_obj):
-    if hasattr(drill_obj, "DrillPart"):
+# drill parts of an object and its children, placed relative to the part being drilled
+def _drill_tools(obj, drill_obj, tools=None):
+    if tools == None:
+        tools = []
+    if hasattr(drill_obj, "DrillPart") and not drill_obj.DrillPart.isNull():
         drill = drill_obj.DrillPart.copy()
         drill.Placement = obj.BasePlacement.inverse().multiply(drill.Placement)
-        part = part.cut(drill)
+        tools.append(drill)
     if hasattr(drill_obj, "ChildObjects"):
         for sub in drill_obj.ChildObjects:
-            part = _drill_part(part, obj, sub)
+            _drill_tools(obj, sub, tools)
+    return tools
+
+def _cut_tools(part, tools):
+    '''
+    Cut every tool from a part in a single boolean operation
+
+    Args:
+        part (Shape): The solid to drill
+        tools (Shape[]): The drill parts, already placed relative to the part
+
+    Returns:
+        The drilled solid
+    '''
+    tools = [i for i in tools if not i.isNull()]
+    if len(tools) == 0:
+        return part
+    try:
+        # one multi-argument cut lets the kernel intersect all tools at once (and in parallel) instead of rebuilding the part per tool
+        return part.cut(tools)
+    except Part.OCCError:
+        for i in tools:
+            part = part.cut(i)
+        return part
+
+def _drill_part(part, obj, drill_obj):
+    return _cut_tools(part, _drill_tools(obj, drill_obj))
+
+# solids built by the primitive helpers, kept at the origin and shared between calls
+primitive_cache_size = 2048 # number of solids to keep
+primitive_cache_stats = {"hits":0, "misses":0}
+_primitive_cache = OrderedDict()
+
+def clear_primitive_cache():
+    _primitive_cache.clear()
+    primitive_cache_stats.update(hits=0, misses=0)
+
+# hashable form of primitive arguments, so equal dimensions from floats, ints or numpy values share an entry
+def _primitive_key(*args):
+    key = []
+    for i in args:
+        if isinstance(i, (tuple, list, np.ndarray)):
+            key.append(_primitive_key(*i))
+        elif isinstance(i, (bool, str, type(None))):
+            key.append(i)
+        else:
+            key.append(round(float(i), 9)+0)
+    return tuple(key)
+
+def _cached_primitive(key, build):
+    if key in _primitive_cache:
+        _primitive_cache.move_to_end(key)
+        primitive_cache_stats["hits"] += 1
+    else:
+        primitive_cache_stats["misses"] += 1
+        _primitive_cache[key] = build()
+        while len(_primitive_cache) > primitive_cache_size:
+            _primitive_cache.popitem(last=False)
+    return _primitive_cache[key].copy()
+
+# move a copy of a cached solid into its geometry rather than its placement
+def _translated(part, x, y, z):
+    mat = App.Matrix()
+    mat.move(App.Vector(x, y, z))
+    part.transformShape(mat, True)
     return part
 
+# fillet every edge of a part running along a direction
+def _fillet_edges(part, fillet, dir):
+    edges = [i for i in part.Edges if i.tangentAt(i.FirstParameter) == App.Vector(*dir)]
+    if len(edges) == 0:
+        return part
+    try:
+        return part.makeFillet(fillet-1e-3, edges)
+    except Part.OCCError:
+        # some edges can't be filleted together, fall back to one at a time skipping failures
+        for i in edges:
+            try:
+                part = part.makeFillet(fillet-1e-3, [i])
+            except Part.OCCError:
+                pass
+        return part
+
 def _custom_box(dx, dy, dz, x, y, z, fillet=0, dir=(0,0,1), fillet_dir=None):
     if fillet_dir == None:
         fillet_dir = np.abs(dir)
-    part = Part.makeBox(dx, dy, dz)
-    if fillet != 0:
-        for i in part.Edges:
-            if i.tangentAt(i.FirstParameter) == App.Vector(*fillet_dir):
-                part = part.makeFillet(fillet-1e-3, [i])
-    part.translate(App.Vector(x-(1-dir[0])*dx/2, y-(1-dir[1])*dy/2, z-(1-dir[2])*dz/2))
-    part = part.fuse(part)
-    return part
+    key = _primitive_key("box", dx, dy, dz, fillet, dir, fillet_dir)
+    def build():
+        part = Part.makeBox(dx, dy, dz)
+        edges = [i for i in part.Edges if i.tangentAt(i.FirstParameter) == App.Vector(*fillet_dir)]
+        if fillet != 0 and len(edges) > 0:
+            part = part.makeFillet(fillet-1e-3, edges)
+        return _translated(part, -(1-dir[0])*dx/2, -(1-dir[1])*dy/2, -(1-dir[2])*dz/2)
+    return _translated(_cached_primitive(key, build), x, y, z)
 
 def _fillet_all(part, fillet, dir=(0, 0, 1)):
-    for i in part.Edges:
-        if i.tangentAt(i.FirstParameter) == App.Vector(*dir):
-            try:
-                part = part.makeFillet(fillet-1e-3, [i])
-            except:
-                pass
-    return part
+    key = ("fillet", hashlib.sha1(part.exportBrepToString().encode()).hexdigest(), _primitive_key(fillet, dir))
+    return _cached_primitive(key, lambda: _fillet_edges(part, fillet, dir))
 
 def _custom_cylinder(dia, dz, x, y, z, head_dia=0, head_dz=0, dir=(0, 0, -1), countersink=False):
-    part = Part.makeCylinder(dia/2, dz, App.Vector(0, 0, 0), App.Vector(*dir))
-    if head_dia != 0 and head_dz != 0:
-        if countersink:
-            part = part.fuse(Part.makeCone(head_dia/2, dia/2, head_dz, App.Vector(0, 0, 0), App.Vector(*dir)))
-        else:
-            part = part.fuse(Part.makeCylinder(head_dia/2, head_dz, App.Vector(0, 0, 0), App.Vector(*dir)))
-    part.translate(App.Vector(x, y, z))
-    part = part.fuse(part)
-    return part.removeSplitter()
+    key = _primitive_key("cylinder", dia, dz, head_dia, head_dz, dir, countersink)
+    def build():
+        part = Part.makeCylinder(dia/2, dz, App.Vector(0, 0, 0), App.Vector(*dir))
+        if head_dia != 0 and head_dz != 0:
+            if countersink:
+                part = part.fuse(Part.makeCone(head_dia/2, dia/2, head_dz, App.Vector(0, 0, 0), App.Vector(*dir)))
+            else:
+                part = part.fuse(Part.makeCylinder(head_dia/2, head_dz, App.Vector(0, 0, 0), App.Vector(*dir)))
+        return part.removeSplitter()
+    return _translated(_cached_primitive(key, build), x, y, z)
 
 
 class example_component:
@@ -148,6 +611,7 @@ class example_component:
         side_length (float) : The side length of the cube
     '''
     type = 'Part::FeaturePython' # if importing from stl, this will be 'Mesh::FeaturePython'
+    shape_properties = ["Side_Length", "Proxy.mount_bolt", "Proxy.mount_dz"] # every property the geometry depends on, since only these are in the shape cache key
     def __init__(self, obj, drill=True, side_len=15):
         # required for all object classes
         obj.Proxy = self
@@ -163,6 +627,7 @@ class example_component:
         self.mount_dz = -obj.Baseplate.OpticsDz.Value
 
     # this defines the component body and drilling
+    @_cached_execute
     def execute(self, obj):
         part = _custom_box(dx=obj.Side_Length.Value, dy=obj.Side_Length.Value, dz=obj.Side_Length.Value,
                            x=0, y=0, z=self.mount_dz)
@@ -189,6 +654,7 @@ class baseplate_mount:
         bore_depth (float) : The depth for the counterbore of the mount hole
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Baseplate.OpticsDz", "Baseplate.dz", "BoreDepth"]
     def __init__(self, obj, bore_depth=10, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -199,6 +665,7 @@ class baseplate_mount:
 
         obj.ViewObject.ShapeColor = mount_color
 
+    @_cached_execute
     def execute(self, obj):
         bolt_len = inch-(obj.BoreDepth.Value-bolt_14_20['head_dz'])
 
@@ -219,6 +686,7 @@ class pinhole_self_design:
 
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["AdapterHeight", "MountHoleDistance", "OuterThickness", "RelativePlacement", "Proxy.drill_tolerance"]
     def __init__(self, obj, drill=True, mount_hole_dy=20, adapter_height=8, outer_thickness=2):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -233,6 +701,7 @@ class pinhole_self_design:
         obj.setEditorMode('Placement', 2)
         self.drill_tolerance = 1
 
+    @_cached_execute
     def execute(self, obj):
         dx = bolt_8_32['head_dia']+obj.OuterThickness.Value*2
         dy = dx+obj.MountHoleDistance.Value
@@ -273,6 +742,7 @@ class surface_adapter:
         outer_thickness (float) : The thickness of the walls around the bolt holes
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["AdapterHeight", "MountHoleDistance", "OuterThickness", "RelativePlacement", "Proxy.drill_tolerance"]
     def __init__(self, obj, drill=True, mount_hole_dy=20, adapter_height=8, outer_thickness=2):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -287,6 +757,7 @@ class surface_adapter:
         obj.setEditorMode('Placement', 2)
         self.drill_tolerance = 1
 
+    @_cached_execute
     def execute(self, obj):
         dx = bolt_8_32['head_dia']+obj.OuterThickness.Value*2
         dy = dx+obj.MountHoleDistance.Value
@@ -322,6 +793,7 @@ class surface_adapter_405:
         outer_thickness (float) : The thickness of the walls around the bolt holes
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["AdapterHeight", "Baseplate.OpticsDz", "MountHoleDistance", "OuterThickness", "Slots", "RelativePlacement", "Proxy.drill_tolerance"]
     def __init__(self, obj, drill=True, mount_hole_dy=20, adapter_height=8, outer_thickness=2, slot=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -336,6 +808,7 @@ class surface_adapter_405:
         obj.setEditorMode('Placement', 2)
         self.drill_tolerance = 1
 
+    @_cached_execute
     def execute(self, obj):
         dx = bolt_8_32['head_dia']+obj.OuterThickness.Value*2
         dy = dx+obj.MountHoleDistance.Value
@@ -386,6 +859,7 @@ class skate_mount_crossholes:
         cube_tol (float) : The tolerance for size of the recess in the skate mount
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Baseplate.OpticsDz", "CubeDepth", "CubeDx", "CubeDy", "CubeDz", "CubeTolerance", "MountHoleDistance", "OuterThickness", "Slots", "RelativePlacement"]
     def __init__(self, obj, drill=True, cube_dx=10, cube_dy=10, cube_dz=10, mount_hole_dy=20, cube_depth=1, outer_thickness=2, cube_tol=0.1, slots=False):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -404,6 +878,7 @@ class skate_mount_crossholes:
         obj.ViewObject.ShapeColor = adapter_color
         obj.setEditorMode('Placement', 2)
 
+    @_cached_execute
     def execute(self, obj):
         if obj.Slots:
             slot = 5
@@ -462,6 +937,7 @@ class skate_mount:
         cube_tol (float) : The tolerance for size of the recess in the skate mount
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Baseplate.OpticsDz", "CubeDepth", "CubeDx", "CubeDy", "CubeDz", "CubeTolerance", "MountHoleDistance", "OuterThickness", "Slots", "RelativePlacement"]
     def __init__(self, obj, drill=True, cube_dx=10, cube_dy=10, cube_dz=10, mount_hole_dy=20, cube_depth=1, outer_thickness=2, cube_tol=0.1, slots=False):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -480,6 +956,7 @@ class skate_mount:
         obj.ViewObject.ShapeColor = adapter_color
         obj.setEditorMode('Placement', 2)
 
+    @_cached_execute
     def execute(self, obj):
         if obj.Slots:
             slot = 5
@@ -527,6 +1004,7 @@ class Prism_pair:
     this is prism pair for laser profile
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj,drill = True , mount_type=None, mount_args=dict(), deviate_angle = 16.81):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -547,6 +1025,8 @@ class Prism_pair:
         if mount_type != None:
            _add_linked_object(obj, "Mount", mount_type, pos_offset=(0, 0, -8), **mount_args)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("Prism pair.stl", (180, 0, -110), (13,-7,0.8))
         mesh_ = _import_stl("Prism pair.stl", (0, 0, -276), (-3,1,-2))
@@ -556,6 +1036,7 @@ class Prism_pair:
           
 class prism_pair_mount:
     type = 'Part::FeaturePython'
+    shape_properties = ["Baseplate.OpticsDz", "CubeDepth", "CubeDx", "CubeDy", "CubeDz", "CubeTolerance", "MountHoleDistance", "OuterThickness", "Slots", "RelativePlacement"]
     def __init__(self, obj, drill=True, cube_dx=9, cube_dy=12, cube_dz=11, mount_hole_dy=20, cube_depth=1, outer_thickness=10, cube_tol=0.1, slots=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -574,6 +1055,7 @@ class prism_pair_mount:
         obj.ViewObject.ShapeColor = adapter_color
         obj.setEditorMode('Placement', 2)
 
+    @_cached_execute
     def execute(self, obj):
         if obj.Slots:
             slot = 10
@@ -625,6 +1107,7 @@ class prism_pair_mount:
 
 class prism_pair_mount_circle:
     type = 'Part::FeaturePython'
+    shape_properties = ["Baseplate.OpticsDz", "CubeDepth", "CubeDx", "CubeDy", "CubeDz", "CubeTolerance", "MountHoleDistance", "OuterThickness", "Slots", "RelativePlacement"]
     def __init__(self, obj, drill=True, cube_dx=9, cube_dy=12, cube_dz=11, mount_hole_dy=28, cube_depth=1, outer_thickness=10, cube_tol=0.1, slots=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -643,6 +1126,7 @@ class prism_pair_mount_circle:
         obj.ViewObject.ShapeColor = adapter_color
         obj.setEditorMode('Placement', 2)
 
+    @_cached_execute
     def execute(self, obj):
         if obj.Slots:
             slot = 15
@@ -702,6 +1186,7 @@ class prism_pair_mount_chess:
     just put it on the plate. no need to drill
     '''
     type = 'Part::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, cube_dx=9, cube_dy=12, cube_dz=11, mount_hole_dy=28, cube_depth=1, outer_thickness=10, cube_tol=0.1, slots=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -720,6 +1205,7 @@ class prism_pair_mount_chess:
         obj.ViewObject.ShapeColor = adapter_color
         obj.setEditorMode('Placement', 2)
 
+    @_cached_execute
     def execute(self, obj):
         # for i in [-1., 1.]:
         part = _custom_cylinder(dia = 15, dz = 8, x = 8, y = -6, z = -4.70,head_dia=19.9, head_dz=3,dir=(0,0,1))
@@ -746,6 +1232,7 @@ class slide_mount:
         outer_thickness (float) : The thickness of the walls around the bolt holes
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["AdapterHeight", "Baseplate.OpticsDz", "DrillOffset", "OuterThickness", "PostThickness", "SlotLength"]
     def __init__(self, obj, drill=True, slot_length=10, drill_offset=0, adapter_height=8, post_thickness=4, outer_thickness=2):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -761,6 +1248,7 @@ class slide_mount:
         obj.ViewObject.ShapeColor = adapter_color
         obj.setEditorMode('Placement', 2)
 
+    @_cached_execute
     def execute(self, obj):
         dx = bolt_8_32['head_dia']+obj.OuterThickness.Value*2
         dy = dx+obj.SlotLength.Value+obj.PostThickness.Value
@@ -792,6 +1280,7 @@ class fiberport_mount_hca3:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -804,6 +1293,8 @@ class fiberport_mount_hca3:
         self.max_angle = 0
         self.max_width = 1
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("HCA3-Step.stl", (90, -0, 90), (-6.35, 19.05, -26.87))
         mesh.Placement = obj.Mesh.Placement
@@ -831,6 +1322,7 @@ class rotation_stage_rsp05:
         surface_adapter (adapter_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, invert=False, adapter_args=dict(), adapter = True):
         adapter_args.setdefault("mount_hole_dy", 25)
         obj.Proxy = self
@@ -847,6 +1339,8 @@ class rotation_stage_rsp05:
         if adapter:
             _add_linked_object(obj, "Surface Adapter", surface_adapter, pos_offset=(1.397, 0, -13.97), rot_offset=(0, 0, 90*obj.Invert), **adapter_args)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("RSP05-Step.stl", (90, -0, 90), (2.032, -0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -857,6 +1351,7 @@ class pinhole_p2000k05_LMR05:
     Pinhole, 2mm 
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, adapter_args=dict()):
         adapter_args.setdefault("mount_hole_dy", 25)
         obj.Proxy = self
@@ -867,6 +1362,8 @@ class pinhole_p2000k05_LMR05:
 
         _add_linked_object(obj, "Surface Adapter", surface_adapter, pos_offset=(0, 3.82, -16.00), rot_offset=(0, 0, 90), **adapter_args)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("P2000K05_LMR05.stl", (90, -0, 0), (0, -0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -877,6 +1374,7 @@ class BSH01_cube_mount:
     BSH01 screw mount for 10mm cube polarized beam splitter
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, adapter_args=dict()):
         adapter_args.setdefault("mount_hole_dy", 25)
         adapter_args.setdefault("outer_thickness", 3)
@@ -889,6 +1387,8 @@ class BSH01_cube_mount:
         _add_linked_object(obj, "Surface Adapter", surface_adapter_4_40, pos_offset=(0, 0, 0), rot_offset=(0, 0, 90), **adapter_args)
         # _add_linked_object(obj, "Surface Adapter", surface_adapter_4_40, pos_offset=(0, 0, -5.15), rot_offset=(0, 0, 90), **adapter_args)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("BSH10.stl", (90, -0, 0), (101.4, 74.1, -22))
         mesh.Placement = obj.Mesh.Placement
@@ -912,6 +1412,7 @@ class rotation_stage_rsp05_lying_down:
         surface_adapter (adapter_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, invert=False, adapter_args=dict()):
         adapter_args.setdefault("mount_hole_dy", 25)
         obj.Proxy = self
@@ -924,6 +1425,8 @@ class rotation_stage_rsp05_lying_down:
 
         _add_linked_object(obj, "Surface Adapter", surface_adapter_lying_down, pos_offset=(1.397, 0, -13.97), rot_offset=(0, 0, 90*obj.Invert), **adapter_args)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("RSP05-Step.stl", (90, -0, 90), (2.032, -0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -941,6 +1444,7 @@ class mirror_mount_k05s2:
         thumbscrews (bool): Whether or not to add two HKTS 5-64 adjusters
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, thumbscrews=False):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -956,6 +1460,8 @@ class mirror_mount_k05s2:
             _add_linked_object(obj, "Upper Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-12.43, 8.89, 8.89))
             _add_linked_object(obj, "Lower Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-12.43, -8.89, -8.89))
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("POLARIS-K05S2-Step.stl", (90, -0, -90), (-4.514, 0.254, -0.254))
         mesh.Placement = obj.Mesh.Placement
@@ -980,6 +1486,7 @@ class mirror_mount_k05s1:
         thumbscrews (bool): Whether or not to add two HKTS 5-64 adjusters
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, thumbscrews=False):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -995,6 +1502,8 @@ class mirror_mount_k05s1:
             _add_linked_object(obj, "Upper Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-11.22, 8.89, 8.89))
             _add_linked_object(obj, "Lower Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-11.22, -8.89, -8.89))
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("POLARIS-K05S1-Step.stl", (90, 0, -90), (-4.514, 0.254, -0.254))
         mesh.Placement = obj.Mesh.Placement
@@ -1019,6 +1528,7 @@ class moon_mirror_mount:
         thumbscrews (bool): Whether or not to add two HKTS 5-64 adjusters
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, thumbscrews=False):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1030,6 +1540,8 @@ class moon_mirror_mount:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['DMM05-Step']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("DMM05-Step.stl", (-183, -9, 3), (-3, 3, 1.5))
         mesh.Placement = obj.Mesh.Placement
@@ -1059,6 +1571,7 @@ class moon_mirror_mount_left:
         thumbscrews (bool): Whether or not to add two HKTS 5-64 adjusters
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, thumbscrews=False):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1070,6 +1583,8 @@ class moon_mirror_mount_left:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['DMM05-Step']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("DMM05-Step.stl", (177, -9, 3), (-3, 3, 1.5))
         mesh.Placement = obj.Mesh.Placement
@@ -1095,6 +1610,7 @@ class splitter_mount_b05g:
         circular_splitter (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1105,6 +1621,8 @@ class splitter_mount_b05g:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['POLARIS-B05G']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("POLARIS-B05G-Step.stl", (90, -0, 90), (-17.54, -5.313, -19.26))
         mesh.Placement = obj.Mesh.Placement
@@ -1131,6 +1649,7 @@ class mirror_mount_c05g:
         circular_mirror (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1141,6 +1660,8 @@ class mirror_mount_c05g:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['POLARIS-C05G']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("POLARIS-C05G-Step.stl", (90, -0, 90), (-18.94, -4.246, -15.2))
         mesh.Placement = obj.Mesh.Placement
@@ -1160,6 +1681,7 @@ class KMS_MH_12:
     Ø1/2" MH_12 mirror holder
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["BoltLength", "RelativePlacement"]
     def __init__(self, obj, drill=True, bolt_length = 15):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1170,6 +1692,8 @@ class KMS_MH_12:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['MH12']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("KMSS_MH12_step.stl", (-90, -90, 90), (-5, 0, -0.4))
         mesh.Placement = obj.Mesh.Placement
@@ -1198,6 +1722,7 @@ class rotation_stage_rsp1:
         surface_adapter (adapter_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, invert=False, adapter_args=dict()):
         adapter_args.setdefault("mount_hole_dy", 25)
         obj.Proxy = self
@@ -1210,6 +1735,8 @@ class rotation_stage_rsp1:
 
         _add_linked_object(obj, "Surface Adapter", surface_adapter, pos_offset=(5.461, 0, -27.73), rot_offset=(0, 0, 90*obj.Invert), **adapter_args)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("RSP1-Step.stl", (180, -0, 90), (5.969, -0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -1229,6 +1756,7 @@ class mirror_mount_km100:
         circular_mirror (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1239,6 +1767,8 @@ class mirror_mount_km100:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['KM100']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("KM100-Step.stl", (-180, 0, -90), (4.972, 0.084, -1.089))
         mesh.Placement = obj.Mesh.Placement
@@ -1278,6 +1808,7 @@ class mirror_mount_km05:
         circular_mirror (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["BoltLength", "RelativePlacement"]
     def __init__(self, obj, drill=True, thumbscrews=False, bolt_length=15):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1294,6 +1825,8 @@ class mirror_mount_km05:
             _add_linked_object(obj, "Upper Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-10.54, 9.906, 9.906))
             _add_linked_object(obj, "Lower Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-10.54, -9.906, -9.906))
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("KM05-Step.stl", (90, -0, 90), (2.084, -1.148, 0.498))
         mesh.Placement = obj.Mesh.Placement
@@ -1322,6 +1855,7 @@ class mirror_mount_km05_rot90:
         circular_mirror (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["BoltLength", "RelativePlacement"]
     def __init__(self, obj, drill=True, thumbscrews=False, bolt_length=15):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1338,6 +1872,8 @@ class mirror_mount_km05_rot90:
             _add_linked_object(obj, "Upper Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-10.54, 9.906, -9.906))
             _add_linked_object(obj, "Lower Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-10.54, -9.906, 9.906))
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("KM05-Step.stl", (90, 90, 90), (1.784, 0.1, 0.498))
         mesh.Placement = obj.Mesh.Placement
@@ -1364,6 +1900,7 @@ class fixed_mount_smr05:
         circular_mirror (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["BoltLength"]
     def __init__(self, obj, drill=True, thumbscrews=False, bolt_length=15):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1376,6 +1913,8 @@ class fixed_mount_smr05:
         self.part_numbers = ['SMR05']
 
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("SMR05-Step.stl", (90, 0, 90), (-3.81, 0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -1396,6 +1935,7 @@ class prism_mount_km05pm:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["Arm", "BoltLength", "RelativePlacement"]
     def __init__(self, obj, drill=True, thumbscrews=False, bolt_length=15, arm=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1413,6 +1953,8 @@ class prism_mount_km05pm:
             _add_linked_object(obj, "Upper Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-19.05, 6.985, 15.49))
             _add_linked_object(obj, "Lower Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-19.05, -12.83, -4.318))
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         #mesh = _import_stl("KM05PM-Step.stl", (90, 0, 90), (-12.39, -0.894, 1.514))
         if obj.Arm:
@@ -1447,6 +1989,7 @@ class grating_mount_on_km05pm:
         square_mirror (mirror_args)
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["LittrowAngle"]
     def __init__(self, obj, drill=True, littrow_angle=55, mount_args=dict(), grating_args=dict(), mirror_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1470,6 +2013,7 @@ class grating_mount_on_km05pm:
         _add_linked_object(obj, "Grating", square_grating, pos_offset=(grating_dx, 0, 0), rot_offset=(0, 0, 180-obj.LittrowAngle.Value), **grating_args)
         _add_linked_object(obj, "Mirror", square_mirror, pos_offset=(mirror_dx, gap, 0), rot_offset=(0, 0, -obj.LittrowAngle.Value), **mirror_args)
 
+    @_cached_execute
     def execute(self, obj):
         extra_y = 2
         gap = 10
@@ -1516,6 +2060,7 @@ class grating_mount_on_km05pm_no_arm:
         square_mirror (mirror_args)
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["LittrowAngle"]
     def __init__(self, obj, drill=True, littrow_angle=55, mount_args=dict(), grating_args=dict(), mirror_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1539,6 +2084,7 @@ class grating_mount_on_km05pm_no_arm:
         _add_linked_object(obj, "Grating", square_grating, pos_offset=(grating_dx, 0, 0), rot_offset=(0, 0, 180-obj.LittrowAngle.Value), **grating_args)
         _add_linked_object(obj, "Mirror", square_mirror, pos_offset=(mirror_dx, gap, 0), rot_offset=(0, 0, -obj.LittrowAngle.Value), **mirror_args)
 
+    @_cached_execute
     def execute(self, obj):
         extra_y = 2
         gap = 10
@@ -1579,6 +2125,7 @@ class mount_tsd_405sluu:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1589,6 +2136,8 @@ class mount_tsd_405sluu:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['TSD-405SLUU']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("TSD-405SLUU.stl", (0, 0, -90), (-19, 0, -62))
         mesh.Placement = obj.Mesh.Placement
@@ -1614,6 +2163,7 @@ class mirror_mount_ks1t:
         circular_mirror (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1624,6 +2174,8 @@ class mirror_mount_ks1t:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['KM1T']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("KS1T-Step.stl", (90, -0, -90), (22.06, 13.37, -30.35))
         mesh.Placement = obj.Mesh.Placement
@@ -1678,6 +2230,7 @@ class splitter_mount_b1g:
         circular_splitter (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=False):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1690,6 +2243,8 @@ class splitter_mount_b1g:
 
         _add_linked_object(obj, "Surface Adapter", surface_adapter, pos_offset=(-5, 0, -19.05), rot_offset=(0, 0, 0), mount_hole_dy=30)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("POLARIS-B1G-Step.stl", (90, 0, 90), (-43.59, 1.26, -23.78))
         mesh.Placement = obj.Mesh.Placement
@@ -1747,6 +2302,7 @@ class mirror_mount_k1t1:
         circular_mirror (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1757,6 +2313,8 @@ class mirror_mount_k1t1:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['KM1T']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("Fiberport_mount_k1t1.stl", (90, -0, -90), (97.06, 17.87, -10.35))
         mesh.Placement = obj.Mesh.Placement
@@ -1853,6 +2411,7 @@ class lens_slot_tube:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -1865,6 +2424,8 @@ class lens_slot_tube:
         self.max_angle = 0
         self.max_width = 1
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("SM1L10C_slot_tube.stl", (90, 180, -90), (18.35, 0.05, -81.87))
         mesh.Placement = obj.Mesh.Placement
@@ -1991,12 +2552,14 @@ class laser_cavity_mount_upper_plate:
     def execute(self, obj):
         part = _custom_box(dx=obj.Length.Value, dy=obj.Width.Value, dz=obj.Thickness.Value,
                            x=0, y=0, z=-inch/2, dir=(0, 0, -1))
+        tools = []
         for sub_obj in obj.DrillObjects:
-            part = _drill_part(part, obj, sub_obj)
-            obj.Shape = part
+            _drill_tools(obj, sub_obj, tools)
+        obj.Shape = _cut_tools(part, tools)
 
 class laser_cavity_mount_lower_plate:
     type = 'Part::FeaturePython'
+    shape_properties = ["Length", "Thickness", "Width", "RelativePlacement"]
     def __init__(self, obj, drill=True, width=1.5*inch, length=3.5*inch, thickness=0.25*inch):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2009,6 +2572,7 @@ class laser_cavity_mount_lower_plate:
 
         obj.ViewObject.ShapeColor = adapter_color
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_box(dx=obj.Length.Value, dy=obj.Width.Value, dz=obj.Thickness.Value,
                                      x=0, y=0, z=-inch/2, dir=(0, 0, -1))
@@ -2048,6 +2612,7 @@ class km05_tec_upper_plate:
 
 class km05_tec_lower_plate:
     type = 'Part::FeaturePython'
+    shape_properties = ["Height", "Thickness", "Width"]
     def __init__(self, obj, drill=True, width=3*inch, height=.25*inch, thickness=3*inch, part_number=''): #thickness=130-inch/2-1,
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2060,6 +2625,7 @@ class km05_tec_lower_plate:
         obj.ViewObject.ShapeColor = adapter_color
         self.part_numbers = [part_number]
 
+    @_cached_execute
     def execute(self, obj):
         x_off = 0 #-2
         y_off = 0 #-4
@@ -2098,6 +2664,7 @@ class mirror_mount_mk05:
         self.max_angle = 90
         self.max_width = inch/2
 
+    @_use_detail
     def execute(self, obj):
         mesh = _import_stl("MK05-Step.stl", (90, -0, -90), (-22.91-obj.ChildObjects[0].Thickness.Value, 26, -5.629))
         mesh.Placement = obj.Mesh.Placement
@@ -2118,6 +2685,7 @@ class mount_mk05pm:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2128,6 +2696,8 @@ class mount_mk05pm:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['MK05PM']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("MK05PM-Step.stl", (180, 90, 0), (-7.675, 7.699, 4.493))
         mesh.Placement = obj.Mesh.Placement
@@ -2155,6 +2725,7 @@ class dichoric_mirror_mount_km05fl:
         circular_mirror (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2167,6 +2738,8 @@ class dichoric_mirror_mount_km05fl:
         self.max_angle = 90
         self.max_width = inch/2
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("KM05FL-Step.stl", (-180, 0, -90), (-11.53, -10.16, -10.16))
         mesh.Placement = obj.Mesh.Placement
@@ -2195,6 +2768,7 @@ class dichoric_mirror_mount_km05fR:
         circular_mirror (mirror_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2207,6 +2781,8 @@ class dichoric_mirror_mount_km05fR:
         self.max_angle = 90
         self.max_width = inch/2
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("KM05FR_M-Step.stl", (-90, 0, 0), (-11.53, -10.16, -10.16))
         mesh.Placement = obj.Mesh.Placement
@@ -2238,6 +2814,7 @@ class grating_mount_on_mk05pm:
         square_mirror (mirror_args)
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["LittrowAngle", "Proxy.dx"]
     def __init__(self, obj, drill=True, littrow_angle=45, mount_args=dict(), grating_args=dict(), mirror_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2251,6 +2828,7 @@ class grating_mount_on_mk05pm:
         _add_linked_object(obj, "Grating", square_grating, pos_offset=(0, 0, 2), rot_offset=(0, 0, -obj.LittrowAngle.Value), **grating_args)
         _add_linked_object(obj, "Mirror", square_mirror, pos_offset=(self.dx, -12, 2), rot_offset=(0, 0, -obj.LittrowAngle.Value+180), **mirror_args)
 
+    @_cached_execute
     def execute(self, obj):
         # TODO add some variables to make this cleaner
         part = _custom_box(dx=25+self.dx, dy=35, dz=4,
@@ -2288,6 +2866,7 @@ class lens_holder_l05g:
         circular_lens (lens_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2298,6 +2877,8 @@ class lens_holder_l05g:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['POLARIS-L05G']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("POLARIS-L05G-Step.stl", (90, -0, 90), (-26.57, -13.29, -18.44))
         mesh.Placement = obj.Mesh.Placement
@@ -2343,6 +2924,7 @@ class pinhole_ida12:
         _add_linked_object(obj, "Slide Mount", slide_mount,
                            pos_offset=(1.956, -12.83, 0), **adapter_args)
 
+    @_use_detail
     def execute(self, obj):
         mesh = _import_stl("IDA12-P5-Step.stl", (90, 0, -90), (1.549, 0, -0))
         mesh.rotate(-pi/2, 0, 0)
@@ -2364,6 +2946,7 @@ class prism_mount_km100pm:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2374,6 +2957,8 @@ class prism_mount_km100pm:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['KM100PM']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("KM100PM-Step.stl", (90, -0, -90), (-8.877, 38.1, -6.731))
         mesh.Placement = obj.Mesh.Placement
@@ -2393,6 +2978,7 @@ class wire_tube:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2405,6 +2991,8 @@ class wire_tube:
         self.max_angle = 0
         self.max_width = 1
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("wire_tube.stl", (90, 90, 90), (-133, 0, -29.25))
         mesh.Placement = obj.Mesh.Placement
@@ -2420,6 +3008,7 @@ class brewster_window:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2432,6 +3021,8 @@ class brewster_window:
         self.max_angle = 0
         self.max_width = 1
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("BW20M.stl", (90, 0, 90), (90, 20.79, -40.46))
         mesh.Placement = obj.Mesh.Placement
@@ -2513,6 +3104,7 @@ class laser_box:
 class laser_base:
 
     type = 'Part::FeaturePython'
+    shape_properties = ["Height", "MatThickness", "Thickness", "Width"]
     def __init__(self, obj, drill=True, thickness=125 + inch/4*2 + 1 * inch, width=100+ inch, height=0.25*inch, mat_thickness=0.5*inch, part_number=''):
     #(self, obj, drill=True, thickness=4*inch, width=3*inch, height=0.25*inch, mat_thickness=0.25*inch, part_number=''): #thickness=130-inch/2-1,
         obj.Proxy = self
@@ -2527,6 +3119,7 @@ class laser_base:
         obj.ViewObject.ShapeColor = adapter_color
         self.part_numbers = [part_number]
 
+    @_cached_execute
     def execute(self, obj):
         x_off = -2
         y_off = -4
@@ -2548,6 +3141,7 @@ class ECDL:
     ECDL device with optional cover box and serialization support
     """
     type = 'Part::FeaturePython'
+    shape_properties = ["ArmClearance", "ArmThickness", "LittrowAngle", "SlotLength", "StageLength", "StageThickness"]
 
     def __init__(self, obj, drill=True, slot_length=0, countersink=False, counter_depth=3, arm_thickness=8, 
                  arm_clearance=2, stage_thickness=6, stage_length=20, mat_thickness=10, littrow_angle=56.6, 
@@ -2605,69 +3199,57 @@ class ECDL:
 
         App.ActiveDocument.commitTransaction()
 
+    @_cached_execute
     def execute(self, obj):
-        App.ActiveDocument.openTransaction("Update ECDL Shape")
-        try:
-            # Cache key based on relevant properties
-            cache_key = (obj.ArmThickness.Value, obj.ArmClearance.Value, obj.StageThickness.Value,
-                         obj.StageLength.Value, obj.SlotLength.Value, obj.LittrowAngle.Value)
-            if not hasattr(self, '_shape_cache') or self._shape_cache.get('key') != cache_key:
-                dx = obj.ArmThickness.Value
-                dy = 45
-                dz = 17
-                stage_dx = obj.StageLength.Value
-                stage_dz = obj.StageThickness.Value
-
-                part = _custom_box(dx=dx, dy=dy, dz=dz - obj.ArmClearance.Value,
-                                   x=0, y=4, z=obj.ArmClearance.Value)
-                part = part.fuse(_custom_box(dx=stage_dx, dy=dy, dz=dz - obj.ArmClearance.Value,
-                                             x=0, y=4, z=dz, dir=(1, 0, -1)))
-                for ddy in [15.2, 38.1]:
-                    part = part.cut(_custom_box(dx=stage_dx + dx, dy=obj.SlotLength.Value + bolt_4_40['clear_dia'], dz=bolt_4_40['clear_dia'],
-                                                x=stage_dx, y=25.4 - ddy + 2.5, z=6.4,
-                                                fillet=bolt_4_40['clear_dia'] / 2, dir=(-1, 0, 0)))
-                    part = part.cut(_custom_box(dx=stage_dx + dx - 5 - 4, dy=obj.SlotLength.Value + bolt_4_40['head_dia'], dz=bolt_4_40['head_dia'],
-                                                x=stage_dx, y=25.4 - ddy + 2.5, z=6.4,
-                                                fillet=bolt_4_40['head_dia'] / 2, dir=(-1, 0, 0)))
-
-                extra_y = 0
-                gap = 22
-                lit_angle = radians(90 - obj.LittrowAngle.Value)
-                beam_angle = radians(obj.LittrowAngle.Value)
-                ref_len = gap / sin(2 * beam_angle)
-                ref_x = ref_len * cos(2 * beam_angle)
-                dx2 = ref_x + 9.7 * cos(lit_angle) + (6 + 3.2) * sin(lit_angle)
-                extra_x = 18 - dx2
-                dy2 = gap + 9.7 * sin(lit_angle) + (6 + 3.2) * cos(lit_angle)
-                dz2 = inch / 2
-                cut_x = 18.7 * cos(lit_angle)
-
-                part = part.fuse(_custom_box(dx=stage_dx + dx / 2, dy=dy, dz=stage_dz + 12.7,
-                                             x=-dx / 2, y=4, z=dz + 12.7, dir=(1, 0, -1)))
-
-                part.translate(App.Vector(dx / 2, 25.4 - 15.2 + obj.SlotLength.Value / 2, -6.4))
-                part.translate(App.Vector(2.032 + 13.96 - 3.8, -25.91 + 16, -18.67))
-
-                temp = _custom_box(dx=ref_len * cos(beam_angle) + 12.2, dy=dy / sin(lit_angle) + 15, dz=dz,
-                                   x=-cut_x + 9, y=-(dx - cut_x) * cos(lit_angle) - 15, z=-6 - 3.07, dir=(-1, 1, 1))
-                temp.rotate(App.Vector(-cut_x, 0, 0), App.Vector(0, 0, 1), -obj.LittrowAngle.Value)
-                temp.translate(App.Vector(-extra_x + 36, -20.7 / 2 * sin(lit_angle) - 6 * cos(lit_angle), .2))
+        dx = obj.ArmThickness.Value
+        dy = 45
+        dz = 17
+        stage_dx = obj.StageLength.Value
+        stage_dz = obj.StageThickness.Value
 
-                part = part.cut(temp)
-                part.Placement = obj.Placement
+        part = _custom_box(dx=dx, dy=dy, dz=dz - obj.ArmClearance.Value,
+                           x=0, y=4, z=obj.ArmClearance.Value)
+        part = part.fuse(_custom_box(dx=stage_dx, dy=dy, dz=dz - obj.ArmClearance.Value,
+                                     x=0, y=4, z=dz, dir=(1, 0, -1)))
+        for ddy in [15.2, 38.1]:
+            part = part.cut(_custom_box(dx=stage_dx + dx, dy=obj.SlotLength.Value + bolt_4_40['clear_dia'], dz=bolt_4_40['clear_dia'],
+                                        x=stage_dx, y=25.4 - ddy + 2.5, z=6.4,
+                                        fillet=bolt_4_40['clear_dia'] / 2, dir=(-1, 0, 0)))
+            part = part.cut(_custom_box(dx=stage_dx + dx - 5 - 4, dy=obj.SlotLength.Value + bolt_4_40['head_dia'], dz=bolt_4_40['head_dia'],
+                                        x=stage_dx, y=25.4 - ddy + 2.5, z=6.4,
+                                        fillet=bolt_4_40['head_dia'] / 2, dir=(-1, 0, 0)))
 
-                # Print update when shape changes
-                self.print_update(obj, "Shape updated")
+        extra_y = 0
+        gap = 22
+        lit_angle = radians(90 - obj.LittrowAngle.Value)
+        beam_angle = radians(obj.LittrowAngle.Value)
+        ref_len = gap / sin(2 * beam_angle)
+        ref_x = ref_len * cos(2 * beam_angle)
+        dx2 = ref_x + 9.7 * cos(lit_angle) + (6 + 3.2) * sin(lit_angle)
+        extra_x = 18 - dx2
+        dy2 = gap + 9.7 * sin(lit_angle) + (6 + 3.2) * cos(lit_angle)
+        dz2 = inch / 2
+        cut_x = 18.7 * cos(lit_angle)
 
-                # Cache the shape
-                self._shape_cache = {'key': cache_key, 'shape': part.copy()}
-            else:
-                part = self._shape_cache['shape'].copy()
+        part = part.fuse(_custom_box(dx=stage_dx + dx / 2, dy=dy, dz=stage_dz + 12.7,
+                                     x=-dx / 2, y=4, z=dz + 12.7, dir=(1, 0, -1)))
 
-            obj.Shape = part
-            obj.DrillPart = part
-        finally:
-            App.ActiveDocument.commitTransaction()
+        part.translate(App.Vector(dx / 2, 25.4 - 15.2 + obj.SlotLength.Value / 2, -6.4))
+        part.translate(App.Vector(2.032 + 13.96 - 3.8, -25.91 + 16, -18.67))
+
+        temp = _custom_box(dx=ref_len * cos(beam_angle) + 12.2, dy=dy / sin(lit_angle) + 15, dz=dz,
+                           x=-cut_x + 9, y=-(dx - cut_x) * cos(lit_angle) - 15, z=-6 - 3.07, dir=(-1, 1, 1))
+        temp.rotate(App.Vector(-cut_x, 0, 0), App.Vector(0, 0, 1), -obj.LittrowAngle.Value)
+        temp.translate(App.Vector(-extra_x + 36, -20.7 / 2 * sin(lit_angle) - 6 * cos(lit_angle), .2))
+
+        part = part.cut(temp)
+        part.Placement = obj.Placement
+
+        # Print update when shape changes
+        self.print_update(obj, "Shape updated")
+
+        obj.Shape = part
+        obj.DrillPart = part
 
     def __getstate__(self):
         """Return serializable state, including all properties with type-aware handling."""
@@ -2717,6 +3299,7 @@ class ECDL:
 
 class laser_mount_km100pm_LMR1:
     type = 'Part::FeaturePython'
+    shape_properties = ["ArmClearance", "ArmThickness", "LittrowAngle", "SlotLength", "StageLength", "StageThickness", "RelativePlacement"]
     def __init__(self, obj, drill=True, slot_length=0, countersink=False, counter_depth=3, arm_thickness=8, arm_clearance=2, stage_thickness=6, stage_length=20, mat_thickness=0, littrow_angle=53.43): #54 for 674
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2766,6 +3349,7 @@ class laser_mount_km100pm_LMR1:
         _add_linked_object(obj, "TEC", TEC, pos_offset=(grating_dx+11.1, 0, -33.7), rot_offset=(90, 90, 90))
         _add_linked_object(obj, "Lower Plate", km05_tec_lower_plate, pos_offset=(2.032+13.96-3.8-13.96, 0, -inch/4-6.3-4-upper_plate.Thickness.Value), width=2.5*inch)
 
+    @_cached_execute
     def execute(self, obj):
         dx = obj.ArmThickness.Value
         dy = 45
@@ -2818,6 +3402,7 @@ class laser_mount_km100pm_LMR1:
 
 class laser_mount_km100pm_LMR1_floating:
     type = 'Part::FeaturePython'
+    shape_properties = ["ArmClearance", "ArmThickness", "LittrowAngle", "SlotLength", "StageLength", "StageThickness", "RelativePlacement"]
     def __init__(self, obj, drill=True, slot_length=0, countersink=False, counter_depth=3, arm_thickness=8, 
                  arm_clearance=2, stage_thickness=6, stage_length=20, mat_thickness=0, littrow_angle=53.43, dx_in=-5.334 + 2.032):
         obj.Proxy = self
@@ -2868,6 +3453,7 @@ class laser_mount_km100pm_LMR1_floating:
         _add_linked_object(obj, "TEC", TEC, pos_offset=(grating_dx+11.1, 0, -33.7), rot_offset=(90, 90, 90))
         _add_linked_object(obj, "Lower Plate", km05_tec_lower_plate, pos_offset=(2.032+13.96-3.8-13.96, 0, -inch/4-6.3-4-upper_plate.Thickness.Value), width=2.5*inch)
 
+    @_cached_execute
     def execute(self, obj):
         dx = obj.ArmThickness.Value
         dy = 45
@@ -2937,6 +3523,7 @@ class mount_for_km100pm:
         stage_length (float) : The length of the stage that mounts to the AOM
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["ArmClearance", "ArmThickness", "CounterDepth", "Countersink", "SlotLength", "StageLength", "StageThickness", "RelativePlacement"]
     def __init__(self, obj, drill=True, slot_length=5, countersink=False, counter_depth=3, arm_thickness=8, arm_clearance=2, stage_thickness=4, stage_length=21):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -2954,6 +3541,7 @@ class mount_for_km100pm:
         obj.ViewObject.ShapeColor = adapter_color
         obj.setEditorMode('Placement', 2)
 
+    @_cached_execute
     def execute(self, obj):
         dx = obj.ArmThickness.Value
         dy = 47.5
@@ -2986,6 +3574,7 @@ class mount_for_km100pm:
 
 class lens_mount_fmp1:
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     # type = 'Part::FeaturePython'
     def __init__(self, obj, drill=True, adapter_args = {}):#, thumbscrews=False):
         adapter_args.setdefault("mount_hole_dy", 35)
@@ -2999,6 +3588,8 @@ class lens_mount_fmp1:
         obj.ViewObject.ShapeColor = mount_color
         _add_linked_object(obj, 'surface_adapter', surface_adapter_wide, pos_offset=(1.5 ,0 ,-22.1 ),rot_offset=(0, 0, 0), **adapter_args)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         # mesh = _import_stl("POLARIS-K05S2-Step.stl", (90, -0, -90), (-4.514, 0.254-20, -0.254))
         mesh = _import_stl("FMP1-Step.stl", (180,180, 0), (4.65,0,0))
@@ -3007,6 +3598,7 @@ class lens_mount_fmp1:
 
 class lens_mount_sm1tc:
     type = 'Mesh::FeaturePython'
+    shape_properties = ["BoltLength"]
     def __init__(self, obj, drill=True, adapter_args = {}):#, thumbscrews=False):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3016,6 +3608,8 @@ class lens_mount_sm1tc:
         obj.addProperty('App::PropertyLength', 'BoltLength').BoltLength = 15
         obj.ViewObject.ShapeColor = mount_color
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):        
         mesh = _import_stl("SM1TC_SM1L03.stl", (90,0,90), (1.3,0,0,)) # clamp for tube for lens
         mesh.Placement = obj.Mesh.Placement
@@ -3138,6 +3732,7 @@ class square_hollow:
     gemerate a square hollow on the baseplate
     """
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     # type = 'Part::FeaturePython'
     def __init__(self, obj, drill=True):#, thumbscrews=False):
         obj.Proxy = self
@@ -3154,6 +3749,8 @@ class square_hollow:
         #     _add_linked_object(obj, "Upper Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-15.03, 8.89, 8.89))
         #     _add_linked_object(obj, "Lower Thumbscrew", thumbscrew_hkts_5_64, pos_offset=(-15.03, -8.89, -8.89))
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         # mesh = _import_stl("POLARIS-K05S2-Step.stl", (90, -0, -90), (-4.514, 0.254-20, -0.254))
         mesh = _import_stl("small_box__.stl", (90, -0, -90), (-4.514, 0.254-20, -0.254))
@@ -3184,6 +3781,7 @@ class isomet_1205c_on_km100pm:
         mount_for_km100pm (adapter_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, diffraction_angle=degrees(0.01), forward_direction=1, backward_direction=1, mount_args=dict(), adapter_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3207,6 +3805,8 @@ class isomet_1205c_on_km100pm:
         _add_linked_object(obj, "Adapter Bracket", mount_for_km100pm,
                            pos_offset=(-15.25, -20.15, -17.50), **adapter_args)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("isomet_1205c.stl", (0, 0, 90), (0, 0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -3224,6 +3824,7 @@ class isolator_670:
         surface_adapter (adapter_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, adapter_args=dict()):
         adapter_args.setdefault("mount_hole_dy", 45)
         obj.Proxy = self
@@ -3241,6 +3842,8 @@ class isolator_670:
         _add_linked_object(obj, "Surface Adapter", surface_adapter,
                            pos_offset=(0, 0, -22.1), **adapter_args)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("IOT-5-670-VLP-Step.stl", (90, 0, -90), (-19.05, -0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -3264,6 +3867,7 @@ class isolator_405:
         surface_adapter
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, adapter_args=dict()):
         adapter_args.setdefault("mount_hole_dy", 36)
         obj.Proxy = self
@@ -3281,6 +3885,8 @@ class isolator_405:
         _add_linked_object(obj, "Surface Adapter", surface_adapter,
                            pos_offset=(0, 0, -17.15), **adapter_args)
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("IO-3D-405-PBS-Step.stl", (90, 0, -90), (-9.461, 0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -3299,6 +3905,7 @@ class rb_cell_holder_old:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3308,6 +3915,8 @@ class rb_cell_holder_old:
 
         obj.ViewObject.ShapeColor = adapter_color
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("rb_cell_holder_middle.stl", (0, 0, 0), ([0, 5, 0]))
         mesh.Placement = obj.Mesh.Placement
@@ -3330,6 +3939,7 @@ class photodiode_fds010:
     Photodiode, model FDS010
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3342,6 +3952,8 @@ class photodiode_fds010:
         self.max_angle = 0
         self.max_width = 1
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("FDS010-Step.stl", (-90, -90, 0), (-0.7, 0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -3359,6 +3971,7 @@ class rb_cell_cube:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["CubeSize", "RelativePlacement"]
     def __init__(self, obj, cube_size=10, mount_type=None, mount_args=dict(), drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3373,6 +3986,7 @@ class rb_cell_cube:
         self.max_angle = 10
         self.max_width = 1
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_box(dx=obj.CubeSize.Value, dy=obj.CubeSize.Value, dz=obj.CubeSize.Value,
                            x=0, y=0, z=0, dir=(0, 0, 0))
@@ -3393,6 +4007,7 @@ class rb_cell_cylindrical:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, mount_type=None, mount_args=dict(), drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3408,6 +4023,7 @@ class rb_cell_cylindrical:
         if mount_type != None:
             _add_linked_object(obj, "Mount", mount_type, **mount_args)
 
+    @_cached_execute
     def execute(self, obj):
         cell_dx = 80
         cell_dia = 22
@@ -3443,6 +4059,7 @@ class rotation_stage_rsp05_vertical:
         surface_adapter (adapter_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["BoltLength", "RelativePlacement"]
     def __init__(self, obj, drill=True, thumbscrews=False, bolt_length=15):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3455,6 +4072,8 @@ class rotation_stage_rsp05_vertical:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['RSP05']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("RSP05-Step.stl", (90, -0, 90), (2.084, -1.148, 0.498))
         mesh.Placement = obj.Mesh.Placement
@@ -3476,6 +4095,7 @@ class rb_cell:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill = True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3487,6 +4107,8 @@ class rb_cell:
         self.transmission = True
         self.max_angle = 10
         self.max_width = 1
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("rb_cell_holder_middle.stl", (0, 0, 0), ([0, 5, 0]))
         mesh.Placement = obj.Mesh.Placement
@@ -3515,6 +4137,7 @@ class rb_cell_new:
         drill (bool) : Whether baseplate mounting for this part should be drilled
     '''
     type = 'Part::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3527,6 +4150,7 @@ class rb_cell_new:
         self.max_angle = 10
         self.max_width = 1
 
+    @_cached_execute
     def execute(self, obj):
         cell_dx = 88        #longer tibe, was 88
         cell_dia = 25
@@ -3585,6 +4209,7 @@ class telescope_track:
     a long track enables us to walk the distance of the lens of the telescope
     '''
     type = 'Part::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3593,6 +4218,7 @@ class telescope_track:
         obj.addProperty('Part::PropertyPartShape', 'DrillPart')
 
         obj.ViewObject.ShapeColor = mount_color
+    @_cached_execute
     def execute(self, obj):
         base_dx = 10 * layout.inch
         base_dy = 3 * layout.inch
@@ -3634,6 +4260,7 @@ class photodetector_pda10a2:
     
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True, adapter_args=dict()):
         adapter_args.setdefault("mount_hole_dy", 60)
         obj.Proxy = self
@@ -3650,6 +4277,8 @@ class photodetector_pda10a2:
         _add_linked_object(obj, "Surface Adapter", surface_adapter, pos_offset=(-10.54, 0, -25), **adapter_args)
         _add_linked_object(obj, "Lens Tube", lens_tube_SM1L03, pos_offset=(-0.124, 0, -0))
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("PDA10A2-Step.stl", (90, 0, -90), (-19.87, -0, -0))
         mesh.Placement = obj.Mesh.Placement
@@ -3664,6 +4293,7 @@ class lens_tube_SM1L03:
     SM1 Lens Tube, model SM1L03
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, bounding_box = True):
         self.bounding_box = bounding_box
         obj.Proxy = self
@@ -3677,6 +4307,8 @@ class lens_tube_SM1L03:
         self.max_angle = 0
         self.max_width = 1
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("SM1L03-Step.stl", (90, -0, 0), (8.382, 0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -3735,9 +4367,10 @@ class periscope:
                                             x=i*inch, y=y, z=25, dir=(0,0,-1)))
         part.translate(App.Vector(0, (-1)**obj.Invert*(width/2+inch/2), self.z_off))
         part = part.fuse(part)
+        tools = []
         for i in obj.ChildObjects:
-            part = _drill_part(part, obj, i)
-        obj.Shape = part
+            _drill_tools(obj, i, tools)
+        obj.Shape = _cut_tools(part, tools)
 
 class periscope_for_redstone:
     '''
@@ -3754,6 +4387,7 @@ class periscope_for_redstone:
         mirror_type x2 (mirror_args)
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Invert", "UpperHeight"]
     def __init__(self, obj, drill=True, lower_dz=1.5*inch, upper_dz=3*inch, invert=True, mirror_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3778,6 +4412,7 @@ class periscope_for_redstone:
         #         _add_linked_object(obj, 'Lower Mirror' + str(i) + str(j), circular_mirror, rot_offset=(0, 0, 45), pos_offset=(- 110 + j * 35, 250 - j * 24, 20 +  i * 27), **mirror_args)
                 
 
+    @_cached_execute
     def execute(self, obj):
         width = 0.8*inch 
         # mesh = _import_stl("baseplate_for_periscope_redstone.stl", rotate=(0, 0, 0), translate=(0, 0, 3))
@@ -3812,6 +4447,7 @@ class thumbscrew_hkts_5_64:
         slide_mount (adapter_args)
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True, adapter_args=dict()):
         adapter_args.setdefault("slot_length", 10)
         obj.Proxy = self
@@ -3823,6 +4459,8 @@ class thumbscrew_hkts_5_64:
         obj.ViewObject.ShapeColor = misc_color
         self.part_numbers = ['HKTS-5/64(P4)']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("HKTS-5_64-Step.stl", (90, 0, 90), (-11.31, -0.945, 0.568))
         mesh.Placement = obj.Mesh.Placement
@@ -3837,6 +4475,7 @@ class fiber_adapter_sm05fca2:
     Fiber Adapter Plate, model SM05FCA2
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3846,6 +4485,8 @@ class fiber_adapter_sm05fca2:
         self.max_angle = 0
         self.max_width = 1
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("SM05FCA2-Step.stl", (0, 90, 0), (-2.334, -3.643, -0.435))
         mesh.Placement = obj.Mesh.Placement
@@ -3857,6 +4498,7 @@ class fiber_adapter_sm1fca2:
     Fiber Adapter Plate, model SM1FCA2
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3866,6 +4508,8 @@ class fiber_adapter_sm1fca2:
         self.max_angle = 0
         self.max_width = 1
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("SM1FCA2-Step.stl", (-180, 90, 0), (-12.47, -0.312, 15.41))
         mesh.Placement = obj.Mesh.Placement
@@ -3877,6 +4521,7 @@ class lens_adapter_s05tm09:
     SM05 to M9x0.5 Lens Cell Adapter, model S05TM09
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3884,6 +4529,8 @@ class lens_adapter_s05tm09:
         obj.ViewObject.ShapeColor = misc_color
         self.part_numbers = ['S05TM09']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh =  _import_stl("S05TM09-Step.stl", (90, 0, -90), (6.973, 0, -0))
         mesh.Placement = obj.Mesh.Placement
@@ -3895,6 +4542,7 @@ class lens_adapter_s1tm09:
     SM1 to M9x0.5 Lens Cell Adapter, model S1TM09
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3902,6 +4550,8 @@ class lens_adapter_s1tm09:
         obj.ViewObject.ShapeColor = misc_color
         self.part_numbers = ['S1TM09']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh =  _import_stl("S1TM09-Step.stl", (90, 0, 90), (-3.492, 0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -3913,6 +4563,7 @@ class lens_tube_sm05l05:
     Lens Tube, model SM05L05
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3920,6 +4571,8 @@ class lens_tube_sm05l05:
         obj.ViewObject.ShapeColor = misc_color
         self.part_numbers = ['SM05L05']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("SM05L05-Step.stl", (90, 0, -90), (0, 0, -0))
         mesh.Placement = obj.Mesh.Placement
@@ -3931,6 +4584,7 @@ class lens_tube_sm1l05:
     Lens Tube, model SM1L05
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = ["RelativePlacement"]
     def __init__(self, obj, drill=True):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3941,6 +4595,8 @@ class lens_tube_sm1l05:
         obj.ViewObject.ShapeColor = misc_color
         self.part_numbers = ['SM1L05']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("SM1L05-Step.stl", (90, -0, 0), (13.46, 0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -3956,6 +4612,7 @@ class mounted_lens_c220tmda:
     Mounted Aspheric Lens, model C220TMD-A
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3963,6 +4620,8 @@ class mounted_lens_c220tmda:
         obj.ViewObject.ShapeColor = glass_color
         self.part_numbers = ['C220TMD-A']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("C220TMD-A-Step.stl", (-90, 0, -180), (0.419, 0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -3974,6 +4633,7 @@ class diode_adapter_s05lm56:
     Diode Mount Adapter, model S05LM56
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -3981,6 +4641,8 @@ class diode_adapter_s05lm56:
         obj.ViewObject.ShapeColor = misc_color
         self.part_numbers = ['S05LM56']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("S05LM56-Step.stl", (90, 0, -90), (0, 0, -0))
         mesh.Placement = obj.Mesh.Placement
@@ -3997,6 +4659,7 @@ class Room_temp_chamber:
         thumbscrews (bool): Whether or not to add two HKTS 5-64 adjusters
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4004,6 +4667,8 @@ class Room_temp_chamber:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['Room_temp_chamber']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("Room_temp_chamber_step.stl", (0, 0, 0), (-48.89, 1.266, 0.813))
         mesh.Placement = obj.Mesh.Placement
@@ -4021,6 +4686,7 @@ class Room_temp_chamber_Mechanical:
         thumbscrews (bool): Whether or not to add two HKTS 5-64 adjusters
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4028,6 +4694,8 @@ class Room_temp_chamber_Mechanical:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['Room_temp_chamber']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("Room Temp Chamber Mechanical.stl", (0, 0, 0), (-33.46, -10.12, -59.69))
         mesh.Placement = obj.Mesh.Placement
@@ -4044,6 +4712,7 @@ class Room_temp_chamber_Mechanical_with_chip:
         thumbscrews (bool): Whether or not to add two HKTS 5-64 adjusters
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4051,6 +4720,8 @@ class Room_temp_chamber_Mechanical_with_chip:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['Room_temp_chamber']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("room temperature chamber with chip.stl", (0, 0, 45), (-33.46, -10.12, -59.69))
         mesh.Placement = obj.Mesh.Placement
@@ -4066,6 +4737,7 @@ class TEC:
         thumbscrews (bool): Whether or not to add two HKTS 5-64 adjusters
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4073,6 +4745,8 @@ class TEC:
         obj.ViewObject.ShapeColor = mount_color
         self.part_numbers = ['TEC']
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh =  _import_stl("TEC.stl", (180, 0, 90), (0, 0, 0))
         mesh.Placement = obj.Mesh.Placement
@@ -4081,6 +4755,7 @@ class TEC:
 class box:
 
     type = 'Part::FeaturePython'
+    shape_properties = ["Height", "Thickness", "Width"]
     def __init__(self, obj, drill=True, thickness=3, width=10, height=10, part_number=''):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4093,6 +4768,7 @@ class box:
         obj.ViewObject.ShapeColor = misc_color
         self.part_numbers = [part_number]
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_box(dx=obj.Thickness.Value, dy=obj.Width.Value, dz=obj.Height.Value,
                            x=0, y=0, z=0, dir=(-1, 0, 0))
@@ -4110,6 +4786,7 @@ class square_grating:
         part_number (string) : The part number of the grating being used
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Height", "Thickness", "Width"]
     def __init__(self, obj, drill=True, thickness=6, width=12.7, height=12.7, part_number=''):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4125,6 +4802,7 @@ class square_grating:
         self.max_angle = 90
         self.max_width = width
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_box(dx=obj.Thickness.Value, dy=obj.Width.Value, dz=obj.Height.Value,
                            x=0, y=0, z=0, dir=(-1, 0, 0))
@@ -4142,6 +4820,7 @@ class circular_splitter:
         part_number (string) : The part number of the plate being used
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Diameter", "Thickness"]
     def __init__(self, obj, drill=True, thickness=3, diameter=inch/2, part_number='', mount_type=None, mount_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4161,6 +4840,7 @@ class circular_splitter:
         self.max_angle = 90
         self.max_width = diameter
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_cylinder(dia=obj.Diameter.Value, dz=obj.Thickness.Value,
                            x=0, y=0, z=0, dir=(-1, 0, 0))
@@ -4176,6 +4856,7 @@ class cube_splitter:
         cube_part_number (string) : The Thorlabs part number of the splitter cube being used
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["CubeSize", "Proxy.reflection_angle"]
     def __init__(self, obj, cube_size=10, invert=False, cube_part_number='', mount_type=None, mount_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4198,6 +4879,7 @@ class cube_splitter:
         if mount_type != None:
             _add_linked_object(obj, "Mount", mount_type, pos_offset=(0, 0, -cube_size/2), **mount_args)
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_box(dx=obj.CubeSize.Value, dy=obj.CubeSize.Value, dz=obj.CubeSize.Value,
                            x=0, y=0, z=0, dir=(0, 0, 0))
@@ -4217,6 +4899,7 @@ class waveplate_with_cube:
         cube_part_number (string) : The Thorlabs part number of the splitter cube being used
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["CubeSize", "Proxy.reflection_angle"]
     def __init__(self, obj, cube_size=0.5 * inch, invert=False, cube_part_number='', mount_type=None, mount_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4238,6 +4921,7 @@ class waveplate_with_cube:
 
         _add_linked_object(obj, "rotational stage", rotation_stage_rsp05 , pos_offset=(-1/2 + 15, 0, 0),adapter = False)
         _add_linked_object(obj, "Surface Adapter", surface_adapter_for_waveplate_cube, pos_offset=(1.397 + 15, 0, -13.97), rot_offset=(0, 0, 90*obj.Invert))
+    @_cached_execute
     def execute(self, obj):
         part = _custom_box(dx=obj.CubeSize.Value, dy=obj.CubeSize.Value, dz=obj.CubeSize.Value,
                            x=0, y=0, z=0, dir=(0, 0, 0))
@@ -4261,6 +4945,7 @@ class surface_adapter_for_waveplate_cube:
         outer_thickness (float) : The thickness of the walls around the bolt holes
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["AdapterHeight", "MountHoleDistance", "OuterThickness", "RelativePlacement", "Proxy.drill_tolerance"]
     def __init__(self, obj, drill=True, mount_hole_dy=20, adapter_height=11.4, outer_thickness=2):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4276,6 +4961,7 @@ class surface_adapter_for_waveplate_cube:
         self.drill_tolerance = 1
 
         
+    @_cached_execute
     def execute(self, obj):
         dx = bolt_8_32['head_dia']+obj.OuterThickness.Value*2
         dy = dx+obj.MountHoleDistance.Value
@@ -4315,6 +5001,7 @@ class ruler_125mm:
     125mm ruler
     '''
     type = 'Part::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, focal_length=50, thickness=3, diameter=inch/2, part_number='', mount_type=None, mount_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4335,6 +5022,7 @@ class ruler_125mm:
         self.max_angle = 90
         self.max_width = diameter
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_cylinder(dia=2, dz=125,
                                 x=0, y=0, z=0, dir=(1, 0, 0))
@@ -4352,6 +5040,7 @@ class circular_lens:
         part_number (string) : The part number of the lens being used
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Diameter", "Thickness"]
     def __init__(self, obj, drill=True, focal_length=50, thickness=3, diameter=inch/2, part_number='', mount_type=None, mount_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4372,6 +5061,7 @@ class circular_lens:
         self.max_angle = 90
         self.max_width = diameter
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_cylinder(dia=obj.Diameter.Value, dz=obj.Thickness.Value,
                                 x=-obj.Thickness.Value/2, y=0, z=0, dir=(1, 0, 0))
@@ -4391,6 +5081,7 @@ class cylindrical_lens:
         part_number (string) : The part number of the lens being used
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Height", "Thickness", "Width"]
     def __init__(self, obj, drill=True, focal_length=50, thickness=4, width=20, height=22, slots=False, part_number='', mount_type=skate_mount, mount_args=dict()):
         mount_args.setdefault("cube_dx", thickness)
         mount_args.setdefault("cube_dy", width)
@@ -4416,6 +5107,7 @@ class cylindrical_lens:
         self.max_angle = 90
         self.max_width = width
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_box(dx=obj.Thickness.Value, dy=obj.Width.Value, dz=obj.Height.Value,
                            x=0, y=0, z=0,
@@ -4434,6 +5126,7 @@ class waveplate:
         part_number (string) : The part number of the waveplate being used
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Diameter", "Thickness"]
     def __init__(self, obj, drill=True, thickness=1, diameter=inch/2, part_number='', mount_type=None, mount_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4452,6 +5145,7 @@ class waveplate:
         self.max_angle = 90
         self.max_width = diameter
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_cylinder(dia=obj.Diameter.Value, dz=obj.Thickness.Value,
                                 x=-obj.Thickness.Value/2, y=0, z=0, dir=(1, 0, 0))
@@ -4469,6 +5163,7 @@ class circular_mirror:
         part_number (string) : The part number of the mirror being used
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Diameter", "Thickness"]
     def __init__(self, obj, drill=True, thickness=6, diameter=inch/2, part_number='', mount_type=None, mount_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4486,6 +5181,7 @@ class circular_mirror:
         self.max_angle = 90
         self.max_width = diameter
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_cylinder(dia=obj.Diameter.Value, dz=obj.Thickness.Value,
                            x=0, y=0, z=0, dir=(-1, 0, 0))
@@ -4502,6 +5198,7 @@ class moon_mirror:
         part_number (string) : The part number of the mirror being used
     '''
     type = 'Mesh::FeaturePython'
+    shape_properties = []
     def __init__(self, obj, drill=True, thickness=6, diameter=inch/2, part_number='', mount_type=None, mount_args=dict()):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4519,6 +5216,8 @@ class moon_mirror:
         self.max_angle = 90
         self.max_width = diameter
 
+    @_use_detail
+    @_cached_execute
     def execute(self, obj):
         mesh = _import_stl("BBD05-E02-Step.stl", (-30,-120,-30), (-3,1, 4))
         mesh.Placement = obj.Mesh.Placement
@@ -4537,6 +5236,7 @@ class square_mirror:
         part_number (string) : The part number of the mirror being used
     '''
     type = 'Part::FeaturePython'
+    shape_properties = ["Height", "Thickness", "Width"]
     def __init__(self, obj, drill=True, thickness=3.2, width=12.7, height=12.7, part_number=''):
         obj.Proxy = self
         ViewProvider(obj.ViewObject)
@@ -4552,6 +5252,7 @@ class square_mirror:
         self.max_angle = 90
         self.max_width = width
 
+    @_cached_execute
     def execute(self, obj):
         part = _custom_box(dx=obj.Thickness.Value, dy=obj.Width.Value, dz=obj.Height.Value,
                            x=0, y=0, z=0, dir=(-1, 0, 0))
@@ -4574,7 +5275,6 @@ class ViewProvider:
         """Initialize the view provider with a safe object reference."""
         obj.Proxy = self
         self.Object = None  # Initialize as None, will be set later if available
-        self.needs_recompute = False  # Flag to track recompute necessity
         if has_gui and hasattr(obj, 'Object') and obj.Object:
             self.Object = obj.Object
         else:
@@ -4604,6 +5304,8 @@ class ViewProvider:
             if hasattr(feature.Object, "ChildObjects"):
                 for obj in feature.Object.ChildObjects:
                     App.ActiveDocument.removeObject(obj.Name)
+            if getattr(feature.Object, "Instance", None) != None:
+                App.ActiveDocument.removeObject(feature.Object.Instance.Name)
         return True
 
     def updateData(self, obj, prop):
@@ -4615,19 +5317,21 @@ class ViewProvider:
                 print("Warning: updateData called with no GUI or Object available.", flush=True)
                 return
 
+        if recompute.defer(self, obj, prop):
+            return
         if has_gui and str(prop) == "BasePlacement":
             if hasattr(obj, 'Baseplate') and obj.Baseplate is not None:
                 try:
                     obj.Placement.Base = obj.BasePlacement.Base + obj.Baseplate.Placement.Base
                     obj.Placement = App.Placement(obj.Placement.Base, obj.Baseplate.Placement.Rotation, -obj.BasePlacement.Base)
                     obj.Placement.Rotation = obj.Placement.Rotation.multiply(obj.BasePlacement.Rotation)
-                    self.needs_recompute = True  # Mark for recompute
+                    recompute.mark(obj)
                 except AttributeError as e:
                     print(f"Warning: Placement update failed: {e}", flush=True)
             else:
                 if hasattr(obj, 'BasePlacement'):
                     obj.Placement = obj.BasePlacement
-                    self.needs_recompute = True  # Mark for recompute
+                    recompute.mark(obj)
             if hasattr(obj, "ChildObjects"):
                 for child in obj.ChildObjects:
                     if hasattr(child, 'BasePlacement') and hasattr(child, 'RelativePlacement'):
@@ -4637,28 +5341,27 @@ class ViewProvider:
                         else:
                             child.BasePlacement = App.Placement(child.BasePlacement.Base, obj.BasePlacement.Rotation, -child.RelativePlacement.Base)
                             child.BasePlacement.Rotation = child.BasePlacement.Rotation.multiply(child.RelativePlacement.Rotation)
-                        self.needs_recompute = True  # Mark for recompute
+                        recompute.mark(child)
             if hasattr(obj, "RelativeObjects"):
                 for child in obj.RelativeObjects:
                     if hasattr(child, 'BasePlacement') and hasattr(child, 'RelativePlacement'):
                         child.BasePlacement.Base = obj.BasePlacement.Base + child.RelativePlacement.Base
-                        self.needs_recompute = True  # Mark for recompute
+                        recompute.mark(child)
         elif has_gui and str(prop) == "Angle":
             if hasattr(obj, 'BasePlacement'):
                 obj.BasePlacement.Rotation = App.Rotation(App.Vector(0, 0, 1), obj.Angle)
-                self.needs_recompute = True  # Mark for recompute
+                recompute.mark(obj)
+        elif str(prop) == "Placement" and getattr(obj, "Instance", None) != None:
+            obj.Instance.Placement = obj.Placement  # links only carry the transform of their component
         return
 
-    def onChanged(self, vp, prop):
-        """Handle property changes to trigger recompute if needed."""
-        if has_gui and prop == "needs_recompute" and self.needs_recompute:
-            App.ActiveDocument.recompute()
-            self.needs_recompute = False  # Reset flag
-
     def claimChildren(self):
         """Safely claim child objects, returning an empty list if Object is unavailable."""
-        if has_gui and hasattr(self, 'Object') and self.Object and hasattr(self.Object, "ChildObjects"):
-            return self.Object.ChildObjects
+        if has_gui and hasattr(self, 'Object') and self.Object:
+            children = list(getattr(self.Object, "ChildObjects", []))
+            if getattr(self.Object, "Instance", None) != None:
+                children.append(self.Object.Instance)
+            return children
         return []
 
     def getIcon(self):
@@ -5290,4 +5993,4 @@ class ViewProvider:
 #     def execute(self, obj):
 #         mesh = _import_stl("periscope_for_redstone.stl", (0, 0, 0), (20, 20, 20))
 #         mesh.Placement = obj.Mesh.Placement
-#         obj.Mesh = mesh
\ No newline at end of file
+#         obj.Mesh = mesh
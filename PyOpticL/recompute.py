@@ -0,0 +1,167 @@
+import FreeCAD as App
+
+try:
+    from PySide import QtCore
+except ImportError:
+    QtCore = None # headless, the queue is only flushed by transactions or release
+
+_dirty = {} # document name -> names of objects waiting for a recompute
+_holds = 0
+_scheduled = False
+_deferred = None # view provider updates recorded while deferring, in the order they first happened
+_recomputing = set() # names of the documents being recomputed
+_observer_instance = None # document observer, only registered by install
+
+def install():
+    '''
+    Start recomputing marked objects automatically, by registering the document observer and
+    flushing the queue when control returns to the event loop. Until this is called marked
+    objects are only touched, as before the queue existed
+    '''
+    global _observer_instance
+    if _observer_instance == None:
+        _observer_instance = _observer()
+        App.addDocumentObserver(_observer_instance)
+
+def uninstall():
+    '''
+    Stop recomputing marked objects automatically and forget the queue
+    '''
+    global _observer_instance
+    if _observer_instance != None:
+        App.removeDocumentObserver(_observer_instance)
+        _observer_instance = None
+    _dirty.clear()
+    _recomputing.clear()
+
+def mark(obj):
+    '''
+    Queue a PyOpticL object for the next batched recompute instead of recomputing the document now
+
+    Args:
+        obj (obj): The object whose properties changed
+    '''
+    obj.touch()
+    if _observer_instance == None:
+        return
+    _dirty.setdefault(obj.Document.Name, set()).add(obj.Name)
+    _schedule()
+
+def pending(doc=None):
+    '''
+    Get the names of the objects waiting for a recompute
+
+    Args:
+        doc (Document): The document to check, defaults to the active document
+    '''
+    doc = doc or App.ActiveDocument
+    return set(_dirty.get(doc.Name, set())) if doc != None else set()
+
+def hold():
+    '''
+    Stop flushing the queue until release is called, such as while a script places many elements
+    '''
+    global _holds
+    _holds += 1
+
+def release(flush_queue=True):
+    '''
+    Undo one hold, flushing the queue once the last hold is released
+
+    Args:
+        flush_queue (bool): Whether to recompute queued objects now rather than at the next flush
+    '''
+    global _holds
+    _holds = max(_holds-1, 0)
+    if _holds == 0 and flush_queue:
+        flush()
+
+class held:
+    '''
+    Context in which queued objects are only recomputed once, when it exits
+    '''
+    def __enter__(self):
+        hold()
+
+    def __exit__(self, *args):
+        release()
+
+def flush():
+    '''
+    Recompute the queued objects and the objects depending on them once per document, leaving
+    documents already recomputing queued
+    '''
+    global _scheduled
+    _scheduled = False
+    if _holds > 0:
+        return
+    for name in list(_dirty):
+        if name in _recomputing:
+            continue
+        objs = _dirty.pop(name)
+        doc = App.getDocument(name) if name in App.listDocuments() else None
+        objs = [doc.getObject(i) for i in objs] if doc != None else []
+        objs = [i for i in objs if i != None]
+        if len(objs) > 0:
+            # other touched objects in the document are left for the user's next recompute
+            depending = {i.Name: i for obj in objs for i in obj.InListRecursive}
+            depending.update((i.Name, i) for i in objs)
+            doc.recompute(list(depending.values()))
+
+def defer(view_provider, obj, prop):
+    '''
+    Record a view provider update instead of handling it, while updates are deferred
+
+    Args:
+        view_provider (ViewProvider): The view provider receiving the update
+        obj (obj): The object whose property changed
+        prop (string): The name of the changed property
+
+    Returns:
+        True if the update was recorded and should be skipped now
+    '''
+    if _deferred == None:
+        return False
+    _deferred.setdefault((obj.Document.Name, obj.Name, str(prop)), view_provider)
+    return True
+
+def defer_updates():
+    '''
+    Start recording view provider updates rather than handling each as it happens
+    '''
+    global _deferred
+    if _deferred == None:
+        _deferred = {}
+
+def replay_updates():
+    '''
+    Stop deferring and handle each recorded view provider update once, in the order they were recorded
+    '''
+    global _deferred
+    updates, _deferred = _deferred, None
+    for (doc_name, name, prop), view_provider in (updates or {}).items():
+        obj = App.getDocument(doc_name).getObject(name) if doc_name in App.listDocuments() else None
+        if obj != None:
+            view_provider.updateData(obj, prop)
+
+def _schedule():
+    # flush once control returns to the event loop, which is after the current script statement or GUI event
+    global _scheduled
+    if _scheduled or _holds > 0 or QtCore == None or QtCore.QCoreApplication.instance() == None:
+        return
+    _scheduled = True
+    QtCore.QTimer.singleShot(0, flush)
+
+class _observer:
+    # flush at the end of transactions and forget objects a document recompute already handled,
+    # never starting a recompute from inside one such as for a transaction committed by an execute
+    def slotCommitTransaction(self, doc):
+        if _holds == 0 and doc.Name in _dirty and doc.Name not in _recomputing:
+            flush()
+
+    def slotBeforeRecomputeDocument(self, doc):
+        _recomputing.add(doc.Name)
+
+    def slotRecomputedDocument(self, doc):
+        _recomputing.discard(doc.Name)
+        _dirty.pop(doc.Name, None)
@@ -0,0 +1,888 @@
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from math import cos, floor, hypot, inf, isclose, pi, sin, tan
+
+import numpy as np
+
+# tolerance on angles being multiples of a factor
+mult_tol = 1e-5
+
+def _is_mult(x, factor, tol=mult_tol):
+    return (np.abs(x)+tol/2)%factor <= tol
+
+def _fold(a):
+    # fold an angle in [0, 2pi) onto [0, pi]
+    return np.where(a > pi, 2*pi-a, a)
+
+def _same(a, b):
+    # compare component signatures, allowing for rounding in placements written back to the document
+    if len(a) != len(b):
+        return False
+    for i, j in zip(a, b):
+        if isinstance(i, float) and isinstance(j, float):
+            if not isclose(i, j, abs_tol=1e-9):
+                return False
+        elif i != j:
+            return False
+    return True
+
+def _rounded(values):
+    # round floats so equal states always give the same hash
+    return tuple(round(float(i), 9) if isinstance(i, float) else i for i in values)
+
+class interaction_table:
+    '''
+    Struct-of-arrays description of every optical component a beam can interact with
+
+    Args:
+        size (int): The number of components stored in the table
+    '''
+    def __init__(self, size):
+        self.size = size
+        # component pose
+        self.x = np.zeros(size)
+        self.y = np.zeros(size)
+        self.angle = np.zeros(size) # normal angle in radians
+        # limits on incomming beam
+        self.max_width = np.zeros(size)
+        self.max_angle = np.zeros(size) # radians
+        self.block_width = np.zeros(size) # zero if the component never blocks
+        # interaction flags and parameters
+        self.transmission = np.zeros(size, dtype=bool)
+        self.reflection = np.zeros(size, dtype=bool)
+        self.reflection_angle = np.zeros(size) # radians
+        self.diffraction = np.zeros(size, dtype=bool)
+        self.diffraction_angle = np.zeros(size) # radians
+        self.diffraction_dir = np.zeros((size, 2))
+        self.directional = np.zeros(size, dtype=bool)
+        self.lens = np.zeros(size, dtype=bool)
+        self.focal_length = np.zeros(size)
+
+    def take(self, indices):
+        '''
+        Copy a subset of the table
+
+        Args:
+            indices (int[]): The components to keep, in order
+
+        Returns:
+            A new interaction_table holding only the given components
+        '''
+        table = interaction_table(len(indices))
+        for key, value in vars(self).items():
+            if key != "size":
+                setattr(table, key, value[indices])
+        return table
+
+    def footprint(self, i):
+        # radius around a component within which it can interact with a beam
+        return max(self.max_width[i], self.block_width[i])/2
+
+class grid_index:
+    '''
+    Uniform grid over the footprints of the components in an interaction table
+
+    Args:
+        table (interaction_table): The components to index
+        cell (float): The side length of each grid cell
+    '''
+    def __init__(self, table, cell=25.4):
+        self.table = table
+        self.cell = cell
+        self.cells = {}
+        self.ranges = [None]*table.size
+        self.bounds = [inf, inf, -inf, -inf]
+        for i in range(table.size):
+            self.update(i)
+
+    def _range(self, i):
+        r = self.table.footprint(i)
+        x, y = self.table.x[i], self.table.y[i]
+        return (floor((x-r)/self.cell), floor((y-r)/self.cell),
+                floor((x+r)/self.cell), floor((y+r)/self.cell))
+
+    def update(self, i):
+        '''
+        Re-bin a component after its pose in the table has changed
+
+        Args:
+            i (int): The table index of the component
+        '''
+        new = self._range(i)
+        old = self.ranges[i]
+        if new == old:
+            return
+        if old != None:
+            for cx in range(old[0], old[2]+1):
+                for cy in range(old[1], old[3]+1):
+                    self.cells[cx, cy].discard(i)
+        for cx in range(new[0], new[2]+1):
+            for cy in range(new[1], new[3]+1):
+                self.cells.setdefault((cx, cy), set()).add(i)
+        self.ranges[i] = new
+        # bounds only ever grow so the traversal stays conservative
+        self.bounds = [min(self.bounds[0], new[0]), min(self.bounds[1], new[1]),
+                       max(self.bounds[2], new[2]+1), max(self.bounds[3], new[3]+1)]
+
+    def query(self, x1, y1, a1):
+        '''
+        Find every component whose footprint a ray passes through
+
+        Args:
+            x1, y1, a1 (float): The start point and angle of the ray
+
+        Returns:
+            A boolean mask over the table, True for components the ray can reach
+        '''
+        mask = np.zeros(self.table.size, dtype=bool)
+        if self.table.size == 0:
+            return mask
+
+        # ray in grid units, clipped to the indexed area
+        px, py = x1/self.cell, y1/self.cell
+        dx, dy = np.cos(a1), np.sin(a1)
+        t0, t1 = 0, inf
+        for p, d, lo, hi in [(px, dx, self.bounds[0], self.bounds[2]), (py, dy, self.bounds[1], self.bounds[3])]:
+            if abs(d) < 1e-12:
+                if p < lo or p > hi:
+                    return mask
+                continue
+            ta, tb = (lo-p)/d, (hi-p)/d
+            t0, t1 = max(t0, min(ta, tb)), min(t1, max(ta, tb))
+        if t0 > t1:
+            return mask
+
+        # walk the cells crossed by the ray
+        cx = min(max(floor(px+t0*dx), self.bounds[0]), self.bounds[2]-1)
+        cy = min(max(floor(py+t0*dy), self.bounds[1]), self.bounds[3]-1)
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        next_x = (cx+(dx > 0)-px)/dx if abs(dx) >= 1e-12 else inf
+        next_y = (cy+(dy > 0)-py)/dy if abs(dy) >= 1e-12 else inf
+        delta_x = abs(1/dx) if abs(dx) >= 1e-12 else inf
+        delta_y = abs(1/dy) if abs(dy) >= 1e-12 else inf
+        while self.bounds[0] <= cx < self.bounds[2] and self.bounds[1] <= cy < self.bounds[3]:
+            for i in self.cells.get((cx, cy), ()):
+                mask[i] = True
+            if next_x < next_y:
+                cx += step_x
+                next_x += delta_x
+            else:
+                cy += step_y
+                next_y += delta_y
+        return mask
+
+def check_interactions(x1, y1, a1, table, mask=None):
+    '''
+    Find where a beam meets every component in a table, and the beams leaving each, in one batched pass
+
+    Args:
+        x1, y1, a1 (float): The start point and angle of the beam
+        table (interaction_table): The components to check against
+        mask (bool[]): Optional per-component flag to exclude components from the check
+
+    Returns:
+        hit (bool[]): Whether the beam interacts with each component
+        x, y (float[]): The interaction points
+        dist (float[]): The distance from the beam start to each interaction point
+        angle1, angle2 (float[]): The two possible output angles, nan where not produced
+        block (bool[]): Whether each component blocks the beam
+    '''
+    x2, y2 = table.x, table.y
+
+    # check if component is on the correct side of the beam
+    hit = _fold(np.abs(a1-np.arctan2(y2-y1, x2-x1))%(2*pi)) <= pi/2
+    if mask is not None:
+        hit &= mask
+
+    # transmitted, diffracted and reflected beams
+    a_norm = table.angle
+    a_norm = np.where(table.transmission, (a_norm+pi)%(2*pi), a_norm)
+    a_norm = np.where(table.diffraction, (a_norm+pi)%(2*pi), a_norm)
+    a_norm = np.where(table.reflection, (a_norm+table.reflection_angle)%(2*pi), a_norm)
+    angle1 = np.where(table.transmission, a1, np.nan)
+    angle2 = np.where(table.diffraction, a1+table.diffraction_angle, np.nan)
+    angle2 = np.where(table.reflection, 2*a_norm-a1-pi, angle2)
+
+    a2 = a_norm+pi/2 # angle of interaction surface
+
+    # relative angle between the beam and component input normal
+    a_in = _fold(np.abs(a1-a_norm+pi)%(2*pi))
+    forward = a_in < pi/2
+
+    direction = np.where(forward, table.diffraction_dir[:, 0], table.diffraction_dir[:, 1])
+    angle2 = np.where(table.directional, a1+table.diffraction_angle*direction, angle2)
+
+    # check for edge cases
+    a1_vert = bool(_is_mult(a1-pi/2, pi))
+    a2_vert = _is_mult(a2-pi/2, pi)
+    a12_hor = _is_mult(a1, pi) & _is_mult(a2, pi) | _is_mult(a1-a2, pi)
+
+    # calculate intersection of the beam and the surface
+    t1 = tan(a1)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        t2 = np.tan(a2)
+        if a1_vert:
+            x = np.full(table.size, float(x1))
+        else:
+            x = np.where(a2_vert | a12_hor, x2, (y2-x2*t2-y1+x1*t1)/(t1-t2))
+        if not a1_vert:
+            y = x*t1+y1-x1*t1
+        else:
+            y = np.where(a2_vert, y2, x*t2+y2-x2*t2)
+
+    # total distance to interaction
+    ref_d = np.hypot(x-x2, y-y2)
+
+    # refracted beam
+    offset = pi/2-np.arctan2(table.focal_length, ref_d)
+    offset = np.where(_is_mult(np.abs(a2-np.arctan2(y-y2, x-x2))%(2*pi), 2*pi), -offset, offset)
+    offset = np.where(forward, -offset, offset)
+    angle1 = np.where(table.lens, angle1+offset, angle1)
+
+    # check if beam is from current object
+    hit &= ~((np.abs(x-x1) <= mult_tol) & (np.abs(y-y1) <= mult_tol))
+
+    # check against max width and blocking width
+    outside = ref_d > table.max_width/2
+    block = outside & (ref_d < table.block_width/2)
+    hit &= ~outside | block
+
+    # check against max angle
+    block |= np.where(table.transmission,
+                      (a_in > table.max_angle) & (pi-a_in > table.max_angle),
+                      a_in > table.max_angle)
+
+    dist = np.hypot(x-x1, y-y1)
+    hit &= np.isfinite(dist)
+    return hit, x, y, dist, angle1, angle2, block
+
+def nearest_interaction(x1, y1, a1, table, mask=None):
+    '''
+    Find the first component a beam interacts with
+
+    Args:
+        x1, y1, a1 (float): The start point and angle of the beam
+        table (interaction_table): The components to check against
+        mask (bool[]): Optional per-component flag to exclude components from the check
+
+    Returns:
+        The table index, interaction point, distance, output angles and block flag
+        of the nearest interaction, or None if the beam hits nothing
+    '''
+    # only evaluate the candidate components
+    indices = np.arange(table.size) if mask is None else np.flatnonzero(mask)
+    if len(indices) == 0:
+        return None
+    hit, x, y, dist, angle1, angle2, block = check_interactions(x1, y1, a1, table.take(indices))
+    if not hit.any():
+        return None
+    i = int(np.argmin(np.where(hit, dist, np.inf)))
+    angles = [None if np.isnan(a) else float(a) for a in (angle1[i], angle2[i])]
+    return int(indices[i]), float(x[i]), float(y[i]), float(dist[i]), angles, bool(block[i])
+
+# beam indices gain a bit for every split and can outgrow int64, so segments refer to them by
+# their position in beam_segments.beam_indices, which keeps them as python ints
+segment_dtype = np.dtype([("x", float), ("y", float), ("z", float), ("angle", float), ("length", float),
+                          ("beam", np.int64), ("hit", np.int64), ("block", bool)])
+
+class beam_segments:
+    '''
+    Compact store of the segments of a traced beam path
+
+    Args:
+        array (ndarray): The segments in trace order as a structured array of segment_dtype
+        names (string[]): The component names referred to by the hit field, which is -1 where no component was hit
+        beam_indices (int[]): The beam indices referred to by the beam field
+    '''
+    def __init__(self, array, names, beam_indices=()):
+        self.array = array
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.beam_indices = list(beam_indices)
+        self.beams = {beam_index: i for i, beam_index in enumerate(self.beam_indices)}
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.array)
+
+    def __getitem__(self, i):
+        return self.array[i]
+
+    def by_beam(self, beam_index):
+        '''
+        Get the segments of a single beam
+
+        Args:
+            beam_index (int): The beam index of the segments
+
+        Returns:
+            The matching segments in trace order
+        '''
+        return self.array[self.array["beam"] == self.beams.get(beam_index, -1)]
+
+    def hitting(self, name):
+        '''
+        Get the segments which end on a component
+
+        Args:
+            name (string): Name of the component
+
+        Returns:
+            The matching segments in trace order
+        '''
+        return self.array[self.array["hit"] == self.ids.get(name, -2)]
+
+    def path_length(self, name):
+        '''
+        Get the distance travelled by the beam from its source to a component
+
+        Args:
+            name (string): Name of the component
+
+        Returns:
+            The path length to the first interaction with the component, or None if it is never hit
+        '''
+        hits = np.flatnonzero(self.array["hit"] == self.ids.get(name, -2))
+        if len(hits) == 0:
+            return None
+        k = hits[0]
+        beam = self.array["beam"][k]
+        beam_index = self.beam_indices[beam]
+        ancestors = [self.beams[beam_index>>i] for i in range(1, beam_index.bit_length()) if beam_index>>i in self.beams]
+        on_path = np.isin(self.array["beam"], ancestors)
+        on_path[:k+1] |= self.array["beam"][:k+1] == beam
+        return float(self.array["length"][on_path].sum())
+
+class element:
+    '''
+    Plain description of a component which can take part in a beam trace
+
+    Args:
+        name (string): Unique name of the component
+        x, y (float): The position of the component
+        angle (float): The rotation of the component about the z axis in radians
+        max_width (float): The width of the optical surface, None if the component is not optical
+        max_angle (float): The maximum angle of incidence in radians
+        block_width (float): The width within which the component blocks beams
+        transmission (bool): Whether the component transmits beams
+        reflection_angle, diffraction_angle (float): Interaction angles in radians, None if not present
+        diffraction_dir (int[2]): The diffraction direction for forward and backward beams
+        focal_length (float): The focal length of a lens, None if not present
+        parent (string): Name of the component this is a child of
+        relative (string): Name of the component this is placed relative to
+        offset (float[2]): The position offset from the parent, in the parent's frame, or from the relative component
+        angle_offset (float): The rotation offset from the parent component in radians
+    '''
+    def __init__(self, name, x=0, y=0, angle=0, max_width=None, max_angle=0, block_width=0, transmission=False,
+                 reflection_angle=None, diffraction_angle=None, diffraction_dir=None, focal_length=None,
+                 parent=None, relative=None, offset=(0, 0), angle_offset=0):
+        self.name = name
+        self.x, self.y, self.angle = x, y, angle
+        self.max_width = max_width
+        self.max_angle = max_angle
+        self.block_width = block_width
+        self.transmission = transmission
+        self.reflection_angle = reflection_angle
+        self.diffraction_angle = diffraction_angle
+        self.diffraction_dir = diffraction_dir
+        self.focal_length = focal_length
+        self.parent = parent
+        self.relative = relative
+        self.offset = offset
+        self.angle_offset = angle_offset
+
+class placement:
+    '''
+    Plain description of a component placed along a beam
+
+    Args:
+        name (string): Name of the element being placed
+        beam_index (int): The beam index the element is placed along
+        distance, x, y (float): The constraint of the placement, None if unused
+        pre_refs (int): The number of interactions which must take place before the element is placed
+    '''
+    def __init__(self, name, beam_index, distance=None, x=None, y=None, pre_refs=0):
+        self.name = name
+        self.beam_index = beam_index
+        self.distance = distance
+        self.x = x
+        self.y = y
+        self.pre_refs = pre_refs
+
+class tracer:
+    '''
+    Beam tracing engine working only on plain element and placement descriptors
+
+    Args:
+        elements (element[]): Every component the beam can interact with, in priority order
+        placements (placement[]): The components placed along the beam, in placement order
+        dx, dy (float): The size of the baseplate the beam is restricted to, zero if unrestricted
+        max_segments (int): Limit on the number of beam segments traced
+        max_passes (int): Limit on the number of passes used to settle inline placements
+        z (float): The height of the beam, only used to describe the traced segments
+    '''
+    def __init__(self, elements, placements=None, dx=0, dy=0, max_segments=10000, max_passes=10, z=0):
+        self.elements = elements
+        self.placements = [] if placements is None else placements
+        self.dx, self.dy = dx, dy
+        self.z = z
+        self.max_segments = max_segments
+        self.max_passes = max_passes
+
+        self.names = {e.name: i for i, e in enumerate(elements)}
+        self.x = np.array([e.x for e in elements], dtype=float)
+        self.y = np.array([e.y for e in elements], dtype=float)
+        self.angle = np.array([e.angle for e in elements], dtype=float)
+
+        # components which move together with another component
+        self.dependents = [[] for _ in elements]
+        for i, e in enumerate(elements):
+            follow = e.parent if e.parent != None else e.relative
+            if follow in self.names:
+                self.dependents[self.names[follow]].append(i)
+
+        # table of optical components
+        self.rows = [i for i, e in enumerate(elements) if e.max_width != None]
+        self.row = {i: row for row, i in enumerate(self.rows)}
+        self.table = interaction_table(len(self.rows))
+        for row, i in enumerate(self.rows):
+            e = elements[i]
+            self.table.x[row], self.table.y[row], self.table.angle[row] = e.x, e.y, e.angle
+            self.table.max_width[row] = e.max_width
+            self.table.max_angle[row] = e.max_angle
+            self.table.block_width[row] = e.block_width
+            self.table.transmission[row] = e.transmission
+            if e.reflection_angle != None:
+                self.table.reflection[row] = True
+                self.table.reflection_angle[row] = e.reflection_angle
+            if e.diffraction_angle != None:
+                self.table.diffraction[row] = True
+                self.table.diffraction_angle[row] = e.diffraction_angle
+            if e.diffraction_dir != None:
+                self.table.directional[row] = True
+                self.table.diffraction_dir[row] = e.diffraction_dir
+            if e.focal_length != None:
+                self.table.lens[row] = True
+                self.table.focal_length[row] = e.focal_length
+        self.index = grid_index(self.table)
+
+        # components placed along the beam only interact once they have been placed
+        self.inline = {}
+        for p in self.placements:
+            self.inline.setdefault(p.beam_index, []).append(p)
+        placed = {p.name for p in self.placements}
+        self.gated = []
+        for row, i in enumerate(self.rows):
+            e = elements[i]
+            if e.name in placed:
+                self.gated.append((row, e.name))
+            elif e.parent in placed:
+                self.gated.append((row, e.parent))
+        self.gates = {elements[self.rows[row]].name: gate for row, gate in self.gated}
+
+    def move(self, name, x, y):
+        '''
+        Move a component and everything that follows it
+
+        Args:
+            name (string): Name of the component
+            x, y (float): The new position of the component
+        '''
+        i = self.names[name]
+        self.x[i], self.y[i] = x, y
+        stack = [i]
+        while len(stack) > 0:
+            i = stack.pop()
+            if i in self.row:
+                row = self.row[i]
+                self.table.x[row], self.table.y[row], self.table.angle[row] = self.x[i], self.y[i], self.angle[i]
+                self.index.update(row)
+            for child in self.dependents[i]:
+                e = self.elements[child]
+                if e.parent != None:
+                    # children are offset in their parent's frame, relative components are not
+                    c, s = cos(self.angle[i]), sin(self.angle[i])
+                    self.x[child] = self.x[i]+c*e.offset[0]-s*e.offset[1]
+                    self.y[child] = self.y[i]+s*e.offset[0]+c*e.offset[1]
+                    self.angle[child] = self.angle[i]+e.angle_offset
+                else:
+                    self.x[child] = self.x[i]+e.offset[0]
+                    self.y[child] = self.y[i]+e.offset[1]
+                stack.append(child)
+
+    def trace(self, x1, y1, a1, beam_index=1):
+        '''
+        Trace a full beam path given its start point and angle
+
+        Inline placements are solved as a fixed point. Each pass traces the beam tree
+        depth first, which is a topological order for placements along a single branch,
+        and sees the placements of the previous pass until it moves them. Passes repeat
+        until no beam segment saw an inline component anywhere but its final position.
+
+        Args:
+            x1, y1, a1 (float): The start point and angle of the beam
+
+        Returns:
+            beams (beam_segments): The traced beam segments
+            placed (dict): The final position of every inline component moved during the trace
+        '''
+        self.source = (x1, y1, a1, beam_index)
+        self.settled = {}
+        self.convergence = [] # (unsettled components, largest shift) for each pass
+        return self.solve()
+
+    def start_pass(self):
+        self.priors = self.settled # placements seen until this pass moves them
+        self.beams = []
+        self.hits = [] # name of the component ending each beam segment
+        self.blocks = [] # whether each beam segment was blocked
+        self.checkpoints = [] # trace state at the start of each beam segment
+        self.comp_track = []
+        self.tracked = set() # names of the components in comp_track
+        self.placed = {}
+        self.placed_at = {} # number of beam segments when each component was last placed
+        self.touched_at = {} # number of beam segments when each component was first moved
+
+    def solve(self, queue=None):
+        # run passes until the inline placements settle, continuing from a queue if given
+        x1, y1, a1, beam_index = self.source
+        while True:
+            if queue == None:
+                self.start_pass()
+                queue = [(x1, y1, a1, beam_index)]
+            self.run(queue)
+            queue = None
+            self.converged = self.settle()
+            if self.converged:
+                break
+            if len(self.convergence) >= self.max_passes:
+                print("Warning: inline placements did not settle after %d passes (%d unsettled, largest shift %g)"
+                      %(len(self.convergence), *self.convergence[-1]))
+                break
+        return self.segments(), self.placed
+
+    def segments(self):
+        # pack the traced segments into a beam_segments store
+        array = np.zeros(len(self.beams), dtype=segment_dtype)
+        beams = {}
+        if len(self.beams) > 0:
+            x, y, a, length, beam_index = zip(*self.beams)
+            array["x"], array["y"], array["z"], array["angle"], array["length"] = x, y, self.z, a, length
+            array["beam"] = [beams.setdefault(i, len(beams)) for i in beam_index]
+            array["hit"] = [self.names[hit] if hit != None else -1 for hit in self.hits]
+            array["block"] = self.blocks
+        return beam_segments(array, [e.name for e in self.elements], list(beams))
+
+    def run(self, queue):
+        # pending beam branches, traced depth first in beam index order
+        while len(queue) > 0:
+            if len(self.beams) > self.max_segments:
+                print("Warning: beam path exceeded %d beam segments"%self.max_segments)
+                break
+            self.trace_branch(queue, *queue.pop())
+
+    def settle(self):
+        # check every beam segment saw the inline components where this pass left them
+        final = {p.name: self.placed[p.name] for p in self.comp_track}
+        unsettled = 0
+        largest = 0
+        for name in set(final) | set(self.priors):
+            old, new = self.priors.get(name), final.get(name)
+            if old != None and new != None:
+                shift = hypot(new[0]-old[0], new[1]-old[1])
+                largest = max(largest, shift)
+                if shift < 1e-6:
+                    continue
+            # segments which could see the old placement
+            if old != None:
+                seen = self.touched_at.get(name, len(self.beams))
+                if any(self.gates.get(hit) == name for hit in self.hits[:seen]):
+                    unsettled += 1
+                    continue
+            # segments traced before the final placement which cross it
+            if new != None:
+                comps = self.table.take([row for row, gate in self.gated if gate == name])
+                for x, y, a, length, _ in self.beams[:self.placed_at[name]]:
+                    hit, _, _, dist, _, _, _ = check_interactions(x, y, a, comps)
+                    if (hit & (dist < length-mult_tol)).any():
+                        unsettled += 1
+                        break
+        self.convergence.append((unsettled, largest))
+        self.settled = final
+        return unsettled == 0
+
+    def signature(self, i):
+        # everything about a component which can change how a beam interacts with it
+        e = self.elements[i]
+        return (self.x[i], self.y[i], self.angle[i]%(2*pi), e.max_width, e.max_angle, e.block_width, e.transmission,
+                e.reflection_angle, e.diffraction_angle, e.diffraction_dir, e.focal_length,
+                e.parent, e.relative, e.offset, e.angle_offset)
+
+    def state_hash(self, x1, y1, a1, beam_index=1):
+        '''
+        Hash everything which can affect a trace of this beam path
+
+        Poses of inline components and their children are left out since the trace sets them
+
+        Args:
+            x1, y1, a1 (float): The start point and angle of the beam
+
+        Returns:
+            A hex digest which only changes when the trace could change
+        '''
+        driven = {self.names[p.name] for p in self.placements if p.name in self.names}
+        stack = list(driven)
+        while len(stack) > 0:
+            for child in self.dependents[stack.pop()]:
+                if self.elements[child].parent != None and child not in driven:
+                    driven.add(child)
+                    stack.append(child)
+        state = [_rounded((x1, y1, a1, beam_index, self.dx, self.dy))]
+        state += [sorted(vars(p).items()) for p in self.placements]
+        for i, e in enumerate(self.elements):
+            signature = self.signature(i)
+            if i in driven:
+                signature = signature[3:]
+            state.append((e.name, _rounded(signature)))
+        return hashlib.sha1(repr(state).encode()).hexdigest()
+
+    def changed(self, previous):
+        '''
+        Find the components which differ from a previous trace
+
+        Args:
+            previous (tracer): A tracer which has already traced this beam path
+
+        Returns:
+            The set of component names which were added, removed or changed
+        '''
+        names = set(self.names).symmetric_difference(previous.names)
+        for name, i in self.names.items():
+            if name in previous.names and not _same(self.signature(i), previous.signature(previous.names[name])):
+                names.add(name)
+        return names
+
+    def retrace(self, previous, x1, y1, a1, beam_index=1):
+        '''
+        Trace a beam path, reusing the part of a previous trace no changed component touches
+
+        Args:
+            previous (tracer): A tracer which has already traced this beam path
+            x1, y1, a1 (float): The start point and angle of the beam
+
+        Returns:
+            The same as trace
+        '''
+        # anything other than the components changing needs a full trace
+        if (not previous.converged or not _same(previous.source, (x1, y1, a1, beam_index))
+                or (previous.dx, previous.dy) != (self.dx, self.dy)
+                or [vars(p) for p in previous.placements] != [vars(p) for p in self.placements]):
+            return self.trace(x1, y1, a1, beam_index)
+
+        # first segment which hit a changed component or is now crossed by one
+        changed = self.changed(previous)
+        rows = [self.row[self.names[name]] for name in changed if name in self.names and self.names[name] in self.row]
+        moved = self.table.take(rows)
+        first = len(previous.beams)
+        for k, (x, y, a, length, _) in enumerate(previous.beams):
+            if previous.hits[k] in changed:
+                first = k
+                break
+            hit, _, _, dist, _, _, _ = check_interactions(x, y, a, moved)
+            if (hit & (dist < length+mult_tol)).any():
+                first = k
+                break
+
+        # restore the trace state at that segment and carry on from there
+        self.source = previous.source
+        self.settled = previous.priors
+        self.convergence = []
+        self.start_pass()
+        self.beams = [beam[:] for beam in previous.beams[:first]]
+        self.hits = previous.hits[:first]
+        self.blocks = previous.blocks[:first]
+        self.checkpoints = previous.checkpoints[:first]
+        if first == len(previous.beams):
+            queue, track, placed = [], previous.comp_track, previous.placed
+            self.placed_at, self.touched_at = dict(previous.placed_at), dict(previous.touched_at)
+        else:
+            queue, state, track, placed, placed_at, touched_at = previous.checkpoints[first]
+            queue = queue+[state]
+            self.placed_at, self.touched_at = dict(placed_at), dict(touched_at)
+        self.comp_track = [self.placements[previous.placements.index(p)] for p in track]
+        self.tracked = {p.name for p in self.comp_track}
+        for name, (x, y) in self.priors.items():
+            if name in self.names and name not in placed:
+                self.move(name, x, y)
+        for name, (x, y) in placed.items():
+            self.place(name, x, y)
+        return self.solve(queue)
+
+    def place(self, name, x, y):
+        self.touched_at.setdefault(name, len(self.beams))
+        self.placed_at[name] = len(self.beams)
+        self.move(name, x, y)
+        self.placed[name] = (x, y)
+
+    def restrict(self, x1, y1, a1, xf, yf):
+        # distances to the baseplate edges the beam crosses before reaching a point
+        intersect = []
+        if self.dx != 0 and self.dy != 0:
+            if self.dx < xf:
+                intersect.append((self.dx-x1)/cos(a1))
+            if self.dy < yf:
+                intersect.append((self.dy-y1)/sin(a1))
+            if xf < 0:
+                intersect.append((0-x1)/cos(a1))
+            if yf < 0:
+                intersect.append((0-y1)/sin(a1))
+        return intersect
+
+    def trace_branch(self, queue, x1, y1, a1, beam_index, comp_index=0, pre_count=0, pre_d=0):
+        # trace a single beam branch, adding any new branches to the queue
+        # comp_index: index of current inline component
+        # pre_count: current number interactions since last inline interaction
+        # pre_d: previous interaction distance for inline components
+        block = False # flag for a component obstructing a beam path
+
+        while True:
+            checkpoint = (queue[:], (x1, y1, a1, beam_index, comp_index, pre_count, pre_d), self.comp_track[:],
+                          dict(self.placed), dict(self.placed_at), dict(self.touched_at))
+
+            # get next inline component
+            inline_comps = self.inline.get(beam_index, [])
+            inline_obj = None
+            if len(inline_comps) > comp_index:
+                inline_obj = inline_comps[comp_index]
+                if pre_count >= inline_obj.pre_refs:
+                    self.comp_track.append(inline_obj)
+                    self.tracked.add(inline_obj.name)
+
+                    # handle different constraint methods
+                    if inline_obj.distance != None:
+                        comp_d = inline_obj.distance
+                    if inline_obj.x != None:
+                        comp_d = (inline_obj.x-x1)/cos(a1)
+                    if inline_obj.y != None:
+                        comp_d = (inline_obj.y-y1)/sin(a1)
+
+                    if pre_count > inline_obj.pre_refs:
+                        comp_d -= pre_d # account for previous distance
+
+                    # inline placement
+                    self.place(inline_obj.name, x1+comp_d*cos(a1), y1+comp_d*sin(a1))
+
+            # get all valid objects
+            mask = self.index.query(x1, y1, a1)
+            for row, gate in self.gated:
+                mask[row] &= gate in self.tracked or (gate in self.priors and gate not in self.placed)
+
+            # pick nearest valid interaction
+            ref = nearest_interaction(x1, y1, a1, self.table, mask)
+            if ref == None:
+                # restrict beam to baseplate
+                if self.dx != 0 and self.dy != 0:
+                    xf, yf = x1+500*cos(a1), y1+500*sin(a1) # TODO find a better way than this
+                    self.beams.append([x1, y1, a1, min(self.restrict(x1, y1, a1, xf, yf)), beam_index])
+                    self.hits.append(None)
+                    self.blocks.append(False)
+                    self.checkpoints.append(checkpoint)
+                return
+
+            row, xf, yf, min_len, af_arr, block = ref
+            ref_obj = self.elements[self.rows[row]]
+            check_comp = ref_obj.parent if ref_obj.parent != None else ref_obj.name
+
+            if inline_obj != None and check_comp == inline_obj.name:
+                comp_index += 1
+                pre_count = 0
+                pre_d = 0
+            elif len(inline_comps) > comp_index:
+                if self.comp_track[-1] == inline_obj:
+                    self.comp_track.pop()
+                    self.tracked.discard(inline_obj.name)
+                pre_count += 1
+                if pre_count > inline_obj.pre_refs:
+                    pre_d += min_len
+
+            # restrict beam to baseplate
+            intersect = self.restrict(x1, y1, a1, xf, yf)
+            if len(intersect) > 0 and min_len > min(intersect):
+                min_len = min(intersect)
+                block = True
+            self.beams.append([x1, y1, a1, min_len, beam_index])
+            self.hits.append(ref_obj.name)
+            self.blocks.append(block)
+            self.checkpoints.append(checkpoint)
+
+            if block:
+                return
+
+            # compute next beam and queue new branches for beam splits
+            split = None
+            if af_arr[0] != None and af_arr[1] != None:
+                split = (xf, yf, af_arr[0], (beam_index<<1))
+                beam_index = (beam_index<<1)+1
+                comp_index = 0
+            if af_arr[1] != None:
+                x1, y1, a1 = xf, yf, af_arr[1]
+            elif af_arr[0] != None:
+                x1, y1, a1 = xf, yf, af_arr[0]
+            else:
+                return
+
+            # suspend this branch until the split branch is traced
+            if split != None:
+                queue.append((x1, y1, a1, beam_index, comp_index, pre_count, pre_d))
+                queue.append(split)
+                return
+
+def trace_group(jobs):
+    '''
+    Trace beam paths which may share components one after another
+
+    Args:
+        jobs (tuple[]): (name, tracer, x, y, angle) for each beam path, in trace order
+
+    Returns:
+        (name, beams, placed, state) for each beam path, with beams and placed as returned by
+        tracer.trace and state the hash of what the beam path was traced from, see tracer.state_hash
+    '''
+    results = []
+    moved = {}
+    for name, beam_tracer, x, y, a in jobs:
+        # see components placed by earlier beam paths where they ended up
+        for comp, (cx, cy) in moved.items():
+            if comp in beam_tracer.names:
+                beam_tracer.move(comp, cx, cy)
+        state = beam_tracer.state_hash(x, y, a)
+        beams, placed = beam_tracer.trace(x, y, a)
+        moved.update(placed)
+        results.append((name, beams, placed, state))
+    return results
+
+def trace_groups(groups, processes=1):
+    '''
+    Trace independent groups of beam paths, optionally across a process pool
+
+    Args:
+        groups (list[]): Lists of jobs as taken by trace_group, no two groups may share components
+        processes (int): The number of worker processes, 1 to trace in this process or None for
+            the number of cpus. Only use a pool from a process without a GUI, or after pointing
+            multiprocessing.set_executable at a plain python interpreter
+
+    Returns:
+        The results of trace_group for each group, in the same order as the groups
+    '''
+    if processes == 1 or len(groups) < 2:
+        return [trace_group(jobs) for jobs in groups]
+    try:
+        with ProcessPoolExecutor(processes) as pool:
+            return list(pool.map(trace_group, groups))
+    except (OSError, BrokenProcessPool) as e:
+        print("Warning: parallel trace failed (%s), tracing serially"%e)
+        return [trace_group(jobs) for jobs in groups]
@@ -81,17 +81,20 @@ class Export_STLs():
         path = Path(export_path+str(n))
         path.mkdir()
         doc = App.activeDocument()
-        for obj in doc.Objects:
-            if isinstance(obj.Proxy, layout.baseplate) or all(np.isclose(obj.ViewObject.ShapeColor[:3], optomech.adapter_color)):
-                if hasattr(obj, "Shape"):
-                    exploded = obj.Shape.Solids
-                    for i, shape in enumerate(exploded):
-                        name = str(path / obj.Name)
-                        if len(exploded) > 1:
-                            name += "_" + str(i)
-                        shape.exportStl(name + ".stl")
-                else:
-                    Mesh.export([obj], str(path / obj.Name) + ".stl")
+        with optomech.full_detail():
+            for obj in doc.Objects:
+                if not hasattr(obj, "Proxy"):
+                    continue
+                if isinstance(obj.Proxy, layout.baseplate) or all(np.isclose(obj.ViewObject.ShapeColor[:3], optomech.adapter_color)):
+                    if hasattr(obj, "Shape"):
+                        exploded = obj.Shape.Solids
+                        for i, shape in enumerate(exploded):
+                            name = str(path / obj.Name)
+                            if len(exploded) > 1:
+                                name += "_" + str(i)
+                            shape.exportStl(name + ".stl")
+                    else:
+                        optomech.instance_mesh(obj).write(str(path / obj.Name) + ".stl")
         App.Console.PrintMessage("STLs Exported to '%s'\n"%(str(path)))
         return
     
@@ -117,7 +120,7 @@ class Export_Cart():
         types = []
         objs = []
         for obj in doc.Objects:
-            if hasattr(obj.Proxy, 'part_numbers'):
+            if hasattr(obj, "Proxy") and hasattr(obj.Proxy, 'part_numbers'):
                 if '' in obj.Proxy.part_numbers:
                     name = obj.Label
                     temp = obj
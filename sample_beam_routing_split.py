@@ -6,8 +6,10 @@ import numpy as np
 import gc
 
 is_headless = False
-# Redirect output to file to reduce memory buffering
-sys.stdout = open('debug_output.txt', 'w')
+# Redirect output to file to reduce memory buffering, the build runner logs each group itself:
+# python -m PyOpticL.build sample_beam_routing_split.py:group1_baseplate_588nm sample_beam_routing_split.py:group2_baseplate_405nm sample_beam_routing_split.py:group3_baseplate_850nm --assemble Table
+if __name__ == "__main__":
+    sys.stdout = open('debug_output.txt', 'w')
 
 # Debug the directory structure and sys.path
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -48,6 +50,24 @@ mount_holes = [
     (11 * layout.inch, 11 * layout.inch)  # Top-right
 ]
 
+# inside a bulk build, such as the build runner's, the document is redrawn and saved once it ends
+def recompute_group(master_doc):
+    if not layout.building():
+        master_doc.recompute()
+
+def save_group(master_doc, file_name):
+    if layout.building():
+        return
+    if not os.path.exists(script_dir):
+        os.makedirs(script_dir)
+
+    master_doc.recompute()
+    master_doc.saveAs(os.path.join(script_dir, file_name))
+    if not is_headless:
+        App.ActiveDocument.commitTransaction()
+    else:
+        App.closeDocument(os.path.splitext(file_name)[0])
+
 def group1_baseplate_588nm(x=0, y=0, angle=0):
     # Create smaller baseplate for Group 1, aligned with ECDL y-position
     x_max = 10
@@ -101,20 +121,12 @@ def group1_baseplate_588nm(x=0, y=0, angle=0):
 
     # add output fiberport, defined at the same coordinates as output beam
     baseplate.place_element("Output Fiberport beam_588nm", optomech.fiberport_mount_hca3, x=gap, y=3.5 *layout.inch - (input_y_588nm - 0.5 * layout.inch) + (2 * layout.inch) + (1 * layout.inch), angle=layout.cardinal['right'])
-    master_doc.recompute()
+    recompute_group(master_doc)
 
     #lens_294nm = baseplate.place_element_along_beam("Lens_294nm", optomech.lens, beam_588nm, beam_index=0b1, distance=1 * layout.inch, angle=0)
     #created_objects["Lens_294nm"] = lens_294nm
 
-    if not os.path.exists(script_dir):
-        os.makedirs(script_dir)
-
-    master_doc.recompute()
-    master_doc.saveAs(os.path.join(script_dir, "Group1_588nm.fcstd"))
-    if not is_headless:
-        App.ActiveDocument.commitTransaction()
-    else:
-        App.closeDocument("Group1_588nm")
+    save_group(master_doc, "Group1_588nm.fcstd")
 
     print("Group 1 (588 nm) assembly completed successfully")
     return baseplate
@@ -181,7 +193,7 @@ def group2_baseplate_405nm(x=0, y=0, angle=0):
 
     tuner_403nm = baseplate.place_element_along_beam("Tuner_403nm", optomech.laser_mount_km100pm_LMR1_floating, beam_405nm, stage_length=50, beam_index=0b11, distance=3.0 * layout.inch, angle=layout.cardinal['up'], littrow_angle=littrow_angle_403nm, drill=True)#, height_offset_in=0)
     created_objects["Tuner_403nm"] = tuner_403nm
-    master_doc.recompute()
+    recompute_group(master_doc)
 
 
     mirror_403nm_1 = baseplate.place_element_along_beam("Mirror_403nm_1", optomech.circular_mirror, beam_405nm, diameter=layout.inch/8, beam_index=0b11, distance=2.0 * layout.inch, angle=layout.turn['right-up']-21, mount_type=optomech.skate_mount)
@@ -207,15 +219,7 @@ def group2_baseplate_405nm(x=0, y=0, angle=0):
 
     baseplate.place_element("Output Fiberport_beam_403nm_2", optomech.fiberport_mount_hca3, x=gap, y=y_offset+(2*layout.inch)+(1.75*3*layout.inch) - (input_y_405nm_1 - 0.5 * layout.inch) + (2 * layout.inch) + (3 *layout.inch), angle=layout.cardinal['right'])    
 
-    if not os.path.exists(script_dir):
-        os.makedirs(script_dir)
-
-    master_doc.recompute()
-    master_doc.saveAs(os.path.join(script_dir, "Group2_405nm.fcstd"))
-    if not is_headless:
-        App.ActiveDocument.commitTransaction()
-    else:
-        App.closeDocument("Group2_405nm")
+    save_group(master_doc, "Group2_405nm.fcstd")
 
     print("Group 2 (405 nm) assembly completed successfully")
     return baseplate
@@ -285,17 +289,9 @@ def group3_baseplate_850nm(x=0, y=0, angle=0):
 
     baseplate.place_element("Output Fiberport_beam_422nm", optomech.fiberport_mount_hca3, x=gap, y=input_y_850nm-2+(1.40*3*layout.inch) - (input_y_850nm - 0.5 * layout.inch) + (2 * layout.inch), angle=layout.cardinal['right'])    
 
-    master_doc.recompute()
-
-    if not os.path.exists(script_dir):
-        os.makedirs(script_dir)
+    recompute_group(master_doc)
 
-    master_doc.recompute()
-    master_doc.saveAs(os.path.join(script_dir, "Group3_850nm.fcstd"))
-    if not is_headless:
-        App.ActiveDocument.commitTransaction()
-    else:
-        App.closeDocument("Group3_850nm")
+    save_group(master_doc, "Group3_850nm.fcstd")
 
     print("Group 3 (850 nm) assembly completed successfully")
     return baseplate
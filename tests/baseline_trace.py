@@ -0,0 +1,352 @@
+'''
+The beam tracer of the original laser.py, transcribed to work on plain objects instead of
+document objects so the trace engine can be checked against it without FreeCAD
+'''
+from math import *
+from types import SimpleNamespace
+
+import numpy as np
+
+def is_mult(x, factor, tol=1e-5):
+    return isclose((abs(x)+tol/2)%factor, 0, abs_tol=tol)
+
+class _rotation:
+    # rotation about z stored as FreeCAD does, with a positive angle and a signed axis
+    def __init__(self, angle):
+        angle = (angle+pi)%(2*pi)-pi
+        self.Angle = abs(angle)
+        self.Axis = (0, 0, 1 if angle >= 0 else -1)
+
+class _quantity:
+    def __init__(self, value):
+        self.Value = value
+
+class part:
+    '''
+    Stand-in for a placed component document object
+
+    Args:
+        name (string): Name of the component
+        x, y (float): The position of the component
+        angle (float): The rotation of the component in radians
+        parent (part): The component this is a child of
+        offset (float[2]): The RelativePlacement offset from the parent
+        angle_offset (float): The RelativePlacement rotation from the parent in radians
+        proxy (any): The optical attributes of the component, angles in degrees as on optomech classes
+    '''
+    def __init__(self, name, x=0, y=0, angle=0, parent=None, offset=(0, 0), angle_offset=0, **proxy):
+        self.Name = name
+        self.BasePlacement = SimpleNamespace(Base=(x, y, 0), Rotation=_rotation(angle))
+        self.Proxy = SimpleNamespace(**proxy)
+        self.ChildObjects = []
+        self.offset = offset
+        self.angle_offset = angle_offset
+        if parent != None:
+            self.ParentObject = parent
+            parent.ChildObjects.append(self)
+            move(parent, *parent.BasePlacement.Base[:2])
+
+    def along(self, beam_index, distance=None, x=None, y=None, pre_refs=0):
+        # make this an inline component of a beam path
+        self.BeamIndex = beam_index
+        self.PreRefs = pre_refs
+        if distance != None:
+            self.Distance = _quantity(distance)
+        if x != None:
+            self.xPos = _quantity(x)
+        if y != None:
+            self.yPos = _quantity(y)
+        return self
+
+def angle_of(obj):
+    return obj.BasePlacement.Rotation.Angle*obj.BasePlacement.Rotation.Axis[2]
+
+def move(obj, x, y):
+    '''
+    Set the position of a component, moving its children the way ViewProvider.updateData does
+
+    Args:
+        obj (part): The component to move
+        x, y (float): The new position
+    '''
+    obj.BasePlacement.Base = (x, y, 0)
+    a = angle_of(obj)
+    for child in obj.ChildObjects:
+        dx, dy = child.offset
+        child.BasePlacement.Rotation = _rotation(a+child.angle_offset)
+        move(child, x+cos(a)*dx-sin(a)*dy, y+sin(a)*dx+cos(a)*dy)
+
+# calculate intersection between a beam and an optical component
+def check_interaction(x1, y1, a1, ref_obj):
+
+    # check if object is an optical component
+    if not hasattr(ref_obj, "Proxy") or not (hasattr(ref_obj.Proxy, 'max_angle') and hasattr(ref_obj.Proxy, 'max_width')):
+        return
+
+    # get object placement
+    x2, y2, _ = ref_obj.BasePlacement.Base
+    a_norm = ref_obj.BasePlacement.Rotation.Angle
+    a_norm *= ref_obj.BasePlacement.Rotation.Axis[2]
+
+    # check if component is on the correct side of the beam
+    a_rel = abs(a1-atan2(y2-y1, x2-x1))%(2*pi)
+    if a_rel > pi:
+        a_rel = 2*pi-a_rel
+    if a_rel > pi/2:
+        return
+
+    # limits on incomming beam
+    max_angle = radians(ref_obj.Proxy.max_angle)
+    max_width = ref_obj.Proxy.max_width
+
+    # two possible output beam angles
+    angle1 = None
+    angle2 = None
+
+    # transmitted beam
+    if hasattr(ref_obj.Proxy, 'transmission'):
+        a_norm = (a_norm+pi)%(2*pi)
+        angle1 = a1
+    # diffracted beam
+    if hasattr(ref_obj.Proxy, 'diffraction_angle'):
+        a_norm = (a_norm+pi)%(2*pi)
+        angle2 = a1+radians(ref_obj.Proxy.diffraction_angle)
+    # reflected beam
+    if hasattr(ref_obj.Proxy, 'reflection_angle'):
+        a_norm = (a_norm+radians(ref_obj.Proxy.reflection_angle))%(2*pi)
+        angle2 = 2*a_norm-a1-pi
+
+    a2 = a_norm+pi/2 # angle of interaction surface
+
+    # relative angle between the beam and component input normal
+    a_in = abs(a1-a_norm+pi)%(2*pi)
+    if a_in > pi:
+        a_in = 2*pi-a_in
+
+    if hasattr(ref_obj.Proxy, 'diffraction_dir'):
+        if a_in < pi/2:
+            angle2 = a1+radians(ref_obj.Proxy.diffraction_angle)*ref_obj.Proxy.diffraction_dir[0]
+        else:
+            angle2 = a1+radians(ref_obj.Proxy.diffraction_angle)*ref_obj.Proxy.diffraction_dir[1]
+
+    # check for edge cases
+    a1_vert = is_mult(a1-pi/2, pi)
+    a2_vert = is_mult(a2-pi/2, pi)
+    a12_hor = is_mult(a1, pi) and is_mult(a2, pi) or is_mult(a1-a2, pi)
+
+    # calculate intersection of the beam and the surface
+    if a1_vert:
+        x = x1
+    elif a2_vert or a12_hor:
+        x = x2
+    else:
+        x = (y2-x2*tan(a2)-y1+x1*tan(a1))/(tan(a1)-tan(a2))
+    if not a1_vert:
+        y = x*tan(a1)+y1-x1*tan(a1)
+    elif not a2_vert:
+        y = x*tan(a2)+y2-x2*tan(a2)
+    else:
+        y = y2
+
+    # total distance to interaction
+    ref_d = sqrt((x-x2)**2+(y-y2)**2)
+
+    # refracted beam
+    if hasattr(ref_obj.Proxy, 'focal_length'):
+        a_rel = abs(a2-atan2(y-y2, x-x2))%(2*pi)
+        offset = pi/2-atan2(ref_obj.Proxy.focal_length, ref_d)
+        if is_mult(a_rel, 2*pi):
+            offset *= -1
+        if a_in < pi/2:
+            offset *= -1
+        angle1 += offset
+
+    # check if beam is from current object
+    if isclose(x1, x, abs_tol=1e-5) and isclose(y1, y, abs_tol=1e-5):
+        return
+
+    # check against max width and blocking width
+    block = False
+    if ref_d > max_width/2:
+        if hasattr(ref_obj.Proxy, "block_width"):
+            if ref_d < ref_obj.Proxy.block_width/2:
+                block = True
+            else:
+                return
+        else:
+            return
+
+    # check against max angle
+    if hasattr(ref_obj.Proxy, 'transmission'):
+        if a_in > max_angle and pi-a_in > max_angle:
+            block = True
+    else:
+        if a_in > max_angle:
+            block = True
+
+    return ref_obj, x, y, [angle1, angle2], block
+
+class beam_path:
+    '''
+    Stand-in for a beam path document object using the original recursive trace
+
+    Args:
+        objects (part[]): Every component on the baseplate, in document order
+        path_objects (part[]): The inline components of the beam path, in placement order
+        dx, dy (float): The size of the baseplate, zero if unrestricted
+    '''
+    def __init__(self, objects, path_objects=[], dx=0, dy=0):
+        self.objects = objects
+        self.PathObjects = path_objects
+        self.dx, self.dy = dx, dy
+
+    def trace(self, x1, y1, a1):
+        self.beams = []
+        self.comp_track = []
+        self.calculate_beam_path(x1, y1, a1)
+        return self.beams
+
+    # compute full beam path given start point and angle
+    def calculate_beam_path(self, x1, y1, a1, beam_index=1):
+        if beam_index > 200:
+            return
+
+        comp_index = 0 # index of current inline component
+        pre_count = 0 # current number interactions since last inline interaction
+        pre_d = 0 # previous interaction distance for inline components
+        block = False # flag for a component obstructing a beam path
+
+        while True:
+            # get all inline components
+            inline_comps = [obj for obj in self.PathObjects if obj.BeamIndex == beam_index]
+
+            # get next inline component
+            inline_obj = None
+            if len(inline_comps) > comp_index:
+                inline_obj = inline_comps[comp_index]
+                if pre_count >= inline_obj.PreRefs:
+                    self.comp_track.append(inline_obj)
+
+                    # handle different constraint methods
+                    if hasattr(inline_obj, "Distance"):
+                        comp_d = inline_obj.Distance.Value
+                    if hasattr(inline_obj, "xPos"):
+                        comp_d = (inline_obj.xPos.Value-x1)/cos(a1)
+                    if hasattr(inline_obj, "yPos"):
+                        comp_d = (inline_obj.yPos.Value-y1)/sin(a1)
+
+                    if pre_count > inline_obj.PreRefs:
+                        comp_d -= pre_d # account for previous distance
+
+                    # inline placement
+                    move(inline_obj, x1+comp_d*cos(a1), y1+comp_d*sin(a1))
+
+            # get all valid objects
+            check_objs = []
+            for obj in self.objects:
+                if obj in self.PathObjects and not obj in self.comp_track:
+                    continue
+                if hasattr(obj, "ParentObject"):
+                    if obj.ParentObject in self.PathObjects and not obj.ParentObject in self.comp_track:
+                        continue
+                check_objs.append(obj)
+
+            # find all interactions
+            refs = []
+            comp_d = []
+            for obj in check_objs:
+                ref = check_interaction(x1, y1, a1, obj)
+                if ref != None:
+                    refs.append(ref)
+                    comp_d.append(sqrt((ref[1]-x1)**2+(ref[2]-y1)**2))
+
+            # pick nearest valid interaction
+            inline_ref = False
+            if len(refs) > 0:
+                index = np.argmin(comp_d)
+                final_ref = refs[index]
+                min_len = comp_d[index]
+
+                if hasattr(final_ref[0], "ParentObject"):
+                    check_comp = final_ref[0].ParentObject
+                else:
+                    check_comp = final_ref[0]
+
+                if check_comp == inline_obj:
+                    inline_ref = True
+                    comp_index += 1
+                    pre_count = 0
+                    pre_d = 0
+                elif len(inline_comps) > comp_index:
+                    if self.comp_track[-1] == inline_obj:
+                        self.comp_track.pop()
+                    pre_count += 1
+                    if pre_count > inline_obj.PreRefs:
+                        pre_d += min_len
+
+                ref_obj, xf, yf, af_arr, block = final_ref
+                # restrict beam to baseplate
+                if self.dx != 0 and self.dy != 0:
+                    intersect = []
+                    if self.dx < xf:
+                        intersect.append((self.dx-x1)/cos(a1))
+                    if self.dy < yf:
+                        intersect.append((self.dy-y1)/sin(a1))
+                    if xf < 0:
+                        intersect.append((0-x1)/cos(a1))
+                    if yf < 0:
+                        intersect.append((0-y1)/sin(a1))
+                    if len(intersect) > 0 and min_len > min(intersect):
+                        min_len = min(intersect)
+                        block = True
+                self.beams.append([x1, y1, a1, min_len, beam_index])
+            else:
+                # restrict beam to baseplate
+                if self.dx != 0 and self.dy != 0:
+                    intersect = []
+                    xf, yf = x1+500*cos(a1), y1+500*sin(a1)
+                    if self.dx < xf:
+                        intersect.append((self.dx-x1)/cos(a1))
+                    if self.dy < yf:
+                        intersect.append((self.dy-y1)/sin(a1))
+                    if xf < 0:
+                        intersect.append(-(x1-0)/cos(a1))
+                    if yf < 0:
+                        intersect.append(-(y1-0)/sin(a1))
+                    self.beams.append([x1, y1, a1, min(intersect), beam_index])
+                return
+
+            if block:
+                return
+
+            # handle recursion issues caused by conflicting beam paths
+            if inline_ref:
+                for i in self.beams[:]:
+                    if i[4] != beam_index:
+                        ref = check_interaction(i[0], i[1], i[2], ref_obj)
+                        if ref != None:
+                            beam_d = sqrt((ref[1]-i[0])**2+(ref[2]-i[1])**2)
+                            if beam_d > i[3] or isclose(beam_d, i[3], rel_tol=1e-3):
+                                continue
+                            for beam in self.beams[::-1]:
+                                if beam[4]>>int(abs(log2(beam[4]/i[4]))) == i[4]:
+                                    last = beam[:]
+                                    self.beams.remove(beam)
+                            for comp in self.comp_track[:]:
+                                if comp.BeamIndex>>int(abs(log2(comp.BeamIndex/i[4]))) == i[4]:
+                                    move(comp, 0, 0)
+                                    self.comp_track.remove(comp)
+                            self.calculate_beam_path(last[0], last[1], last[2], last[4])
+                            break
+
+            # compute next beam and handle recursion for beam splits
+            if af_arr[0] != None and af_arr[1] != None:
+                self.calculate_beam_path(xf, yf, af_arr[0], (beam_index<<1))
+                beam_index = (beam_index<<1)+1
+                comp_index = 0
+            if af_arr[1] != None:
+                x1, y1, a1 = xf, yf, af_arr[1]
+            elif af_arr[0] != None:
+                x1, y1, a1 = xf, yf, af_arr[0]
+            else:
+                return
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the trace engine and its baseline reference only need numpy, FreeCAD is not required
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,86 @@
+from math import isclose
+
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+Part = pytest.importorskip("Part")
+
+from PyOpticL import features, optomech
+
+# a vertical cylinder between two heights
+def bore(diameter, z0, z1, x=0, y=0):
+    return Part.makeCylinder(diameter/2, z1-z0, App.Vector(x, y, z0))
+
+def stack(*layers, x=0, y=0):
+    part = bore(*layers[0], x=x, y=y)
+    for i in layers[1:]:
+        part = part.fuse(bore(*i, x=x, y=y))
+    return part.removeSplitter()
+
+def holes(found):
+    return sorted([(round(i.z, 6), round(i.diameter, 6), round(i.depth, 6), i.counterbore) for i in found
+                   if isinstance(i, features.hole)])
+
+def test_plain_hole():
+    tap = optomech.bolt_8_32["tap_dia"]
+    found = features.extract(bore(tap, -20, 0, 10, 5))
+    assert len(found) == 1
+    assert (found[0].x, found[0].y) == pytest.approx((10, 5))
+    assert holes(found) == [(0, round(tap, 6), 20, (0, 0))]
+    assert found[0].thread == "8-32 tap"
+
+def test_counterbored_hole():
+    found = features.extract(stack((3.5, -20, 0), (5.5, -3, 0)))
+    assert len(found) == 1
+    assert found[0].counterbore == pytest.approx((5.5, 3))
+    assert (found[0].z, found[0].diameter, found[0].depth) == pytest.approx((0, 3.5, 20))
+
+def test_counterbore_from_below_is_kept_per_layer():
+    found = features.extract(stack((5.5, -20, -17), (3.5, -17, 0)))
+    assert holes(found) == [(-17, 5.5, 3, (0, 0)), (0, 3.5, 17, (0, 0))]
+
+def test_stepped_hole_is_kept_per_layer():
+    found = features.extract(stack((3.5, -20, -10), (5.5, -10, -5), (3.5, -5, 0)))
+    assert holes(found) == [(-10, 3.5, 10, (0, 0)), (-5, 5.5, 5, (0, 0)), (0, 3.5, 5, (0, 0))]
+
+def test_pocket_keeps_its_fillet():
+    box = optomech._custom_box(dx=20, dy=10, dz=5, x=0, y=0, z=-5, fillet=2, fillet_dir=(0, 0, 1))
+    found = features.extract(box)
+    assert len(found) == 1 and isinstance(found[0], features.pocket)
+    assert (found[0].z, found[0].depth, found[0].fillet) == pytest.approx((0, 5, 2), abs=1e-2)
+    assert isclose(found[0].outline.Area*found[0].depth, box.Volume, rel_tol=1e-6)
+
+def test_non_layered_tools_fall_back_to_solids():
+    tilted = bore(3.5, -20, 0)
+    tilted.rotate(App.Vector(0, 0, 0), App.Vector(1, 0, 0), 10)
+    assert features.extract(tilted) == None
+    assert features.extract(Part.makeSphere(3)) == None
+    # one unsupported solid makes the whole tool fall back
+    assert features.extract(Part.Compound([bore(3.5, -20, 0), Part.makeSphere(3, App.Vector(20, 0, 0))])) == None
+
+def test_extract_reuses_results_by_key():
+    features.clear_feature_cache()
+    first = features.extract(bore(3.5, -20, 0), "tool")
+    assert features.extract(Part.makeSphere(3), "tool") is first
+
+def test_drill_matches_boolean_cut():
+    blank = Part.makeBox(50, 30, 12.7, App.Vector(0, 0, -12.7))
+    tools = [stack((3.5, -20, 0), (5.5, -3, 0), x=10, y=10),
+             stack((5.5, -20, -10), (3.5, -10, 0), x=25, y=15),
+             optomech._custom_box(dx=10, dy=6, dz=4, x=40, y=15, z=-4, fillet=1, fillet_dir=(0, 0, 1))]
+    found = [i for tool in tools for i in features.extract(tool)]
+    part = features.drill(blank, found)
+    expected = blank.cut(tools)
+    assert isclose(part.Volume, expected.Volume, rel_tol=1e-6)
+    assert features.drill(Part.makeSphere(10), found) == None
+
+def test_hole_table():
+    found = features.extract(stack((optomech.bolt_8_32["clear_dia"], -20, 0), (optomech.bolt_8_32["head_dia"], -4.4, 0), x=30, y=5))
+    found += features.extract(bore(optomech.bolt_4_40["tap_dia"], -10, 0, 10, 20))
+    found += features.extract(bore(2, -5, 0, 0, 0))
+    found += features.extract(optomech._custom_box(dx=10, dy=6, dz=4, x=40, y=15, z=-4))
+    rows = features.hole_table(found)
+    assert [row[5] for row in rows] == ["", "4-40 tap", "8-32 clearance"]
+    assert rows[2][:5] == [30, 5, 0, round(optomech.bolt_8_32["clear_dia"], 3), 20]
+    assert rows[2][6:] == [optomech.bolt_8_32["head_dia"], 4.4]
+    assert rows[1][6:] == [0, 0]
@@ -0,0 +1,40 @@
+from math import isclose, pi
+
+import pytest
+
+App = pytest.importorskip("FreeCAD")
+Part = pytest.importorskip("Part")
+
+from PyOpticL import laser, trace
+
+# a beam split into two branches which each fold once, so segments overlap at the splitter and mirrors
+def traced_beams():
+    elements = [trace.element("bs", 50, 0, 3*pi/4, max_width=12.7, max_angle=pi/2, transmission=True, reflection_angle=0),
+                trace.element("up", 50, 60, -pi/4, max_width=12.7, max_angle=pi/2, reflection_angle=0),
+                trace.element("right", 120, 0, 3*pi/4, max_width=12.7, max_angle=pi/2, reflection_angle=0)]
+    beams, _ = trace.tracer(elements, [], 200, 200).trace(10, 0, 0)
+    return beams
+
+# the drill part as beam_path.execute originally built it, fusing one segment at a time
+def per_segment_fuse(beams, radius, x0, y0, a0):
+    cylinders = laser._beam_cylinders(beams, radius, x0, y0, a0)
+    part = cylinders[0]
+    for cylinder in cylinders[1:]:
+        part = part.fuse(cylinder)
+    return part.fuse(part)
+
+def test_batched_drill_matches_per_segment_fuse():
+    beams = traced_beams()
+    assert len(beams) > 3
+    comp, part = laser.beam_geometry(beams, 0.5, 1.5, True, 10, 0, 0)
+    old = per_segment_fuse(beams, 1.5, 10, 0, 0)
+    assert isclose(part.Volume, old.Volume, rel_tol=1e-6)
+    for attr in ["XMin", "XMax", "YMin", "YMax", "ZMin", "ZMax"]:
+        assert isclose(getattr(part.BoundBox, attr), getattr(old.BoundBox, attr), abs_tol=1e-6)
+    assert len(comp.Solids) == len(beams)
+
+def test_no_drill_part_without_drill():
+    beams = traced_beams()
+    comp, part = laser.beam_geometry(beams, 0.5, 1.5, False, 10, 0, 0)
+    assert part.isNull()
+    assert len(comp.Solids) == len(beams)
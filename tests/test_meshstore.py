@@ -0,0 +1,37 @@
+import numpy as np
+
+from PyOpticL import meshstore
+
+# a binary STL holding the given triangles
+def stl_data(triangles):
+    data = np.zeros(len(triangles), dtype=meshstore._stl_dtype)
+    data["points"] = triangles
+    return bytes(80) + np.uint32(len(triangles)).tobytes() + data.tobytes()
+
+def use_store(monkeypatch, tmp_path):
+    # point the store at a temporary library holding one small mesh
+    library = tmp_path / "stl"
+    library.mkdir()
+    points = np.random.default_rng(0).random((12, 3), dtype=np.float32)
+    facets = np.arange(12, dtype=np.int32).reshape(4, 3)
+    (library / "part.stl").write_bytes(stl_data(points[facets]))
+    monkeypatch.setattr(meshstore, "stl_path", str(library) + "/")
+    monkeypatch.setattr(meshstore, "store_path", str(tmp_path / "store") + "/")
+    monkeypatch.setattr(meshstore, "_manifest", None)
+    return points[facets]
+
+def test_store_round_trip(monkeypatch, tmp_path):
+    triangles = use_store(monkeypatch, tmp_path)
+    points, facets = meshstore.load("part.stl")
+    assert np.array_equal(points[facets], triangles)
+    assert np.array_equal(meshstore.read_stl(meshstore.stl_path+"part.stl"), triangles)
+
+def test_damaged_entry_is_rebuilt(monkeypatch, tmp_path):
+    triangles = use_store(monkeypatch, tmp_path)
+    meshstore.load("part.stl")
+    points_file, _ = meshstore._files("part.stl")
+    with open(points_file, "r+b") as f:
+        f.truncate(100)
+    points, facets = meshstore.load("part.stl")
+    assert np.array_equal(points[facets], triangles)
+    assert not any(i.endswith(".tmp") for i in map(str, (tmp_path / "store").iterdir()))
@@ -0,0 +1,215 @@
+from math import pi, radians
+
+import numpy as np
+
+from PyOpticL import trace
+
+import baseline_trace
+from baseline_trace import angle_of, part
+
+# describe a stand-in part as a trace element the way laser._element does
+def element_of(obj):
+    x, y, _ = obj.BasePlacement.Base
+    elem = trace.element(obj.Name, x, y, angle_of(obj))
+    if hasattr(obj, "ParentObject"):
+        elem.parent = obj.ParentObject.Name
+        elem.offset = tuple(obj.offset)
+        elem.angle_offset = obj.angle_offset
+    proxy = obj.Proxy
+    if hasattr(proxy, "max_angle") and hasattr(proxy, "max_width"):
+        elem.max_width = proxy.max_width
+        elem.max_angle = radians(proxy.max_angle)
+        if hasattr(proxy, "block_width"):
+            elem.block_width = proxy.block_width
+        elem.transmission = hasattr(proxy, "transmission")
+        if hasattr(proxy, "reflection_angle"):
+            elem.reflection_angle = radians(proxy.reflection_angle)
+        if hasattr(proxy, "diffraction_angle"):
+            elem.diffraction_angle = radians(proxy.diffraction_angle)
+        if hasattr(proxy, "diffraction_dir"):
+            elem.diffraction_dir = tuple(proxy.diffraction_dir)
+        if hasattr(proxy, "focal_length"):
+            elem.focal_length = proxy.focal_length
+    return elem
+
+def placement_of(obj):
+    place = trace.placement(obj.Name, obj.BeamIndex, pre_refs=obj.PreRefs)
+    for attr, key in [("Distance", "distance"), ("xPos", "x"), ("yPos", "y")]:
+        if hasattr(obj, attr):
+            setattr(place, key, getattr(obj, attr).Value)
+    return place
+
+def tracer_of(objects, path_objects=[], dx=0, dy=0):
+    return trace.tracer([element_of(i) for i in objects], [placement_of(i) for i in path_objects], dx, dy)
+
+def assert_same_beams(segments, beams):
+    assert len(segments) == len(beams)
+    for segment, (x, y, a, length, beam_index) in zip(segments, beams):
+        assert np.isclose(segment["x"], x) and np.isclose(segment["y"], y)
+        assert np.isclose(np.cos(segment["angle"]), np.cos(a)) and np.isclose(np.sin(segment["angle"]), np.sin(a))
+        assert np.isclose(segment["length"], length)
+        assert segments.beam_indices[segment["beam"]] == beam_index
+
+def mirror(name, x=0, y=0, angle=0, **args):
+    return part(name, x, y, angle, reflection_angle=0, max_angle=90, max_width=12.7, **args)
+
+def splitter(name, x=0, y=0, angle=0, **args):
+    return part(name, x, y, angle, transmission=True, reflection_angle=0, max_angle=90, max_width=12.7, **args)
+
+def test_child_offset_rotates_with_parent():
+    parent = part("mount", 0, 0, pi/2)
+    child = mirror("mirror", parent=parent, offset=(10, 0))
+    beam_tracer = tracer_of([parent, child], [])
+    beam_tracer.move("mount", 50, 0)
+    i = beam_tracer.names["mirror"]
+    baseline_trace.move(parent, 50, 0)
+    assert np.allclose((beam_tracer.x[i], beam_tracer.y[i]), child.BasePlacement.Base[:2])
+    assert np.allclose((beam_tracer.x[i], beam_tracer.y[i]), (50, 10))
+
+def test_relative_offset_does_not_rotate():
+    anchor = part("anchor", 0, 0, pi/2)
+    follower = trace.element("follower", 10, 0, 0, relative="anchor", offset=(10, 0))
+    beam_tracer = trace.tracer([element_of(anchor), follower])
+    beam_tracer.move("anchor", 50, 0)
+    i = beam_tracer.names["follower"]
+    assert np.allclose((beam_tracer.x[i], beam_tracer.y[i]), (60, 0))
+
+def test_inline_rotated_parent_matches_baseline():
+    # the mirror only sits on the beam when its offset is rotated by the mount
+    parent = part("mount", 0, 0, pi/2).along(1, distance=50)
+    child = mirror("mirror", parent=parent, offset=(0, -10), angle_offset=pi/4)
+    end = mirror("end", 60, 80, -3*pi/4)
+    objects = [parent, child, end]
+    beam_tracer = tracer_of(objects, [parent], 200, 200)
+    beams = baseline_trace.beam_path(objects, [parent], 200, 200).trace(0, 0, 0)
+    segments, placed = beam_tracer.trace(0, 0, 0)
+    assert_same_beams(segments, beams)
+    assert segments.hitting("mirror")["hit"].size == 1
+    assert np.allclose(placed["mount"], (50, 0))
+
+def test_deep_splits_do_not_overflow():
+    # a cavity of two beam splitters splits the beam again on every pass
+    cavity = [splitter("a", 0, 0, 0), splitter("b", 50, 0, pi)]
+    beam_tracer = tracer_of(cavity)
+    beam_tracer.max_segments = 300
+    segments, _ = beam_tracer.trace(25, 0, 0)
+    deepest = max(segments.beam_indices)
+    assert deepest.bit_length() > 64
+    assert len(segments.by_beam(deepest)) == 1
+    assert segments.array.dtype["beam"] == np.int64
+    assert np.isclose(segments.path_length("b"), 25) and np.isclose(segments.path_length("a"), 75)
+
+def test_group_states_match_later_snapshots():
+    # the second beam path sees the mirror the first one placed, as its execute will after the first is drawn
+    inline = mirror("inline", 0, 0, 3*pi/4).along(1, distance=30)
+    fixed = mirror("fixed", 80, 50, pi)
+    first = tracer_of([inline, fixed], [inline], 200, 200)
+    second = tracer_of([inline, fixed], [], 200, 200)
+    results = trace.trace_group([("first", first, 0, 0, 0), ("second", second, 0, 50, 0)])
+    baseline_trace.move(inline, *results[0][2]["inline"])
+    assert results[0][3] == tracer_of([inline, fixed], [inline], 200, 200).state_hash(0, 0, 0)
+    assert results[1][3] == tracer_of([inline, fixed], [], 200, 200).state_hash(0, 50, 0)
+    # a trace made before the first beam path moved the mirror is not reused
+    assert results[1][3] != tracer_of([mirror("inline", 0, 0, 3*pi/4), fixed], [], 200, 200).state_hash(0, 50, 0)
+
+# a random optical component of every kind baseline_trace.check_interaction handles
+def random_component(rng, name, x, y, angle):
+    kind = rng.integers(7)
+    optics = {"max_angle": rng.uniform(10, 90), "max_width": rng.uniform(5, 30)}
+    if kind == 0:
+        optics.update(reflection_angle=0)
+    elif kind == 1:
+        optics.update(reflection_angle=rng.choice([-45, 45]))
+    elif kind == 2:
+        optics.update(transmission=True, reflection_angle=0)
+    elif kind == 3:
+        optics.update(transmission=True)
+    elif kind == 4:
+        optics.update(transmission=True, focal_length=rng.uniform(-100, 100))
+    elif kind == 5:
+        optics.update(diffraction_angle=rng.uniform(-30, 30))
+    else:
+        optics.update(transmission=True, diffraction_angle=rng.uniform(-30, 30), diffraction_dir=(1, -1))
+    if rng.random() < 0.3:
+        optics.update(block_width=optics["max_width"]+rng.uniform(0, 20))
+    return part(name, x, y, angle, **optics)
+
+def random_layout(rng, n, axis_aligned=False):
+    if axis_aligned:
+        # poses on a coarse grid exercise the vertical and horizontal edge cases
+        return [random_component(rng, "c%d"%i, *rng.integers(0, 5, 2)*25.0, rng.integers(8)*pi/4) for i in range(n)]
+    return [random_component(rng, "c%d"%i, *rng.uniform(0, 100, 2), rng.uniform(-pi, pi)) for i in range(n)]
+
+def random_beams(rng, n, axis_aligned=False):
+    if axis_aligned:
+        return [(*rng.integers(0, 5, 2)*25.0+rng.choice([0, 5]), rng.integers(8)*pi/4) for _ in range(n)]
+    return [(*rng.uniform(-20, 120, 2), rng.uniform(-pi, pi)) for _ in range(n)]
+
+def same_angle(a, b):
+    if b == None:
+        return np.isnan(a)
+    return np.isclose(np.cos(a), np.cos(b)) and np.isclose(np.sin(a), np.sin(b))
+
+def test_check_interactions_match_baseline():
+    rng = np.random.default_rng(0)
+    for axis_aligned in [False, True]:
+        objects = random_layout(rng, 40, axis_aligned)
+        table = tracer_of(objects).table
+        for x1, y1, a1 in random_beams(rng, 100, axis_aligned):
+            hit, x, y, _, angle1, angle2, block = trace.check_interactions(x1, y1, a1, table)
+            for i, obj in enumerate(objects):
+                ref = baseline_trace.check_interaction(x1, y1, a1, obj)
+                assert hit[i] == (ref != None)
+                if ref != None:
+                    _, xf, yf, (af1, af2), blocked = ref
+                    assert np.isclose(x[i], xf) and np.isclose(y[i], yf)
+                    assert same_angle(angle1[i], af1) and same_angle(angle2[i], af2)
+                    assert block[i] == blocked
+
+def test_grid_query_keeps_every_hit():
+    rng = np.random.default_rng(1)
+    for axis_aligned in [False, True]:
+        beam_tracer = tracer_of(random_layout(rng, 60, axis_aligned))
+        table, index = beam_tracer.table, beam_tracer.index
+        for x1, y1, a1 in random_beams(rng, 200, axis_aligned):
+            hit = trace.check_interactions(x1, y1, a1, table)[0]
+            mask = index.query(x1, y1, a1)
+            assert not (hit & ~mask).any()
+            assert trace.nearest_interaction(x1, y1, a1, table, mask) == trace.nearest_interaction(x1, y1, a1, table)
+
+def test_grid_query_follows_moves():
+    beam_tracer = tracer_of([mirror("near", 30, 0, pi), mirror("far", 60, 0, pi)])
+    beam_tracer.move("near", 30, 300)
+    assert list(beam_tracer.index.query(0, 0, 0)) == [False, True]
+    assert list(beam_tracer.index.query(0, 300, 0)) == [True, False]
+
+# a small table layout with a beam splitter, inline mirrors on both branches and a lens
+def routing_layout(fold_x=120):
+    source_mirror = mirror("m1", 0, 0, 3*pi/4).along(1, distance=40)
+    split = splitter("bs", 0, 0, -3*pi/4).along(1, distance=30)
+    fold = mirror("m2", fold_x, 70, pi)
+    lens = part("lens", 0, 0, pi, transmission=True, focal_length=50, max_angle=10, max_width=25.4).along(3, distance=20)
+    end = mirror("m3", 0, 0, -pi/4).along(2, distance=25)
+    objects = [source_mirror, split, fold, lens, end]
+    return objects, [source_mirror, split, end, lens]
+
+def test_full_trace_matches_baseline():
+    objects, path_objects = routing_layout()
+    beam_tracer = tracer_of(objects, path_objects, 200, 200)
+    beams = baseline_trace.beam_path(objects, path_objects, 200, 200).trace(10, 20, 0)
+    segments, placed = beam_tracer.trace(10, 20, 0)
+    assert_same_beams(segments, beams)
+    for obj in path_objects:
+        assert np.allclose(placed[obj.Name], obj.BasePlacement.Base[:2])
+
+def test_retrace_matches_full_trace():
+    previous = tracer_of(*routing_layout(), 200, 200)
+    previous.trace(10, 20, 0)
+    for fold_x in [120, 140, 50]:
+        moved = tracer_of(*routing_layout(fold_x), 200, 200)
+        segments, placed = moved.retrace(previous, 10, 20, 0)
+        full, full_placed = tracer_of(*routing_layout(fold_x), 200, 200).trace(10, 20, 0)
+        assert np.array_equal(segments.array[["hit", "block"]], full.array[["hit", "block"]])
+        assert_same_beams(segments, [(i["x"], i["y"], i["angle"], i["length"], full.beam_indices[i["beam"]]) for i in full])
+        assert placed.keys() == full_placed.keys()
+        assert all(np.allclose(placed[i], full_placed[i]) for i in placed)